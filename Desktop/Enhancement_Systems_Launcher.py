@@ -10,6 +10,8 @@ import subprocess
 import json
 import time
 import threading
+import importlib
+import importlib.util
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import tkinter as tk
@@ -17,6 +19,10 @@ from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime
 import webbrowser
 
+DEPENDENCY_CACHE_PATH = Path.home() / ".enhancement_deps_cache.json"
+DPKG_STATUS_PATH = Path("/var/lib/dpkg/status")
+PYTHON_IMPORT_NAMES = {'pillow': 'PIL'}  # Distribution name -> top-level import name
+
 class DependencyManager:
     """Manages system dependencies and installations"""
     
@@ -31,33 +37,106 @@ class DependencyManager:
         """Log status message"""
         self.status_callback(f"[{datetime.now().strftime('%H:%M:%S')}] {message}")
     
+    def _cache_key(self, kind: str) -> List[Any]:
+        """State that invalidates a cached probe: dpkg database or sys.path entries"""
+        if kind == 'system':
+            try:
+                return [self.required_packages['system'], DPKG_STATUS_PATH.stat().st_mtime_ns]
+            except OSError:
+                return [self.required_packages['system'], None]
+        
+        # pip installs and removals change the mtime of the site directory they touch;
+        # other entries (script dir, home) change too often to be worth watching
+        path_state = []
+        for entry in sys.path:
+            entry = os.path.abspath(entry)
+            mtime = None
+            if os.path.basename(entry) in ('site-packages', 'dist-packages'):
+                try:
+                    mtime = os.stat(entry).st_mtime_ns
+                except OSError:
+                    pass
+            path_state.append([entry, mtime])
+        return [self.required_packages['python'], sys.executable, path_state]
+    
+    def _cached_status(self, kind: str, probe) -> Dict[str, bool]:
+        """Return a probe result from DEPENDENCY_CACHE_PATH, re-probing when its key changed"""
+        key = self._cache_key(kind)
+        try:
+            cache = json.loads(DEPENDENCY_CACHE_PATH.read_text())
+        except (OSError, ValueError):
+            cache = {}
+        
+        entry = cache.get(kind)
+        if entry and entry.get('key') == key:
+            return entry['status']
+        
+        status = probe()
+        cache[kind] = {'key': key, 'status': status}
+        try:
+            temp_path = DEPENDENCY_CACHE_PATH.with_suffix('.tmp')
+            temp_path.write_text(json.dumps(cache))
+            os.replace(temp_path, DEPENDENCY_CACHE_PATH)
+        except OSError:
+            pass
+        return status
+    
+    def invalidate_cache(self):
+        """Forget cached probe results after installing packages"""
+        importlib.invalidate_caches()
+        try:
+            DEPENDENCY_CACHE_PATH.unlink()
+        except OSError:
+            pass
+    
     def check_system_packages(self) -> Dict[str, bool]:
         """Check if system packages are installed"""
-        status = {}
+        return self._cached_status('system', self._probe_system_packages)
+    
+    def _probe_system_packages(self) -> Dict[str, bool]:
+        """Query every required package in a single dpkg-query call"""
+        packages = self.required_packages['system']
+        status = {package: False for package in packages}
         
-        for package in self.required_packages['system']:
-            try:
-                result = subprocess.run(
-                    ['dpkg', '-l', package],
-                    capture_output=True,
-                    text=True
-                )
-                status[package] = result.returncode == 0
-            except Exception:
-                status[package] = False
+        try:
+            # Exits non-zero when any package is unknown; the known ones are still listed
+            result = subprocess.run(
+                ['dpkg-query', '-W', '-f=${Package}\t${db:Status-Abbrev}\n', *packages],
+                capture_output=True,
+                text=True
+            )
+        except Exception:
+            return status
+        
+        for line in result.stdout.splitlines():
+            package, _, state = line.partition('\t')
+            if package in status:
+                status[package] = status[package] or state.startswith('ii')
         
         return status
     
     def check_python_packages(self) -> Dict[str, bool]:
         """Check if Python packages are installed"""
+        return self._cached_status('python', self._probe_python_packages)
+    
+    def _probe_python_packages(self) -> Dict[str, bool]:
+        """Locate packages with find_spec and distribution metadata without importing them"""
         status = {}
         
         for package in self.required_packages['python']:
+            import_name = PYTHON_IMPORT_NAMES.get(package, package.replace('-', '_'))
             try:
-                __import__(package.replace('-', '_'))
-                status[package] = True
-            except ImportError:
+                status[package] = importlib.util.find_spec(import_name) is not None
+            except (ImportError, ValueError):
                 status[package] = False
+            
+            if not status[package]:
+                from importlib import metadata
+                try:
+                    metadata.distribution(package)
+                    status[package] = True
+                except metadata.PackageNotFoundError:
+                    pass
         
         return status
     
@@ -79,6 +158,7 @@ class DependencyManager:
                 )
             
             self.log_status("System packages installed successfully!")
+            self.invalidate_cache()
             return True
             
         except subprocess.CalledProcessError as e:
@@ -96,6 +176,7 @@ class DependencyManager:
                 ], check=True, capture_output=True)
             
             self.log_status("Python packages installed successfully!")
+            self.invalidate_cache()
             return True
             
         except subprocess.CalledProcessError as e:
@@ -252,6 +333,7 @@ class EnhancementLauncherGUI:
     """Main GUI application for the Enhancement Systems Launcher"""
     
     def __init__(self):
+        self.startup_began = time.perf_counter()
         self.root = tk.Tk()
         self.root.title("Personal Enhancement Systems Launcher")
         self.root.geometry("800x600")
@@ -289,33 +371,45 @@ class EnhancementLauncherGUI:
             }
         }
         
+        self.log_backlog = []
+        self.deps_status = None
         self.setup_gui()
     
     def setup_gui(self):
         """Setup the GUI components"""
         # Create notebook for tabs
-        notebook = ttk.Notebook(self.root)
-        notebook.pack(fill='both', expand=True, padx=10, pady=10)
-        
-        # Main tab
-        main_frame = ttk.Frame(notebook)
-        notebook.add(main_frame, text="🚀 Launch")
-        self.setup_main_tab(main_frame)
-        
-        # Dependencies tab
-        deps_frame = ttk.Frame(notebook)
-        notebook.add(deps_frame, text="🔧 Setup")
-        self.setup_deps_tab(deps_frame)
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        # Tabs are built the first time they are selected
+        tabs = [
+            ("🚀 Launch", self.setup_main_tab),
+            ("🔧 Setup", self.setup_deps_tab),
+            ("📦 GitHub", self.setup_github_tab),
+            ("📋 Logs", self.setup_log_tab)
+        ]
         
-        # GitHub tab
-        github_frame = ttk.Frame(notebook)
-        notebook.add(github_frame, text="📦 GitHub")
-        self.setup_github_tab(github_frame)
+        self.pending_tabs = {}
+        for text, builder in tabs:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self.pending_tabs[str(frame)] = (text, frame, builder)
         
-        # Log tab
-        log_frame = ttk.Frame(notebook)
-        notebook.add(log_frame, text="📋 Logs")
-        self.setup_log_tab(log_frame)
+        self.build_tab(next(iter(self.pending_tabs)))
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+    
+    def on_tab_changed(self, event=None):
+        """Build the selected tab on first use"""
+        self.build_tab(str(self.notebook.select()))
+    
+    def build_tab(self, tab_id: str):
+        """Run a tab's setup method once, timing it"""
+        if tab_id not in self.pending_tabs:
+            return
+        text, frame, builder = self.pending_tabs.pop(tab_id)
+        started = time.perf_counter()
+        builder(frame)
+        print(f"⏱️ Built {text} tab in {(time.perf_counter() - started) * 1000:.0f}ms")
     
     def setup_main_tab(self, parent):
         """Setup main launcher tab"""
@@ -394,6 +488,10 @@ class EnhancementLauncherGUI:
         self.progress_bar = ttk.Progressbar(parent, variable=self.progress_var, 
                                            maximum=100, mode='determinate')
         self.progress_bar.pack(fill='x', padx=20, pady=10)
+        
+        # Show the result of the background check if it already finished
+        if self.deps_status:
+            self.update_deps_display(*self.deps_status)
     
     def setup_github_tab(self, parent):
         """Setup GitHub tab"""
@@ -444,6 +542,9 @@ class EnhancementLauncherGUI:
         self.log_text = scrolledtext.ScrolledText(parent, width=80, height=25, 
                                                  wrap=tk.WORD)
         self.log_text.pack(fill='both', expand=True, padx=10, pady=10)
+        self.log_text.insert(tk.END, ''.join(self.log_backlog))
+        self.log_text.see(tk.END)
+        self.log_backlog.clear()
         
         # Clear log button
         clear_btn = ttk.Button(parent, text="🗑️ Clear Logs", 
@@ -455,9 +556,12 @@ class EnhancementLauncherGUI:
         timestamp = datetime.now().strftime('%H:%M:%S')
         log_entry = f"[{timestamp}] {message}\n"
         
-        self.log_text.insert(tk.END, log_entry)
-        self.log_text.see(tk.END)
-        self.root.update()
+        if hasattr(self, 'log_text'):
+            self.log_text.insert(tk.END, log_entry)
+            self.log_text.see(tk.END)
+            self.root.update()
+        else:
+            self.log_backlog.append(log_entry)  # Logs tab not built yet
         
         # Also print to console
         print(log_entry.strip())
@@ -469,10 +573,11 @@ class EnhancementLauncherGUI:
     def check_dependencies(self):
         """Check all dependencies"""
         def check_thread():
-            self.log_message("Checking system dependencies...")
+            # Tk is not thread-safe: log through the event loop
+            self.root.after(0, self.log_message, "Checking system dependencies...")
             system_status = self.dep_manager.check_system_packages()
             
-            self.log_message("Checking Python dependencies...")
+            self.root.after(0, self.log_message, "Checking Python dependencies...")
             python_status = self.dep_manager.check_python_packages()
             
             # Update GUI with results
@@ -482,6 +587,10 @@ class EnhancementLauncherGUI:
     
     def update_deps_display(self, system_status: Dict, python_status: Dict):
         """Update dependencies display"""
+        self.deps_status = (system_status, python_status)
+        if not hasattr(self, 'deps_frame'):
+            return  # Setup tab not built yet; it renders deps_status when it is
+        
         # Clear existing widgets
         for widget in self.deps_frame.winfo_children():
             widget.destroy()
@@ -638,6 +747,12 @@ class EnhancementLauncherGUI:
         webbrowser.open("https://github.com/new")
         self.log_message("🌐 Opened GitHub to create new repository")
     
+    def finish_startup(self):
+        """Log time-to-interactive and start background checks"""
+        elapsed_ms = (time.perf_counter() - self.startup_began) * 1000
+        self.log_message(f"⏱️ Window ready in {elapsed_ms:.0f}ms")
+        self.check_dependencies()
+    
     def run(self):
         """Run the GUI application"""
         # Initial setup
@@ -645,6 +760,9 @@ class EnhancementLauncherGUI:
         self.log_message("💡 Use the Setup tab to install dependencies")
         self.log_message("💡 Use the GitHub tab to push systems to GitHub")
         
+        # Log startup time and probe dependencies once the window is up
+        self.root.after_idle(self.finish_startup)
+        
         # Start the GUI
         self.root.mainloop()
 
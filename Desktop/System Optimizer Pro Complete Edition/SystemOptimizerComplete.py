@@ -11,19 +11,1176 @@ from tkinter import ttk, messagebox, scrolledtext, filedialog
 import subprocess
 import threading
 import os
+import stat
 import shutil
 import time
 import json
 from datetime import datetime, timedelta
 import psutil
 import glob
+import fnmatch
+import heapq
 import sqlite3
 import hashlib
 import tempfile
+import atexit
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+class SystemSampler:
+    """Background thread that takes one consistent system snapshot per interval and publishes it"""
+    
+    def __init__(self, interval=5, process_count=10):
+        self.interval = interval
+        self.process_count = process_count
+        self.snapshot = None
+        self.processes_until = 0  # Monotonic deadline of the current want_processes() lease
+        self.subscribers = []
+        self.condition = threading.Condition()
+        self.wakeup = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        """Start sampling (idempotent)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+    
+    def subscribe(self, callback):
+        """Call callback(snapshot) on the sampler thread after every sample"""
+        self.subscribers.append(callback)
+    
+    def refresh(self):
+        """Take the next sample now instead of waiting for the interval"""
+        self.wakeup.set()
+    
+    def want_processes(self):
+        """Include top_processes in snapshots for the next few intervals (call again to keep them coming)"""
+        now = time.monotonic()
+        starting = now >= self.processes_until
+        self.processes_until = now + 3 * self.interval
+        if starting:
+            self.refresh()
+    
+    def latest(self):
+        """Most recent snapshot, or None before the first sample; never blocks"""
+        return self.snapshot
+    
+    def get(self, timeout=5):
+        """Most recent snapshot, waiting for the first one if needed (worker threads only).
+        Raises TimeoutError rather than sampling on the caller's thread, which would reset the
+        sampler's cpu_percent baselines."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.snapshot is not None, timeout):
+                raise TimeoutError("no system sample yet")
+        return self.snapshot
+    
+    def run(self):
+        """Sampling loop"""
+        # Prime the counter so the first cpu_percent covers a real interval
+        psutil.cpu_percent()
+        self.wakeup.wait(min(1, self.interval))
+        
+        while True:
+            self.wakeup.clear()
+            try:
+                snapshot = self.sample()
+                with self.condition:
+                    self.snapshot = snapshot
+                    self.condition.notify_all()
+                for callback in self.subscribers:
+                    callback(snapshot)
+            except Exception as e:
+                print(f"System sampler error: {e}")
+            self.wakeup.wait(self.interval)
+    
+    def sample(self):
+        """Read every system counter once; processes only while someone wants them"""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        cpu_freq = psutil.cpu_freq()
+        try:
+            load_average = os.getloadavg()[0]
+        except OSError:
+            load_average = None
+        
+        processes = None
+        if time.monotonic() < self.processes_until:
+            processes = []
+            for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'cpu_percent']):
+                if proc.info['name'] is not None:
+                    processes.append(proc.info)
+            processes.sort(key=lambda info: info['memory_percent'] or 0, reverse=True)
+            processes = processes[:self.process_count]
+        
+        return {
+            'timestamp': datetime.now(),
+            'cpu_percent': psutil.cpu_percent(),
+            'cpu_count': psutil.cpu_count(),
+            'cpu_freq': cpu_freq,
+            'load_average': load_average,
+            'memory': memory,
+            'swap': psutil.swap_memory(),
+            'disk': disk,
+            'disk_percent': (disk.used / disk.total) * 100,
+            'net': psutil.net_io_counters(),
+            'top_processes': processes  # None when no view asked for process data
+        }
+
+class SnapshotWriter:
+    """Buffers system_snapshots rows and writes them in batches over one long-lived WAL connection"""
+    
+    def __init__(self, db_file, batch_size=12, max_delay=60):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.rows = []
+        self.lock = threading.Lock()
+        self.conn = None
+        self.last_flush = time.monotonic()
+    
+    def add(self, row):
+        """Queue one (timestamp, epoch, cpu, memory, disk, load) row; flushes when the batch is due"""
+        with self.lock:
+            self.rows.append(row)
+            if len(self.rows) >= self.batch_size or time.monotonic() - self.last_flush >= self.max_delay:
+                self._flush()
+    
+    def flush(self):
+        """Write any buffered rows now"""
+        with self.lock:
+            self._flush()
+    
+    def close(self):
+        """Flush and release the connection"""
+        with self.lock:
+            self._flush()
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+    
+    def _flush(self):
+        if not self.rows:
+            return
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO system_snapshots
+                (timestamp, epoch, cpu_usage, memory_usage, disk_usage, load_average)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', self.rows)
+        self.rows.clear()
+        self.last_flush = time.monotonic()
+
+def scan_directory(path):
+    """List one directory without following symlinks.
+    Returns (allocated bytes of plain files, file count, subdirectory paths,
+    (dev, ino, bytes, nlink) of files with more than one link)."""
+    size = files = 0
+    subdirs = []
+    linked = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                files += 1
+                if st.st_nlink > 1:
+                    linked.append((st.st_dev, st.st_ino, st.st_blocks * 512, st.st_nlink))
+                else:
+                    size += st.st_blocks * 512
+    except OSError:
+        pass
+    return size, files, tuple(subdirs), tuple(linked)
+
+class DirectorySizer:
+    """Allocated-size scanner: os.scandir fanned out over a thread pool, hardlinked files counted once.
+    Each directory's listing is cached by its mtime, so a rescan only lists directories that changed.
+    Files resized in place do not touch their directory's mtime, so listings older than FULL_RELIST_AGE
+    are listed again anyway, and sizes(fresh=True) bypasses the cache for exact before/after accounting."""
+    
+    FULL_RELIST_AGE = 600
+    
+    def __init__(self, workers=8):
+        self.workers = workers
+        # path -> (mtime_ns, listed at (monotonic), file bytes, file count, subdirectory paths, hardlinked files)
+        self.cache = {}
+    
+    def visit(self, path, fresh=False):
+        """Stat one directory and return (its own bytes, its listing); None if it is gone"""
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        
+        cached = self.cache.get(path)
+        if (not fresh and cached and cached[0] == st.st_mtime_ns
+                and time.monotonic() - cached[1] < self.FULL_RELIST_AGE):
+            return st.st_blocks * 512, cached
+        
+        listing = (st.st_mtime_ns, time.monotonic()) + scan_directory(path)
+        self.cache[path] = listing
+        return st.st_blocks * 512, listing
+    
+    def sizes(self, paths, fresh=False):
+        """Allocated bytes and file counts under each path, scanned together: {path: (bytes, files)}.
+        fresh lists every directory again instead of trusting cached listings."""
+        totals = {path: [0, 0, set()] for path in paths}
+        finished = queue.SimpleQueue()
+        outstanding = 0
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(path, root):
+                future = pool.submit(self.visit, path, fresh)
+                future.root = root
+                future.add_done_callback(finished.put)
+            
+            for path in totals:
+                submit(path, path)
+                outstanding += 1
+            
+            while outstanding:
+                future = finished.get()
+                outstanding -= 1
+                result = future.result()
+                if result is None:
+                    continue
+                
+                dir_bytes, (_, _, size, files, subdirs, linked) = result
+                total = totals[future.root]
+                total[0] += dir_bytes + size
+                total[1] += files
+                for dev, ino, blocks, _ in linked:
+                    if (dev, ino) not in total[2]:
+                        total[2].add((dev, ino))
+                        total[0] += blocks
+                
+                for subdir in subdirs:
+                    submit(subdir, future.root)
+                    outstanding += 1
+        
+        return {path: (total[0], total[1]) for path, total in totals.items()}
+
+class DiskUsageIndex:
+    """On-disk index of a directory tree with cumulative sizes per directory (ncdu-style browsing).
+    update() re-lists only directories whose mtime changed and re-derives the totals, so drill-down
+    and top-k queries are answered from SQLite instead of re-walking the tree. Hardlinked files
+    count 1/nlink in each directory that links them.
+    A file growing in place (a log, a VM image) does not change its directory's mtime, so its
+    directory's own_bytes stays stale until the next full re-list, which update() does once the
+    last one is older than FULL_RELIST_AGE. Directories whose names are not valid UTF-8 are not
+    stored (SQLite paths are text); their parent is re-listed on every update so their bytes still
+    count toward its totals."""
+    
+    FULL_RELIST_AGE = 6 * 3600
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dirs (
+            id INTEGER PRIMARY KEY,
+            parent INTEGER,
+            path TEXT UNIQUE NOT NULL,
+            mtime_ns INTEGER,
+            own_bytes INTEGER,
+            own_files INTEGER,
+            total_bytes INTEGER,
+            total_files INTEGER,
+            total_dirs INTEGER,
+            child_dirs INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent, total_bytes);
+        CREATE INDEX IF NOT EXISTS idx_dirs_own ON dirs(own_bytes);
+        CREATE TABLE IF NOT EXISTS roots (
+            path TEXT PRIMARY KEY,
+            updated REAL,
+            seconds REAL,
+            relisted INTEGER,
+            full_updated REAL
+        );
+    """
+    
+    def __init__(self, index_file, workers=8):
+        self.index_file = index_file
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(index_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(roots)')}
+        if 'full_updated' not in columns:  # Indexes created before periodic full re-lists
+            self.conn.execute('ALTER TABLE roots ADD COLUMN full_updated REAL')
+    
+    @staticmethod
+    def subtree(path):
+        """WHERE clause and parameters matching path and everything below it"""
+        prefix = path.rstrip('/')
+        return 'path = ? OR (path >= ? AND path < ?)', (path, prefix + '/', prefix + '0')
+    
+    def visit(self, path, known_mtime):
+        """Stat one directory; list it only if its mtime changed. None if it is gone."""
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        if st.st_mtime_ns == known_mtime:
+            return st.st_mtime_ns, st.st_blocks * 512, None
+        return st.st_mtime_ns, st.st_blocks * 512, scan_directory(path)
+    
+    def update(self, root, full=None):
+        """Bring the index for root up to date; returns (directories, directories re-listed, seconds).
+        full re-lists every directory; by default only when the last full re-list is FULL_RELIST_AGE old."""
+        started = time.perf_counter()
+        root = os.path.abspath(root)
+        if not storable_path(root):
+            raise ValueError(f"cannot index {root!r}: name is not valid UTF-8")
+        where, params = self.subtree(root)
+        
+        with self.lock:
+            if full is None:
+                row = self.conn.execute('SELECT full_updated FROM roots WHERE path = ?', (root,)).fetchone()
+                full = not row or not row[0] or time.time() - row[0] > self.FULL_RELIST_AGE
+            known = {}
+            children_of = {}
+            for row in self.conn.execute(f"""
+                SELECT path, id, parent, mtime_ns, own_bytes, own_files,
+                       total_bytes, total_files, total_dirs, child_dirs
+                FROM dirs WHERE {where}
+            """, params):
+                known[row[0]] = row[1:]
+                children_of.setdefault(row[2], []).append(row[0])
+            next_id = self.conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM dirs').fetchone()[0]
+        
+        # Walk: every directory is stat'ed, only changed ones are listed again
+        nodes = {}
+        relisted = 0
+        finished = queue.SimpleQueue()
+        outstanding = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            def submit(path):
+                row = known.get(path)
+                future = pool.submit(self.visit, path, row[2] if row and not full else None)
+                future.path = path
+                future.add_done_callback(finished.put)
+            
+            submit(root)
+            outstanding = 1
+            while outstanding:
+                future = finished.get()
+                outstanding -= 1
+                result = future.result()
+                if result is None:
+                    continue
+                
+                mtime_ns, dir_bytes, listing = result
+                if listing is None:
+                    row = known[future.path]
+                    own_bytes, own_files = row[3], row[4]
+                    subdirs = children_of.get(row[0], ())
+                else:
+                    relisted += 1
+                    size, own_files, subdirs, linked = listing
+                    own_bytes = dir_bytes + size + sum(blocks // nlink for _, _, blocks, nlink in linked)
+                nodes[future.path] = (mtime_ns, own_bytes, own_files, subdirs)
+                
+                for subdir in subdirs:
+                    submit(subdir)
+                    outstanding += 1
+        
+        # Cumulative totals, children before parents (a child's path is always longer)
+        totals = {}
+        for path in sorted(nodes, key=len, reverse=True):
+            _, own_bytes, own_files, subdirs = nodes[path]
+            total_bytes, total_files, total_dirs, child_dirs = own_bytes, own_files, 0, 0
+            for subdir in subdirs:
+                if subdir in totals:
+                    child = totals[subdir]
+                    total_bytes += child[0]
+                    total_files += child[1]
+                    total_dirs += child[2] + 1
+                    child_dirs += 1
+            totals[path] = (total_bytes, total_files, total_dirs, child_dirs)
+        
+        # Write back only what changed; new directories get ids parents-first
+        ids = {path: row[0] for path, row in known.items() if path in nodes}
+        inserts = []
+        updates = []
+        skipped = 0
+        for path in sorted(nodes, key=len):
+            if path not in known and not storable_path(path):
+                skipped += 1
+                continue
+            mtime_ns, own_bytes, own_files, subdirs = nodes[path]
+            if not all(storable_path(subdir) for subdir in subdirs):
+                # Skipped children are not stored, so the next update must list this folder again
+                mtime_ns = None
+            values = (mtime_ns, own_bytes, own_files) + totals[path]
+            row = known.get(path)
+            if row is None:
+                ids[path] = next_id
+                parent = ids.get(os.path.dirname(path)) if path != root else None
+                inserts.append((next_id, parent, path) + values)
+                next_id += 1
+            elif row[2:] != values:
+                updates.append(values + (row[0],))
+        stale = [(path,) for path in known if path not in nodes]
+        if skipped:
+            print(f"⚠️ Disk index skipped {skipped} folders with non-UTF-8 names under {root}")
+        
+        with self.lock, self.conn:
+            self.conn.executemany('DELETE FROM dirs WHERE path = ?', stale)
+            self.conn.executemany("""
+                INSERT INTO dirs (id, parent, path, mtime_ns, own_bytes, own_files,
+                                  total_bytes, total_files, total_dirs, child_dirs)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, inserts)
+            self.conn.executemany("""
+                UPDATE dirs SET mtime_ns = ?, own_bytes = ?, own_files = ?,
+                                total_bytes = ?, total_files = ?, total_dirs = ?, child_dirs = ?
+                WHERE id = ?
+            """, updates)
+            seconds = time.perf_counter() - started
+            self.conn.execute("""
+                INSERT INTO roots (path, updated, seconds, relisted, full_updated) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET updated = excluded.updated, seconds = excluded.seconds,
+                    relisted = excluded.relisted, full_updated = COALESCE(excluded.full_updated, full_updated)
+            """, (root, time.time(), seconds, relisted, time.time() if full else None))
+        
+        return len(nodes), relisted, seconds
+    
+    def node(self, path):
+        """(total_bytes, total_files, total_dirs, own_bytes, own_files) of an indexed directory, or None"""
+        with self.lock:
+            return self.conn.execute("""
+                SELECT total_bytes, total_files, total_dirs, own_bytes, own_files FROM dirs WHERE path = ?
+            """, (path,)).fetchone()
+    
+    def children(self, path, limit=50):
+        """Immediate subdirectories, largest first: [(path, total_bytes, total_files, child_dirs)]"""
+        with self.lock:
+            return self.conn.execute("""
+                SELECT path, total_bytes, total_files, child_dirs FROM dirs
+                WHERE parent = (SELECT id FROM dirs WHERE path = ?)
+                ORDER BY total_bytes DESC LIMIT ?
+            """, (path, limit)).fetchall()
+    
+    def largest(self, path, limit=10):
+        """Directories under path holding the most bytes in their own files: [(path, own_bytes, own_files)]"""
+        where, params = self.subtree(path)
+        with self.lock:
+            return self.conn.execute(f"""
+                SELECT path, own_bytes, own_files FROM dirs WHERE {where}
+                ORDER BY own_bytes DESC LIMIT ?
+            """, params + (limit,)).fetchall()
+    
+    def last_update(self, root):
+        """(updated unix time, seconds taken, directories re-listed) of root's last update, or None"""
+        with self.lock:
+            return self.conn.execute('SELECT updated, seconds, relisted FROM roots WHERE path = ?',
+                                     (os.path.abspath(root),)).fetchone()
+
+def storable_path(path):
+    """True if path can be stored as SQLite text (no surrogate-escaped, non-UTF-8 bytes)"""
+    try:
+        path.encode('utf-8')
+        return True
+    except UnicodeEncodeError:
+        return False
+
+def lower_thread_priority():
+    """Drop the calling thread to the lowest CPU and idle I/O priority (Linux; no-op elsewhere)"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+    try:
+        psutil.Process(threading.get_native_id()).ionice(psutil.IOPRIO_CLASS_IDLE)
+    except (AttributeError, ValueError, OSError, psutil.Error):
+        pass
+
+class CleanupEngine:
+    """Finds cleanup candidates per category and deletes them in parallel at idle I/O priority.
+    One scan serves both the estimate and the deletion. The plan records each entry's (dev, ino)
+    and its parent directory's; deletion opens the parent with O_NOFOLLOW, re-checks both and
+    unlinks relative to that directory (like shutil.rmtree), so a path swapped for a symlink since
+    the scan is skipped rather than followed. Freed bytes come from that fresh stat."""
+    
+    # category -> [(root glob, file name glob or None for everything, only files not accessed for max_age_days)]
+    CATEGORIES = {
+        'thumbnails': [('~/.cache/thumbnails', None, False), ('~/.thumbnails', None, False)],
+        'chrome_cache': [('~/.cache/google-chrome/*/Cache', None, False)],
+        'firefox_cache': [('~/.cache/mozilla/firefox/*/cache2', None, False)],
+        'temp_files': [('/tmp', None, True), ('~/.cache', '*.tmp', False)],
+        'cache_tmp': [('~/.cache', '*.tmp', False)]
+    }
+    CHUNK_SIZE = 256
+    
+    def __init__(self, workers=8, max_age_days=7):
+        self.workers = workers
+        self.max_age_days = max_age_days
+    
+    def scan(self, categories):
+        """Candidates per category: {category: {'files': [(path, bytes, key, parent_key)],
+        'dirs': [(path, key, parent_key)], 'bytes': n}} where keys are (st_dev, st_ino).
+        Bytes are allocated blocks of files with a single link, i.e. what deleting them frees."""
+        tasks = []
+        for category in categories:
+            for pattern, name_glob, aged in self.CATEGORIES.get(category, ()):
+                for root in glob.glob(os.path.expanduser(pattern)):
+                    tasks.append((category, root, name_glob, aged))
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda task: self.scan_root(*task[1:]), tasks))
+        
+        plan = {category: {'files': [], 'dirs': [], 'bytes': 0} for category in categories}
+        seen = set()
+        for (category, root, name_glob, aged), (files, dirs) in zip(tasks, results):
+            found = plan[category]
+            for path, size, key, parent in files:
+                if path not in seen:
+                    seen.add(path)
+                    found['files'].append((path, size, key, parent))
+                    found['bytes'] += size
+            # Emptied directories are removed only where everything under the root goes
+            if name_glob is None and not aged:
+                found['dirs'].extend(dirs)
+        return plan
+    
+    def scan_root(self, root, name_glob, aged):
+        """Regular files under root matching the rule, and the directories below root"""
+        uid = os.getuid()
+        cutoff = time.time() - self.max_age_days * 86400
+        files = []
+        dirs = []
+        # The root itself may be a symlink (e.g. ~/.cache on another disk); nothing below it is followed
+        root = os.path.realpath(root)
+        try:
+            st = os.lstat(root)
+        except OSError:
+            return files, dirs
+        if not stat.S_ISDIR(st.st_mode):
+            return files, dirs
+        stack = [(root, (st.st_dev, st.st_ino))]
+        while stack:
+            directory, parent = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                key = (st.st_dev, st.st_ino)
+                                stack.append((entry.path, key))
+                                dirs.append((entry.path, key, parent))
+                                continue
+                            # Sockets, FIFOs and symlinks (e.g. an ssh-agent socket in /tmp) are left alone
+                            if not entry.is_file(follow_symlinks=False):
+                                continue
+                            if name_glob and not fnmatch.fnmatch(entry.name, name_glob):
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        # Shared /tmp: only our own files can be removed
+                        if uid != 0 and st.st_uid != uid:
+                            continue
+                        if aged and st.st_atime > cutoff:
+                            continue
+                        files.append((entry.path, self.freed_bytes(st), (st.st_dev, st.st_ino), parent))
+            except OSError:
+                continue
+        return files, dirs
+    
+    def delete(self, found):
+        """Delete one category's candidates; returns (bytes freed, files removed, seconds)"""
+        started = time.perf_counter()
+        files = found['files']
+        chunks = [files[i:i + self.CHUNK_SIZE] for i in range(0, len(files), self.CHUNK_SIZE)]
+        
+        freed = removed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, initializer=lower_thread_priority) as pool:
+            for chunk_bytes, chunk_files in pool.map(self.delete_chunk, chunks):
+                freed += chunk_bytes
+                removed += chunk_files
+        
+        # Deepest first so parents are empty by the time we reach them
+        for path, key, parent in sorted(found['dirs'], key=lambda entry: len(entry[0]), reverse=True):
+            dir_fd = self.open_dir(os.path.dirname(path), parent)
+            if dir_fd is None:
+                continue
+            try:
+                if self.lstat_matches(os.path.basename(path), key, dir_fd, stat.S_ISDIR):
+                    os.rmdir(os.path.basename(path), dir_fd=dir_fd)
+            except OSError:
+                pass
+            finally:
+                os.close(dir_fd)
+        
+        return freed, removed, time.perf_counter() - started
+    
+    @staticmethod
+    def freed_bytes(st):
+        """What unlinking a file frees: its allocated blocks, unless another link keeps them"""
+        return st.st_blocks * 512 if st.st_nlink == 1 else 0
+    
+    @staticmethod
+    def open_dir(path, key):
+        """fd of directory path if it is still the directory scanned as key (never a symlink), else None"""
+        try:
+            dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW)
+        except OSError:
+            return None
+        st = os.fstat(dir_fd)
+        if (st.st_dev, st.st_ino) != key:
+            os.close(dir_fd)
+            return None
+        return dir_fd
+    
+    @staticmethod
+    def lstat_matches(name, key, dir_fd, is_type):
+        """Fresh lstat of name in dir_fd if it is still the scanned entry of the expected type, else None"""
+        st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+        if (st.st_dev, st.st_ino) != key or not is_type(st.st_mode):
+            return None
+        return st
+    
+    @classmethod
+    def delete_chunk(cls, chunk):
+        """Unlink a chunk of files directory by directory; returns (bytes freed, files removed)"""
+        by_parent = {}
+        for path, size, key, parent in chunk:
+            directory, name = os.path.split(path)
+            by_parent.setdefault((directory, parent), []).append((name, key))
+        
+        freed = removed = 0
+        for (directory, parent), names in by_parent.items():
+            dir_fd = cls.open_dir(directory, parent)
+            if dir_fd is None:
+                continue  # Moved or replaced since the scan
+            try:
+                for name, key in names:
+                    try:
+                        st = cls.lstat_matches(name, key, dir_fd, stat.S_ISREG)
+                        if st is None:
+                            continue
+                        os.unlink(name, dir_fd=dir_fd)
+                    except OSError:
+                        continue
+                    freed += cls.freed_bytes(st)
+                    removed += 1
+            finally:
+                os.close(dir_fd)
+        return freed, removed
+
+class DuplicateFinder:
+    """Finds duplicate files under chosen folders: same size, then same first/last 64KB, then same content.
+    File metadata and hashes live in SQLite (~/.system_optimizer_hashes.db) keyed by path and reused while
+    (inode, mtime, size) are unchanged, so reruns only hash new or modified files and memory stays
+    bounded by one batch of candidates rather than the whole tree. Files and folders whose names are
+    not valid UTF-8 cannot be stored and are skipped."""
+    
+    EDGE = 64 * 1024
+    READ_SIZE = 1024 * 1024
+    BATCH = 5000
+    
+    def __init__(self, cache_file, workers=8, min_size=4096):
+        self.cache_file = cache_file
+        self.workers = workers
+        self.min_size = min_size
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(cache_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                blocks INTEGER,
+                dev INTEGER,
+                ino INTEGER,
+                mtime_ns INTEGER,
+                partial BLOB,
+                full BLOB,
+                generation INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_files_size ON files(generation, size);
+        """)
+    
+    def find(self, roots, top=10):
+        """Scan roots and group duplicates. Returns totals and the groups wasting the most space."""
+        with self.lock:
+            started = time.perf_counter()
+            generation = time.time_ns()
+            self.index(roots, generation)
+            
+            stats = {'groups': 0, 'files': 0, 'bytes': 0, 'hashed': 0, 'largest': []}
+            sizes = [row[0] for row in self.conn.execute("""
+                SELECT size FROM files WHERE generation = ?
+                GROUP BY size HAVING COUNT(DISTINCT dev || ':' || ino) > 1
+                ORDER BY size DESC
+            """, (generation,))]
+            
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for i in range(0, len(sizes), 256):
+                    self.match_sizes(pool, sizes[i:i + 256], generation, stats, top)
+            
+            stats['largest'].sort(reverse=True)
+            stats['seconds'] = time.perf_counter() - started
+            return stats
+    
+    def index(self, roots, generation):
+        """Record every file of at least min_size under roots, clearing hashes of files that changed"""
+        rows = []
+        skipped = 0
+        for root in roots:
+            stack = [os.path.expanduser(root)]
+            while stack:
+                try:
+                    with os.scandir(stack.pop()) as entries:
+                        for entry in entries:
+                            if not storable_path(entry.path):
+                                skipped += 1
+                                continue
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    stack.append(entry.path)
+                                    continue
+                                if not entry.is_file(follow_symlinks=False):
+                                    continue
+                                st = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            if st.st_size >= self.min_size:
+                                rows.append((entry.path, st.st_size, st.st_blocks * 512, st.st_dev, st.st_ino,
+                                             st.st_mtime_ns, generation))
+                                if len(rows) >= self.BATCH:
+                                    self.store(rows)
+                except OSError:
+                    continue
+        self.store(rows)
+        if skipped:
+            print(f"⚠️ Duplicate search skipped {skipped} entries with non-UTF-8 names")
+        
+        # Forget files that disappeared from these roots
+        with self.conn:
+            for root in roots:
+                prefix = os.path.expanduser(root).rstrip('/')
+                self.conn.execute('DELETE FROM files WHERE path >= ? AND path < ? AND generation != ?',
+                                  (prefix + '/', prefix + '0', generation))
+    
+    def store(self, rows):
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO files (path, size, blocks, dev, ino, mtime_ns, generation)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    partial = CASE WHEN (size, dev, ino, mtime_ns) = (excluded.size, excluded.dev, excluded.ino, excluded.mtime_ns)
+                                   THEN partial END,
+                    full = CASE WHEN (size, dev, ino, mtime_ns) = (excluded.size, excluded.dev, excluded.ino, excluded.mtime_ns)
+                                THEN full END,
+                    size = excluded.size, blocks = excluded.blocks, dev = excluded.dev, ino = excluded.ino,
+                    mtime_ns = excluded.mtime_ns, generation = excluded.generation
+            """, rows)
+        rows.clear()
+    
+    def match_sizes(self, pool, sizes, generation, stats, top):
+        """Narrow a batch of same-size candidates by partial and then full hash"""
+        marks = ','.join('?' * len(sizes))
+        rows = self.conn.execute(f"""
+            SELECT path, size, blocks, dev, ino, partial, full FROM files
+            WHERE generation = ? AND size IN ({marks})
+        """, [generation] + sizes).fetchall()
+        
+        # One path per inode (hardlinks already share their blocks); [path, size, blocks, partial, full]
+        files = {}
+        for path, size, blocks, dev, ino, partial, full in rows:
+            files.setdefault((dev, ino), [path, size, blocks, partial, full])
+        
+        candidates = self.narrow(files.values(), lambda info: info[1])
+        self.fill_hashes(pool, candidates, 3, self.partial_hash, stats)
+        # Files up to 128KB were read whole by the partial hash
+        candidates = self.narrow(candidates, lambda info: info[3] and (info[1], info[3]))
+        self.fill_hashes(pool, [info for info in candidates if info[1] > 2 * self.EDGE], 4, self.full_hash, stats)
+        
+        groups = {}
+        for path, size, blocks, partial, full in candidates:
+            if size <= 2 * self.EDGE or full is not None:
+                groups.setdefault((size, partial, full), []).append((path, blocks))
+        for (size, _, _), members in groups.items():
+            if len(members) < 2:
+                continue
+            wasted = sum(blocks for _, blocks in members[1:])
+            stats['groups'] += 1
+            stats['files'] += len(members) - 1
+            stats['bytes'] += wasted
+            entry = (wasted, size, sorted(path for path, _ in members))
+            if len(stats['largest']) < top:
+                heapq.heappush(stats['largest'], entry)
+            else:
+                heapq.heappushpop(stats['largest'], entry)
+    
+    @staticmethod
+    def narrow(files, key):
+        """Keep files that share key with at least one other file (a None key drops the file)"""
+        groups = {}
+        for info in files:
+            value = key(info)
+            if value is not None:
+                groups.setdefault(value, []).append(info)
+        return [info for group in groups.values() if len(group) > 1 for info in group]
+    
+    def fill_hashes(self, pool, files, column, hasher, stats):
+        """Compute missing hashes in the pool and store them"""
+        todo = [info for info in files if info[column] is None]
+        for info, digest in zip(todo, pool.map(hasher, [info[0] for info in todo])):
+            info[column] = digest
+            stats['hashed'] += info[1] if column == 4 else min(info[1], 2 * self.EDGE)
+        name = 'partial' if column == 3 else 'full'
+        with self.conn:
+            self.conn.executemany(f'UPDATE files SET {name} = ? WHERE path = ?',
+                                  [(info[column], info[0]) for info in todo if info[column] is not None])
+    
+    def partial_hash(self, path):
+        """Hash of the first and last 64KB (the whole file when it is smaller than that)"""
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(self.EDGE), digest_size=16)
+                f.seek(0, os.SEEK_END)
+                if f.tell() > self.EDGE:
+                    f.seek(max(self.EDGE, f.tell() - self.EDGE))
+                    digest.update(f.read(self.EDGE))
+                return digest.digest()
+        except OSError:
+            return None
+    
+    def full_hash(self, path):
+        """Hash of the whole content, read sequentially in 1MB blocks"""
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except (AttributeError, OSError):
+                    pass
+                digest = hashlib.blake2b(digest_size=20)
+                buffer = bytearray(self.READ_SIZE)
+                view = memoryview(buffer)
+                while True:
+                    count = f.readinto(buffer)
+                    if not count:
+                        break
+                    digest.update(view[:count])
+                return digest.digest()
+        except OSError:
+            return None
+
+class LargeFileScanner:
+    """Streaming walk that keeps only the K largest and K least recently accessed files (bounded heaps),
+    reports partial results while it runs and stops as soon as it is cancelled"""
+    
+    def __init__(self, k=25, stale_min_size=1024 * 1024, progress_interval=0.5):
+        self.k = k
+        self.stale_min_size = stale_min_size
+        self.progress_interval = progress_interval
+        self.cancelled = threading.Event()
+        self.largest = []   # min-heap of (size, path): the smallest of the K largest is evicted first
+        self.stale = []     # min-heap of (-atime, size, path): the most recently used is evicted first
+        self.files = self.bytes = self.dirs = 0
+        self.started = None
+    
+    def cancel(self):
+        self.cancelled.set()
+    
+    def scan(self, roots, on_progress=None):
+        """Walk roots without leaving their filesystems; returns the final result()"""
+        self.started = time.perf_counter()
+        next_report = self.started + self.progress_interval
+        
+        for root in roots:
+            try:
+                root_dev = os.lstat(root).st_dev
+            except OSError:
+                continue
+            stack = [root]
+            while stack and not self.cancelled.is_set():
+                self.dirs += 1
+                try:
+                    with os.scandir(stack.pop()) as entries:
+                        for entry in entries:
+                            try:
+                                st = entry.stat(follow_symlinks=False)
+                                if entry.is_dir(follow_symlinks=False):
+                                    if st.st_dev == root_dev:
+                                        stack.append(entry.path)
+                                    continue
+                                if not entry.is_file(follow_symlinks=False):
+                                    continue
+                            except OSError:
+                                continue
+                            self.add(entry.path, st)
+                except OSError:
+                    pass
+                
+                if on_progress and time.perf_counter() >= next_report:
+                    on_progress(self.result())
+                    next_report = time.perf_counter() + self.progress_interval
+        
+        return self.result()
+    
+    def add(self, path, st):
+        self.files += 1
+        self.bytes += st.st_size
+        if len(self.largest) < self.k:
+            heapq.heappush(self.largest, (st.st_size, path))
+        elif st.st_size > self.largest[0][0]:
+            heapq.heapreplace(self.largest, (st.st_size, path))
+        
+        if st.st_size >= self.stale_min_size:
+            if len(self.stale) < self.k:
+                heapq.heappush(self.stale, (-st.st_atime, st.st_size, path))
+            elif -st.st_atime > self.stale[0][0]:
+                heapq.heapreplace(self.stale, (-st.st_atime, st.st_size, path))
+    
+    def result(self):
+        """Snapshot: largest files biggest first, stale files oldest access first"""
+        return {
+            'largest': sorted(self.largest, reverse=True),
+            'stale': [(-neg_atime, size, path) for neg_atime, size, path in sorted(self.stale, reverse=True)],
+            'files': self.files,
+            'bytes': self.bytes,
+            'dirs': self.dirs,
+            'seconds': time.perf_counter() - self.started,
+            'cancelled': self.cancelled.is_set()
+        }
+
+class HealthProbes:
+    """Named health checks, each declaring a TTL, timeout and cost. Expired probes are re-run
+    concurrently (cheap ones inline, subprocess ones on a small pool) and every caller within the
+    TTL shares the cached result. A probe that overruns its timeout reports its last known value
+    and refreshes the cache whenever it finishes."""
+    
+    def __init__(self, workers=4):
+        self.probes = {}    # name -> (func, ttl, timeout, cost, default)
+        self.results = {}   # name -> (value, expires)
+        self.running = {}   # name -> future
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='health-probe')
+    
+    def register(self, name, func, ttl, timeout=2, cost='subprocess', default=False):
+        """cost is 'cheap' (run in the caller) or 'subprocess' (run on the pool)"""
+        self.probes[name] = (func, ttl, timeout, cost, default)
+    
+    def invalidate(self, *names):
+        """Forget cached results so the next run() probes again (all probes when no names are given)"""
+        with self.lock:
+            for name in names or list(self.results):
+                self.results.pop(name, None)
+    
+    def run(self, names=None):
+        """Current value of each probe: {name: value}"""
+        now = time.monotonic()
+        values = {}
+        waiting = {}
+        with self.lock:
+            for name in names or self.probes:
+                cached = self.results.get(name)
+                if cached and cached[1] > now:
+                    values[name] = cached[0]
+                    continue
+                func, ttl, timeout, cost, default = self.probes[name]
+                if cost != 'cheap':
+                    future = self.running.get(name)
+                    if future is None:
+                        future = self.running[name] = self.pool.submit(self.call, name)
+                    waiting[name] = future
+        
+        for name in names or self.probes:
+            if name not in values and name not in waiting:
+                values[name] = self.call(name)
+        
+        if waiting:
+            timeout = max(self.probes[name][2] for name in waiting)
+            wait(waiting.values(), timeout=timeout)
+            for name, future in waiting.items():
+                if future.done():
+                    values[name] = future.result()
+                else:
+                    cached = self.results.get(name)
+                    values[name] = cached[0] if cached else self.probes[name][4]
+        return values
+    
+    def call(self, name):
+        """Run one probe and cache its value for its TTL"""
+        func, ttl, timeout, cost, default = self.probes[name]
+        try:
+            value = func()
+        except Exception as e:
+            print(f"Health probe {name} failed: {e}")
+            value = default
+        with self.lock:
+            self.results[name] = (value, time.monotonic() + ttl)
+            self.running.pop(name, None)
+        return value
+
+class UIDispatcher:
+    """Queue of widget updates posted by worker threads, applied on the Tk thread every ~50ms"""
+    
+    def __init__(self, root, interval=50):
+        self.root = root
+        self.interval = interval
+        self.queue = queue.SimpleQueue()
+        self.ui_thread = threading.get_ident()
+    
+    def start(self):
+        """Begin draining the queue"""
+        self.root.after(self.interval, self.drain)
+    
+    def on_ui_thread(self):
+        return threading.get_ident() == self.ui_thread
+    
+    def wrap(self, widget, items=False):
+        """Proxy a widget so worker-thread writes go through this queue (items=True for listboxes)"""
+        return ThreadSafeWidget(widget, self, items)
+    
+    def append(self, widget, value, items=False):
+        """Queue text (or a listbox item) for insertion at the end; consecutive appends are joined"""
+        self.queue.put(('append', widget, (value, items)))
+    
+    def configure(self, widget, **options):
+        """Queue a config() call; only the latest per widget and option set is applied"""
+        self.queue.put(('configure', widget, options))
+    
+    def see(self, widget, index):
+        """Queue a scroll; only the latest per widget is applied, after the text lands"""
+        self.queue.put(('see', widget, index))
+    
+    def call(self, func, *args, **kwargs):
+        """Run func on the Tk thread, in order with queued appends"""
+        self.queue.put(('call', func, (args, kwargs)))
+    
+    def drain(self):
+        """Apply everything queued since the last pass (Tk thread)"""
+        appends = OrderedDict()
+        configs = OrderedDict()
+        scrolls = OrderedDict()
+        try:
+            while True:
+                try:
+                    kind, target, payload = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                if kind == 'append':
+                    value, items = payload
+                    appends.setdefault(id(target), (target, items, []))[2].append(value)
+                elif kind == 'configure':
+                    configs[(id(target), tuple(sorted(payload)))] = (target, payload)
+                elif kind == 'see':
+                    scrolls[id(target)] = (target, payload)
+                else:
+                    self.flush_appends(appends)
+                    args, kwargs = payload
+                    try:
+                        target(*args, **kwargs)
+                    except Exception as e:
+                        print(f"UI update error: {e}")
+            
+            self.flush_appends(appends)
+            for target, index in scrolls.values():
+                target.see(index)
+            for target, options in configs.values():
+                target.config(**options)
+        except Exception as e:
+            print(f"UI update error: {e}")
+        finally:
+            self.root.after(self.interval, self.drain)
+    
+    def flush_appends(self, appends):
+        """Insert accumulated text in one call per widget"""
+        for widget, items, values in appends.values():
+            if items:
+                widget.insert(tk.END, *values)
+            else:
+                widget.insert(tk.END, ''.join(values))
+        appends.clear()
+
+class ThreadSafeWidget:
+    """Widget proxy: calls from the Tk thread go straight through, writes from other threads are queued"""
+    WRITES = ('delete', 'start', 'stop', 'itemconfig', 'selection_clear')
+    
+    def __init__(self, widget, dispatcher, items=False):
+        self.widget = widget
+        self.dispatcher = dispatcher
+        self.items = items
+    
+    def __getattr__(self, name):
+        attr = getattr(self.widget, name)
+        if name in self.WRITES and not self.dispatcher.on_ui_thread():
+            return lambda *args, **kwargs: self.dispatcher.call(attr, *args, **kwargs)
+        return attr
+    
+    def __str__(self):
+        return str(self.widget)
+    
+    def insert(self, index, *values):
+        if self.dispatcher.on_ui_thread():
+            return self.widget.insert(index, *values)
+        if index == tk.END and len(values) == 1:
+            self.dispatcher.append(self.widget, values[0], self.items)
+        else:
+            self.dispatcher.call(self.widget.insert, index, *values)
+    
+    def see(self, index):
+        if self.dispatcher.on_ui_thread():
+            return self.widget.see(index)
+        self.dispatcher.see(self.widget, index)
+    
+    def config(self, **options):
+        if self.dispatcher.on_ui_thread():
+            return self.widget.config(**options)
+        self.dispatcher.configure(self.widget, **options)
+    
+    configure = config
 
 class SystemOptimizerComplete:
+    # Numeric columns that can be queried as time-bucketed series
+    SERIES_COLUMNS = {
+        'system_snapshots': ('cpu_usage', 'memory_usage', 'disk_usage', 'temperature', 'load_average'),
+        'system_health': ('health_score', 'critical_issues', 'warnings')
+    }
+    # Percentage-point change below which canvas bars and gauges are left alone
+    REDRAW_THRESHOLD = 0.5
+    # Cleanups that need root: commands to run and the directory whose shrinkage is what they freed
+    COMMAND_CLEANUPS = {
+        'apt_cache': (["sudo apt clean", "sudo apt autoclean"], "/var/cache/apt"),
+        'log_files': (["sudo journalctl --vacuum-time=30d"], "/var/log/journal")
+    }
+    # Console line logged before each cleanup category runs
+    CLEANUP_MESSAGES = {
+        'apt_cache': "🧹 Cleaning APT cache...",
+        'thumbnails': "🖼️ Clearing thumbnails...",
+        'temp_files': "📂 Removing temporary files...",
+        'chrome_cache': "🌐 Clearing Chrome cache...",
+        'firefox_cache': "🦊 Clearing Firefox cache...",
+        'log_files': "📋 Cleaning old logs..."
+    }
+    # Aggregate tables raw snapshots are compacted into, with their bucket size in seconds
+    ROLLUP_TABLES = {
+        'system_snapshots': (('system_snapshots_hourly', 3600), ('system_snapshots_daily', 86400))
+    }
+    
     def __init__(self, root):
+        self.startup_began = time.perf_counter()
         self.root = root
+        self.ui = UIDispatcher(root)
+        self.ui.start()
         self.root.title("System Optimizer Pro - Complete Edition v4.0")
         self.root.geometry("1200x800")
         self.root.configure(bg='#1a1a1a')
@@ -31,20 +1188,59 @@ class SystemOptimizerComplete:
         # Configuration and database
         self.config_file = os.path.expanduser("~/.system_optimizer_config.json")
         self.db_file = os.path.expanduser("~/.system_optimizer.db")
+        self.series_cache = OrderedDict()
+        self.series_cache_lock = threading.Lock()
+        self.console_backlog = []
         self.init_database()
         self.load_config()
         
-        # Setup GUI
+        # One sampler feeds every tab, the snapshot logger and the health score
+        self.sampler = SystemSampler(self.config.get('monitoring_interval', 5))
+        self.snapshot_writer = SnapshotWriter(self.db_file)
+        atexit.register(self.snapshot_writer.close)
+        self.dir_sizer = DirectorySizer()
+        self.cleanup_engine = CleanupEngine(max_age_days=self.config.get('temp_file_age_days', 7))
+        self.cleanup_plan = None
+        self.duplicate_finder = None
+        self.file_scanner = None
+        self.health_probes = HealthProbes()
+        self.last_health = None  # (score, critical, recommendations) from the latest refresh
+        self.register_health_probes()
+        self.du_index_file = os.path.expanduser("~/.system_optimizer_du.db")
+        self.du_index = None
+        self.du_index_lock = threading.Lock()
+        self.du_refresh_lock = threading.Lock()
+        self.space_path = os.path.expanduser("~")
+        self.space_lines = {}
+        
+        # Setup GUI: only the dashboard is built now, the other tabs on first selection
         self.setup_styles()
+        self.create_settings_vars()
         self.create_gui()
+        
+        # Background workers and data loads wait until the window has been drawn
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """Start deferred work once the first frame is on screen"""
+        elapsed_ms = (time.perf_counter() - self.startup_began) * 1000
+        print(f"⏱️ Window ready in {elapsed_ms:.0f}ms")
+        self.status_label.config(text=f"Ready ({elapsed_ms:.0f}ms startup)")
+        
+        self.load_recent_activity()
         self.update_system_info()
         self.start_background_monitoring()
+        self.auto_refresh_health()
+        self.root.after(120000, self.schedule_compaction)
         
     def init_database(self):
         """Initialize SQLite database"""
         conn = sqlite3.connect(self.db_file)
         cursor = conn.cursor()
         
+        # Only takes effect on a new database; compact_database converts older ones
+        cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+        
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS cleanup_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -60,6 +1256,7 @@ class SystemOptimizerComplete:
             CREATE TABLE IF NOT EXISTS system_snapshots (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
+                epoch INTEGER,
                 cpu_usage REAL,
                 memory_usage REAL,
                 disk_usage REAL,
@@ -95,6 +1292,7 @@ class SystemOptimizerComplete:
             CREATE TABLE IF NOT EXISTS system_health (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 timestamp TEXT NOT NULL,
+                epoch INTEGER,
                 health_score INTEGER NOT NULL,
                 critical_issues INTEGER DEFAULT 0,
                 warnings INTEGER DEFAULT 0,
@@ -113,7 +1311,28 @@ class SystemOptimizerComplete:
             )
         ''')
         
+        # Hourly/daily min, sum, max and count per metric for compacted snapshots
+        metrics = ', '.join(f"{c}_min REAL, {c}_sum REAL, {c}_max REAL, {c}_count INTEGER"
+                            for c in self.SERIES_COLUMNS['system_snapshots'])
+        for rollup, _ in self.ROLLUP_TABLES['system_snapshots']:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {rollup} (epoch INTEGER PRIMARY KEY, samples INTEGER, {metrics})")
+        
+        # Integer epoch seconds for range scans; older databases are migrated in place
+        for table in self.SERIES_COLUMNS:
+            columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+            if 'epoch' not in columns:
+                print(f"🔄 Adding epoch column to {table}...")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN epoch INTEGER")
+                cursor.execute(f"UPDATE {table} SET epoch = CAST(strftime('%s', timestamp, 'utc') AS INTEGER)")
+        cursor.execute('DROP INDEX IF EXISTS idx_snapshots_timestamp')
+        cursor.execute('DROP INDEX IF EXISTS idx_health_timestamp')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshots_epoch ON system_snapshots (epoch)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_health_epoch ON system_health (epoch)')
+        
         conn.commit()
+        
+        # WAL lets the snapshot writer commit while the GUI reads
+        cursor.execute('PRAGMA journal_mode=WAL')
         conn.close()
     
     def setup_styles(self):
@@ -154,7 +1373,16 @@ class SystemOptimizerComplete:
             'last_diagnostic_run': None,
             'system_health_alerts': True,
             'recovery_mode_available': True,
-            'permission_auto_fix': False
+            'permission_auto_fix': False,
+            'compaction_enabled': True,
+            'raw_retention_days': 7,
+            'hourly_retention_days': 90,
+            'daily_retention_days': 0,
+            'history_retention_days': 365,
+            'last_compaction': None,
+            'temp_file_age_days': 7,
+            'duplicate_roots': [],
+            'large_file_count': 25
         }
         
         try:
@@ -172,6 +1400,21 @@ class SystemOptimizerComplete:
         with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=2)
     
+    def create_settings_vars(self):
+        """Create settings variables (other tabs read them before Settings is built)"""
+        self.safe_mode = tk.BooleanVar(value=self.config.get('safe_mode', True))
+        self.auto_cleanup_enabled = tk.BooleanVar(value=self.config.get('auto_cleanup_enabled', False))
+        self.notifications_enabled = tk.BooleanVar(value=self.config.get('notifications_enabled', True))
+        self.auto_diagnostic_enabled = tk.BooleanVar(value=self.config.get('auto_diagnostic_enabled', True))
+        self.system_health_alerts = tk.BooleanVar(value=self.config.get('system_health_alerts', True))
+        self.permission_auto_fix = tk.BooleanVar(value=self.config.get('permission_auto_fix', False))
+        self.schedule_var = tk.StringVar(value=self.config.get('cleanup_schedule', 'weekly'))
+        self.diagnostic_schedule_var = tk.StringVar(value=self.config.get('diagnostic_schedule', 'weekly'))
+        self.compaction_enabled = tk.BooleanVar(value=self.config.get('compaction_enabled', True))
+        self.retention_vars = {key: tk.IntVar(value=self.config.get(key, 0)) for key in
+                               ('raw_retention_days', 'hourly_retention_days', 'daily_retention_days',
+                                'history_retention_days')}
+    
     def create_gui(self):
         """Create complete GUI"""
         # Header
@@ -190,29 +1433,52 @@ class SystemOptimizerComplete:
         
         self.info_canvas = tk.Canvas(self.info_frame, bg='#2a2a2a', height=60)
         self.info_canvas.pack(fill='both', expand=True, padx=10, pady=5)
+        self.create_info_bar_items()
         
         # Main notebook
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=5)
         
-        # Create all tabs
-        self.create_dashboard_tab()
-        self.create_health_dashboard_tab()
-        self.create_cleanup_tab()
-        self.create_optimization_tab()
-        self.create_monitoring_tab()
-        self.create_security_tab()
-        self.create_maintenance_tab()
-        self.create_settings_tab()
-        self.create_analytics_tab()
+        # Tab frames are added up front; their contents are built on first selection
+        tabs = [
+            ("📊 Dashboard", self.create_dashboard_tab),
+            ("🏥 Health Dashboard", self.create_health_dashboard_tab),
+            ("🧹 Advanced Cleanup", self.create_cleanup_tab),
+            ("⚡ Optimization", self.create_optimization_tab),
+            ("📊 System Monitor", self.create_monitoring_tab),
+            ("🛡️ Security", self.create_security_tab),
+            ("🔧 Maintenance", self.create_maintenance_tab),
+            ("⚙️ Settings", self.create_settings_tab),
+            ("📈 Analytics", self.create_analytics_tab)
+        ]
+        
+        self.pending_tabs = {}
+        for text, builder in tabs:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self.pending_tabs[str(frame)] = (text, frame, builder)
         
         # Status bar
         self.create_status_bar()
+        
+        self.build_tab(next(iter(self.pending_tabs)))
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+    
+    def on_tab_changed(self, event=None):
+        """Build the selected tab the first time it is shown"""
+        self.build_tab(str(self.notebook.select()))
     
-    def create_dashboard_tab(self):
+    def build_tab(self, tab_id):
+        """Run a tab's builder once and log how long it took"""
+        if tab_id not in self.pending_tabs:
+            return
+        text, frame, builder = self.pending_tabs.pop(tab_id)
+        started = time.perf_counter()
+        builder(frame)
+        print(f"⏱️ Built {text} tab in {(time.perf_counter() - started) * 1000:.0f}ms")
+    
+    def create_dashboard_tab(self, dashboard_frame):
         """Dashboard with system overview"""
-        dashboard_frame = ttk.Frame(self.notebook)
-        self.notebook.add(dashboard_frame, text="📊 Dashboard")
         
         # Quick actions
         actions_frame = tk.LabelFrame(dashboard_frame, text="Quick Actions", 
@@ -243,16 +1509,13 @@ class SystemOptimizerComplete:
                                       bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         activity_frame.pack(fill='both', expand=True, padx=10, pady=10)
         
-        self.activity_text = scrolledtext.ScrolledText(activity_frame, height=10, 
-                                                      bg='#1a1a1a', fg='white', font=('Courier', 10))
+        self.activity_text = self.ui.wrap(scrolledtext.ScrolledText(activity_frame, height=10, 
+                                                                   bg='#1a1a1a', fg='white', font=('Courier', 10)))
         self.activity_text.pack(fill='both', expand=True, padx=10, pady=10)
-        
-        self.load_recent_activity()
+        self.activity_text.insert(tk.END, "Loading recent activity...")
     
-    def create_health_dashboard_tab(self):
+    def create_health_dashboard_tab(self, health_frame):
         """System Health Dashboard with real-time monitoring"""
-        health_frame = ttk.Frame(self.notebook)
-        self.notebook.add(health_frame, text="🏥 Health Dashboard")
         
         main_frame = tk.Frame(health_frame, bg='#1a1a1a')
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -264,6 +1527,7 @@ class SystemOptimizerComplete:
         
         self.health_canvas = tk.Canvas(score_frame, bg='#2a2a2a', height=80)
         self.health_canvas.pack(fill='x', padx=10, pady=10)
+        self.create_health_gauge()
         
         # Critical Issues Panel
         issues_frame = tk.LabelFrame(main_frame, text="Critical Issues & Recommendations", 
@@ -280,16 +1544,16 @@ class SystemOptimizerComplete:
         tk.Label(issues_left, text="Critical Issues:", bg='#2a2a2a', fg='#ff6b6b', 
                 font=('Arial', 11, 'bold')).pack(anchor='w', pady=(5,0))
         
-        self.critical_listbox = tk.Listbox(issues_left, bg='#1a1a1a', fg='#ff6b6b', 
-                                          font=('Courier', 9), height=8)
+        self.critical_listbox = self.ui.wrap(tk.Listbox(issues_left, bg='#1a1a1a', fg='#ff6b6b', 
+                                                       font=('Courier', 9), height=8), items=True)
         self.critical_listbox.pack(fill='both', expand=True, pady=5)
         
         # Recommendations List  
         tk.Label(issues_right, text="Recommendations:", bg='#2a2a2a', fg='#00ff88', 
                 font=('Arial', 11, 'bold')).pack(anchor='w', pady=(5,0))
         
-        self.recommendations_listbox = tk.Listbox(issues_right, bg='#1a1a1a', fg='#00ff88', 
-                                                 font=('Courier', 9), height=8)
+        self.recommendations_listbox = self.ui.wrap(tk.Listbox(issues_right, bg='#1a1a1a', fg='#00ff88', 
+                                                              font=('Courier', 9), height=8), items=True)
         self.recommendations_listbox.pack(fill='both', expand=True, pady=5)
         
         # Action Buttons
@@ -308,14 +1572,16 @@ class SystemOptimizerComplete:
         tk.Button(actions_frame, text="📊 Health History", command=self.show_health_history,
                  bg='#9c27b0', fg='white', font=('Arial', 11, 'bold')).pack(side='left', padx=5)
         
-        # Auto-refresh health dashboard
-        self.refresh_health_dashboard()
-        self.auto_refresh_health()
+        # The periodic refresh runs from startup; show its latest result right away
+        if self.last_health:
+            score, critical, recommendations = self.last_health
+            self.draw_health_score(score)
+            self.show_health_lists(critical, recommendations)
+        else:
+            self.refresh_health_dashboard()
     
-    def create_cleanup_tab(self):
+    def create_cleanup_tab(self, cleanup_frame):
         """Advanced cleanup functionality"""
-        cleanup_frame = ttk.Frame(self.notebook)
-        self.notebook.add(cleanup_frame, text="🧹 Advanced Cleanup")
         
         # Categories
         categories_frame = tk.LabelFrame(cleanup_frame, text="Cleanup Categories", 
@@ -338,7 +1604,8 @@ class SystemOptimizerComplete:
             ("System Files", [
                 ('temp_files', 'Temporary Files', True),
                 ('log_files', 'Old Log Files', False),
-                ('crash_dumps', 'Crash Dumps', True)
+                ('crash_dumps', 'Crash Dumps', True),
+                ('duplicates', 'Duplicate Files (report only)', False)
             ])
         ]
         
@@ -363,19 +1630,26 @@ class SystemOptimizerComplete:
         tk.Button(control_frame, text="🚀 Start Cleanup", command=self.start_advanced_cleanup,
                  bg='#4caf50', fg='white', font=('Arial', 12, 'bold')).pack(fill='x', pady=5)
         
+        tk.Button(control_frame, text="📁 Duplicate Folders...", command=self.choose_duplicate_roots,
+                 bg='#607d8b', fg='white', font=('Arial', 10)).pack(fill='x', pady=5)
+        
+        tk.Button(control_frame, text="🔎 Find Large & Stale Files", command=self.find_large_files,
+                 bg='#607d8b', fg='white', font=('Arial', 10)).pack(fill='x', pady=5)
+        
         # Output console
         console_frame = tk.LabelFrame(control_frame, text="Cleanup Console", 
                                      bg='#2a2a2a', fg='white', font=('Arial', 10, 'bold'))
         console_frame.pack(fill='both', expand=True, pady=10)
         
-        self.cleanup_console = scrolledtext.ScrolledText(console_frame, height=15, 
-                                                        bg='#000000', fg='#00ff00', font=('Courier', 9))
+        self.cleanup_console = self.ui.wrap(scrolledtext.ScrolledText(console_frame, height=15, 
+                                                                     bg='#000000', fg='#00ff00', font=('Courier', 9)))
         self.cleanup_console.pack(fill='both', expand=True, padx=5, pady=5)
+        self.cleanup_console.insert(tk.END, ''.join(self.console_backlog))
+        self.cleanup_console.see(tk.END)
+        self.console_backlog.clear()
     
-    def create_optimization_tab(self):
+    def create_optimization_tab(self, opt_frame):
         """System optimization features"""
-        opt_frame = ttk.Frame(self.notebook)
-        self.notebook.add(opt_frame, text="⚡ Optimization")
         
         main_frame = tk.Frame(opt_frame, bg='#1a1a1a')
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -422,10 +1696,8 @@ class SystemOptimizerComplete:
                  command=lambda: self.set_power_mode('balanced'),
                  bg='#2196f3', fg='white').pack(side='left', padx=5)
     
-    def create_monitoring_tab(self):
+    def create_monitoring_tab(self, monitor_frame):
         """Real-time system monitoring"""
-        monitor_frame = ttk.Frame(self.notebook)
-        self.notebook.add(monitor_frame, text="📊 System Monitor")
         
         # Control panel
         control_panel = tk.Frame(monitor_frame, bg='#1a1a1a')
@@ -449,16 +1721,15 @@ class SystemOptimizerComplete:
                                        bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         monitor_display.pack(fill='both', expand=True, padx=10, pady=10)
         
-        self.monitor_text = scrolledtext.ScrolledText(monitor_display, bg='#000000', fg='#00ff00',
-                                                     font=('Courier', 11))
+        self.monitor_text = self.ui.wrap(scrolledtext.ScrolledText(monitor_display, bg='#000000', fg='#00ff00',
+                                                                  font=('Courier', 11)))
         self.monitor_text.pack(fill='both', expand=True, padx=10, pady=10)
         
-        self.refresh_monitoring()
+        # Samples CPU for a second; let the tab draw first
+        self.root.after_idle(self.refresh_monitoring)
     
-    def create_security_tab(self):
+    def create_security_tab(self, security_frame):
         """Security analysis and hardening"""
-        security_frame = ttk.Frame(self.notebook)
-        self.notebook.add(security_frame, text="🛡️ Security")
         
         main_frame = tk.Frame(security_frame, bg='#1a1a1a')
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -491,14 +1762,12 @@ class SystemOptimizerComplete:
                                        bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         security_output.pack(fill='both', expand=True, pady=10)
         
-        self.security_text = scrolledtext.ScrolledText(security_output, bg='#1a1a1a', fg='white',
-                                                      font=('Courier', 10))
+        self.security_text = self.ui.wrap(scrolledtext.ScrolledText(security_output, bg='#1a1a1a', fg='white',
+                                                                   font=('Courier', 10)))
         self.security_text.pack(fill='both', expand=True, padx=10, pady=10)
     
-    def create_maintenance_tab(self):
+    def create_maintenance_tab(self, maintenance_frame):
         """System maintenance features"""
-        maintenance_frame = ttk.Frame(self.notebook)
-        self.notebook.add(maintenance_frame, text="🔧 Maintenance")
         
         main_frame = tk.Frame(maintenance_frame, bg='#1a1a1a')
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -535,14 +1804,12 @@ class SystemOptimizerComplete:
                                     bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         maint_output.pack(fill='both', expand=True, pady=10)
         
-        self.maintenance_text = scrolledtext.ScrolledText(maint_output, bg='#1a1a1a', fg='white',
-                                                         font=('Courier', 10))
+        self.maintenance_text = self.ui.wrap(scrolledtext.ScrolledText(maint_output, bg='#1a1a1a', fg='white',
+                                                                      font=('Courier', 10)))
         self.maintenance_text.pack(fill='both', expand=True, padx=10, pady=10)
     
-    def create_settings_tab(self):
+    def create_settings_tab(self, settings_frame):
         """Application settings"""
-        settings_frame = ttk.Frame(self.notebook)
-        self.notebook.add(settings_frame, text="⚙️ Settings")
         
         main_frame = tk.Frame(settings_frame, bg='#1a1a1a')
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -552,27 +1819,21 @@ class SystemOptimizerComplete:
                                      bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         general_frame.pack(fill='x', pady=10)
         
-        self.safe_mode = tk.BooleanVar(value=self.config.get('safe_mode', True))
         tk.Checkbutton(general_frame, text="Safe Mode (Prevent dangerous operations)", 
                       variable=self.safe_mode, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
         
-        self.auto_cleanup_enabled = tk.BooleanVar(value=self.config.get('auto_cleanup_enabled', False))
         tk.Checkbutton(general_frame, text="Enable automatic cleanup", 
                       variable=self.auto_cleanup_enabled, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
         
-        self.notifications_enabled = tk.BooleanVar(value=self.config.get('notifications_enabled', True))
         tk.Checkbutton(general_frame, text="Enable desktop notifications", 
                       variable=self.notifications_enabled, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
         
-        self.auto_diagnostic_enabled = tk.BooleanVar(value=self.config.get('auto_diagnostic_enabled', True))
         tk.Checkbutton(general_frame, text="Enable automatic diagnostics", 
                       variable=self.auto_diagnostic_enabled, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
         
-        self.system_health_alerts = tk.BooleanVar(value=self.config.get('system_health_alerts', True))
         tk.Checkbutton(general_frame, text="Enable system health alerts", 
                       variable=self.system_health_alerts, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
         
-        self.permission_auto_fix = tk.BooleanVar(value=self.config.get('permission_auto_fix', False))
         tk.Checkbutton(general_frame, text="Auto-fix permission issues (Advanced)", 
                       variable=self.permission_auto_fix, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
         
@@ -582,25 +1843,48 @@ class SystemOptimizerComplete:
         schedule_frame.pack(fill='x', pady=10)
         
         tk.Label(schedule_frame, text="Cleanup Schedule:", bg='#2a2a2a', fg='white').pack(anchor='w', padx=10)
-        self.schedule_var = tk.StringVar(value=self.config.get('cleanup_schedule', 'weekly'))
         schedule_combo = ttk.Combobox(schedule_frame, textvariable=self.schedule_var,
                                     values=['daily', 'weekly', 'monthly'])
         schedule_combo.pack(anchor='w', padx=10, pady=5)
         
         tk.Label(schedule_frame, text="Diagnostic Schedule:", bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=(10,0))
-        self.diagnostic_schedule_var = tk.StringVar(value=self.config.get('diagnostic_schedule', 'weekly'))
         diag_schedule_combo = ttk.Combobox(schedule_frame, textvariable=self.diagnostic_schedule_var,
                                          values=['daily', 'weekly', 'monthly', 'never'])
         diag_schedule_combo.pack(anchor='w', padx=10, pady=5)
         
+        # Data retention
+        retention_frame = tk.LabelFrame(main_frame, text="Data Retention", 
+                                       bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
+        retention_frame.pack(fill='x', pady=10)
+        
+        tk.Checkbutton(retention_frame, text="Compact database automatically when idle", 
+                      variable=self.compaction_enabled, bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=2)
+        
+        retention_fields = [
+            ('raw_retention_days', "Keep raw snapshots (days):"),
+            ('hourly_retention_days', "Keep hourly aggregates (days):"),
+            ('daily_retention_days', "Keep daily aggregates (days, 0 = forever):"),
+            ('history_retention_days', "Keep health & cleanup history (days, 0 = forever):")
+        ]
+        for key, text in retention_fields:
+            row = tk.Frame(retention_frame, bg='#2a2a2a')
+            row.pack(fill='x', padx=10, pady=2)
+            tk.Label(row, text=text, bg='#2a2a2a', fg='white').pack(side='left')
+            tk.Spinbox(row, from_=0, to=3650, width=6, textvariable=self.retention_vars[key]).pack(side='right')
+        
+        compact_row = tk.Frame(retention_frame, bg='#2a2a2a')
+        compact_row.pack(fill='x', padx=10, pady=5)
+        tk.Button(compact_row, text="🗜️ Compact Now", command=self.run_compaction,
+                 bg='#2196f3', fg='white').pack(side='left')
+        self.compaction_status = tk.Label(compact_row, text=self.describe_compaction(), bg='#2a2a2a', fg='#00ff88')
+        self.compaction_status.pack(side='left', padx=10)
+        
         # Save settings button
         tk.Button(main_frame, text="💾 Save Settings", command=self.save_all_settings,
                  bg='#4caf50', fg='white', font=('Arial', 12, 'bold')).pack(pady=20)
     
-    def create_analytics_tab(self):
+    def create_analytics_tab(self, analytics_frame):
         """System analytics and reporting"""
-        analytics_frame = ttk.Frame(self.notebook)
-        self.notebook.add(analytics_frame, text="📈 Analytics")
         
         main_frame = tk.Frame(analytics_frame, bg='#1a1a1a')
         main_frame.pack(fill='both', expand=True, padx=10, pady=10)
@@ -619,7 +1903,9 @@ class SystemOptimizerComplete:
             ("💾", "Space Analysis", self.show_space_analysis),
             ("🕒", "System History", self.show_system_history),
             ("📋", "Full Report", self.generate_full_report),
-            ("📤", "Export Data", self.export_analytics_data)
+            ("📤", "Export Data", self.export_analytics_data),
+            ("🔎", "Large Files", self.show_large_files),
+            ("⏹️", "Stop Scan", self.cancel_file_scan)
         ]
         
         for i, (icon, text, command) in enumerate(analytics_buttons):
@@ -633,9 +1919,10 @@ class SystemOptimizerComplete:
                                          bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         analytics_display.pack(fill='both', expand=True, pady=10)
         
-        self.analytics_text = scrolledtext.ScrolledText(analytics_display, bg='#1a1a1a', fg='white',
-                                                       font=('Courier', 10))
+        self.analytics_text = self.ui.wrap(scrolledtext.ScrolledText(analytics_display, bg='#1a1a1a', fg='white',
+                                                                    font=('Courier', 10)))
         self.analytics_text.pack(fill='both', expand=True, padx=10, pady=10)
+        self.analytics_text.bind('<Double-Button-1>', self.on_analytics_double_click)
     
     def create_status_bar(self):
         """Create status bar"""
@@ -643,93 +1930,82 @@ class SystemOptimizerComplete:
         self.status_frame.pack(fill='x', side='bottom')
         self.status_frame.pack_propagate(False)
         
-        self.status_label = tk.Label(self.status_frame, text="Ready", 
-                                    bg='#2a2a2a', fg='white', font=('Arial', 10))
+        self.status_label = self.ui.wrap(tk.Label(self.status_frame, text="Ready", 
+                                                 bg='#2a2a2a', fg='white', font=('Arial', 10)))
         self.status_label.pack(side='left', padx=10, pady=5)
         
-        self.progress_bar = ttk.Progressbar(self.status_frame, length=200, mode='determinate')
+        self.progress_bar = self.ui.wrap(ttk.Progressbar(self.status_frame, length=200, mode='determinate'))
         self.progress_bar.pack(side='right', padx=10, pady=5)
     
     # ALL THE METHODS - FULLY IMPLEMENTED
     
+    def usage_color(self, percent):
+        """Bar color for a usage percentage"""
+        return '#4caf50' if percent < 50 else '#ffa500' if percent < 80 else '#ff6b6b'
+    
+    def create_info_bar_items(self):
+        """Create the info panel's canvas items once; update_system_info only moves and recolors them"""
+        canvas = self.info_canvas
+        y_pos = 30
+        canvas.create_rectangle(0, 0, 1200, 60, fill='#2a2a2a', outline='')
+        
+        self.info_items = {}
+        for key, label, label_x, bar_x, text_x in (('cpu', "CPU:", 50, 80, 250),
+                                                   ('memory', "RAM:", 300, 330, 500),
+                                                   ('disk', "DISK:", 550, 590, 760)):
+            canvas.create_text(label_x, y_pos, text=label, fill='white', font=('Arial', 10, 'bold'))
+            canvas.create_rectangle(bar_x, y_pos-8, bar_x+150, y_pos+8, fill='#3a3a3a', outline='')
+            self.info_items[key] = {
+                'x': bar_x,
+                'value': None,
+                'bar': canvas.create_rectangle(bar_x, y_pos-8, bar_x, y_pos+8, fill='#4caf50', outline=''),
+                'text': canvas.create_text(text_x, y_pos, text="--", fill='white')
+            }
+        
+        self.info_clock = canvas.create_text(1000, y_pos, text="", fill='#00ff88', font=('Arial', 12, 'bold'))
+    
     def update_system_info(self):
         """Update system info panel"""
         def update_loop():
+            snapshot = self.sampler.latest()
             try:
-                self.info_canvas.delete("all")
-                
-                disk = psutil.disk_usage('/')
-                memory = psutil.virtual_memory()
-                cpu_percent = psutil.cpu_percent()
-                
-                self.info_canvas.create_rectangle(0, 0, 1200, 60, fill='#2a2a2a', outline='')
-                
-                y_pos = 30
-                
-                # CPU
-                self.info_canvas.create_text(50, y_pos, text="CPU:", fill='white', font=('Arial', 10, 'bold'))
-                cpu_width = int(cpu_percent * 1.5)
-                self.info_canvas.create_rectangle(80, y_pos-8, 230, y_pos+8, fill='#3a3a3a', outline='')
-                color = '#4caf50' if cpu_percent < 50 else '#ffa500' if cpu_percent < 80 else '#ff6b6b'
-                self.info_canvas.create_rectangle(80, y_pos-8, 80+cpu_width, y_pos+8, fill=color, outline='')
-                self.info_canvas.create_text(250, y_pos, text=f"{cpu_percent:.1f}%", fill='white')
+                self.info_canvas.itemconfig(self.info_clock, text=datetime.now().strftime('%H:%M:%S'))
                 
-                # Memory  
-                self.info_canvas.create_text(300, y_pos, text="RAM:", fill='white', font=('Arial', 10, 'bold'))
-                mem_width = int(memory.percent * 1.5)
-                self.info_canvas.create_rectangle(330, y_pos-8, 480, y_pos+8, fill='#3a3a3a', outline='')
-                color = '#4caf50' if memory.percent < 50 else '#ffa500' if memory.percent < 80 else '#ff6b6b'
-                self.info_canvas.create_rectangle(330, y_pos-8, 330+mem_width, y_pos+8, fill=color, outline='')
-                self.info_canvas.create_text(500, y_pos, text=f"{memory.percent:.1f}%", fill='white')
-                
-                # Disk
-                disk_percent = (disk.used / disk.total) * 100
-                self.info_canvas.create_text(550, y_pos, text="DISK:", fill='white', font=('Arial', 10, 'bold'))
-                disk_width = int(disk_percent * 1.5)
-                self.info_canvas.create_rectangle(590, y_pos-8, 740, y_pos+8, fill='#3a3a3a', outline='')
-                color = '#4caf50' if disk_percent < 50 else '#ffa500' if disk_percent < 80 else '#ff6b6b'
-                self.info_canvas.create_rectangle(590, y_pos-8, 590+disk_width, y_pos+8, fill=color, outline='')
-                self.info_canvas.create_text(760, y_pos, text=f"{disk_percent:.1f}%", fill='white')
-                
-                # Time
-                current_time = datetime.now().strftime('%H:%M:%S')
-                self.info_canvas.create_text(1000, y_pos, text=current_time, fill='#00ff88', 
-                                           font=('Arial', 12, 'bold'))
+                if snapshot is not None:
+                    values = {'cpu': snapshot['cpu_percent'], 'memory': snapshot['memory'].percent,
+                              'disk': snapshot['disk_percent']}
+                    for key, percent in values.items():
+                        item = self.info_items[key]
+                        if item['value'] is not None and abs(percent - item['value']) < self.REDRAW_THRESHOLD:
+                            continue
+                        item['value'] = percent
+                        x = item['x']
+                        self.info_canvas.coords(item['bar'], x, 22, x + int(percent * 1.5), 38)
+                        self.info_canvas.itemconfig(item['bar'], fill=self.usage_color(percent))
+                        self.info_canvas.itemconfig(item['text'], text=f"{percent:.1f}%")
                 
             except Exception as e:
                 print(f"Error updating info panel: {e}")
             
-            self.root.after(2000, update_loop)
+            self.root.after(2000 if snapshot is not None else 250, update_loop)
         
         update_loop()
     
     def start_background_monitoring(self):
         """Start background monitoring"""
-        def monitor_loop():
-            while True:
-                try:
-                    cpu_usage = psutil.cpu_percent()
-                    memory = psutil.virtual_memory()
-                    disk = psutil.disk_usage('/')
-                    
-                    conn = sqlite3.connect(self.db_file)
-                    cursor = conn.cursor()
-                    cursor.execute('''
-                        INSERT INTO system_snapshots 
-                        (timestamp, cpu_usage, memory_usage, disk_usage)
-                        VALUES (?, ?, ?, ?)
-                    ''', (datetime.now().isoformat(), cpu_usage, memory.percent, 
-                          (disk.used / disk.total) * 100))
-                    conn.commit()
-                    conn.close()
-                    
-                except Exception as e:
-                    print(f"Background monitoring error: {e}")
-                
-                time.sleep(self.config.get('monitoring_interval', 5))
-        
-        monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
-        monitor_thread.start()
+        self.sampler.subscribe(self.record_snapshot)
+        self.sampler.start()
+    
+    def record_snapshot(self, snapshot):
+        """Queue a sampler snapshot for system_snapshots (runs on the sampler thread)"""
+        try:
+            self.snapshot_writer.add((
+                snapshot['timestamp'].isoformat(), int(snapshot['timestamp'].timestamp()),
+                snapshot['cpu_percent'], snapshot['memory'].percent,
+                snapshot['disk_percent'], snapshot['load_average']
+            ))
+        except Exception as e:
+            print(f"Background monitoring error: {e}")
     
     # DASHBOARD METHODS
     def quick_cleanup(self):
@@ -739,27 +2015,24 @@ class SystemOptimizerComplete:
             self.status_label.config(text="Performing quick cleanup...")
             self.progress_bar.start()
             
-            commands = [
-                ("sudo apt clean", "Cleaning APT cache"),
-                ("sudo apt autoremove -y", "Removing unused packages"),
-                ("rm -rf ~/.cache/thumbnails/*", "Clearing thumbnails"),
-                ("find ~/.cache -name '*.tmp' -delete", "Removing temp files"),
-                ("sudo journalctl --vacuum-time=7d", "Cleaning system logs")
-            ]
-            
-            space_before = self.get_disk_usage()
-            
-            for cmd, desc in commands:
-                self.log_to_console(f"🔄 {desc}")
-                self.run_command_silent(cmd)
-            
-            space_after = self.get_disk_usage()
-            space_freed = space_before - space_after
+            plan = self.cleanup_engine.scan(['thumbnails', 'cache_tmp'])
+            space_freed = 0
+            
+            self.log_to_console("🔄 Cleaning APT cache")
+            space_freed += self.run_measured_cleanup("Quick Cleanup", 'apt_cache', ["sudo apt clean"], "/var/cache/apt")
+            self.log_to_console("🔄 Removing unused packages")
+            self.run_command_silent("sudo apt autoremove -y")
+            self.log_to_console("🔄 Clearing thumbnails")
+            space_freed += self.run_cleanup_category("Quick Cleanup", 'thumbnails', plan)
+            self.log_to_console("🔄 Removing temp files")
+            space_freed += self.run_cleanup_category("Quick Cleanup", 'cache_tmp', plan)
+            self.log_to_console("🔄 Cleaning system logs")
+            space_freed += self.run_measured_cleanup("Quick Cleanup", 'log_files', ["sudo journalctl --vacuum-time=7d"],
+                                                     "/var/log/journal")
             
             self.progress_bar.stop()
             self.status_label.config(text="Quick cleanup completed")
             self.log_to_console(f"✅ Quick cleanup complete! Freed: {self.format_bytes(space_freed)}")
-            self.save_to_history("Quick Cleanup", f"Freed {self.format_bytes(space_freed)}")
             self.show_notification("Cleanup Complete", f"Freed {self.format_bytes(space_freed)}")
         
         threading.Thread(target=cleanup_thread, daemon=True).start()
@@ -791,12 +2064,13 @@ class SystemOptimizerComplete:
             
             # System info
             self.log_to_console("\n📊 SYSTEM INFORMATION:")
-            self.log_to_console(f"CPU: {psutil.cpu_count()} cores @ {psutil.cpu_percent()}% usage")
+            snapshot = self.sampler.get()
+            self.log_to_console(f"CPU: {snapshot['cpu_count']} cores @ {snapshot['cpu_percent']}% usage")
             
-            memory = psutil.virtual_memory()
+            memory = snapshot['memory']
             self.log_to_console(f"Memory: {self.format_bytes(memory.used)}/{self.format_bytes(memory.total)} ({memory.percent:.1f}%)")
             
-            disk = psutil.disk_usage('/')
+            disk = snapshot['disk']
             self.log_to_console(f"Disk: {self.format_bytes(disk.used)}/{self.format_bytes(disk.total)} ({disk.used/disk.total*100:.1f}%)")
             
             # Large files analysis
@@ -832,6 +2106,7 @@ class SystemOptimizerComplete:
             cpu_info = subprocess.run("lscpu | head -10", shell=True, capture_output=True, text=True)
             memory_info = subprocess.run("free -h", shell=True, capture_output=True, text=True)
             disk_info = subprocess.run("df -h", shell=True, capture_output=True, text=True)
+            snapshot = self.sampler.get()
             
             # Create report
             report_data = {
@@ -842,9 +2117,9 @@ class SystemOptimizerComplete:
                     'disk': disk_info.stdout
                 },
                 'performance': {
-                    'cpu_usage': psutil.cpu_percent(),
-                    'memory_usage': psutil.virtual_memory().percent,
-                    'disk_usage': (psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100
+                    'cpu_usage': snapshot['cpu_percent'],
+                    'memory_usage': snapshot['memory'].percent,
+                    'disk_usage': snapshot['disk_percent']
                 }
             }
             
@@ -913,65 +2188,130 @@ class SystemOptimizerComplete:
     
     # CLEANUP METHODS
     def estimate_cleanup_space(self):
-        """Estimate space that can be freed"""
+        """Estimate space that can be freed (the scan is kept and reused by Start Cleanup)"""
         def estimate_thread():
             self.log_to_console("📊 Estimating cleanup space...")
+            started = time.perf_counter()
+            selected = [category for category, var in self.cleanup_vars.items() if var.get()]
+            plan = self.scan_cleanup(selected)
             total_estimate = 0
             
-            estimates = {
-                'apt_cache': self.get_directory_size("/var/cache/apt/"),
-                'thumbnails': self.get_directory_size(os.path.expanduser("~/.cache/thumbnails/")),
-                'temp_files': self.get_directory_size("/tmp/"),
-                'browser_cache': self.get_directory_size(os.path.expanduser("~/.cache/")) // 2  # Estimate
-            }
+            for category, found in plan.items():
+                total_estimate += found['bytes']
+                self.log_to_console(f"  {category}: {self.format_bytes(found['bytes'])} "
+                                    f"in {len(found['files']):,} files")
             
-            for category, size in estimates.items():
-                if self.cleanup_vars.get(category, tk.BooleanVar()).get():
+            for category, (commands, path) in self.COMMAND_CLEANUPS.items():
+                if category in selected:
+                    size = self.get_directory_size(path)
                     total_estimate += size
-                    self.log_to_console(f"  {category}: {self.format_bytes(size)}")
+                    self.log_to_console(f"  {category}: up to {self.format_bytes(size)}")
+            
+            # Duplicates count toward the total but are only reported, never removed by cleanup
+            duplicate_bytes = self.report_duplicates() if 'duplicates' in selected else 0
+            total_estimate += duplicate_bytes
+            duplicate_note = f", {self.format_bytes(duplicate_bytes)} of it duplicates (report only)" if duplicate_bytes else ""
             
-            self.log_to_console(f"📊 Total estimated space to free: {self.format_bytes(total_estimate)}")
+            self.log_to_console(f"📊 Total estimated space to free: {self.format_bytes(total_estimate)} "
+                                f"(scanned in {time.perf_counter() - started:.1f}s{duplicate_note})")
         
         threading.Thread(target=estimate_thread, daemon=True).start()
     
+    def scan_cleanup(self, categories):
+        """Scan the file-based cleanup categories and keep the plan for the cleanup that follows"""
+        categories = [category for category in categories if category in CleanupEngine.CATEGORIES]
+        self.cleanup_engine.max_age_days = self.config.get('temp_file_age_days', 7)
+        plan = self.cleanup_engine.scan(categories)
+        self.cleanup_plan = (time.monotonic(), plan)
+        return plan
+    
+    def take_cleanup_plan(self, categories):
+        """The estimate's scan if it is recent and covers categories, otherwise a fresh scan"""
+        categories = [category for category in categories if category in CleanupEngine.CATEGORIES]
+        cached, self.cleanup_plan = self.cleanup_plan, None
+        if cached and time.monotonic() - cached[0] < 600 and set(categories) <= set(cached[1]):
+            return {category: cached[1][category] for category in categories}
+        return self.scan_cleanup(categories)
+    
+    def choose_duplicate_roots(self):
+        """Add a folder to search for duplicates (Cancel clears the list)"""
+        folder = filedialog.askdirectory(title="Folder to search for duplicate files",
+                                         initialdir=os.path.expanduser("~"))
+        roots = self.config.setdefault('duplicate_roots', [])
+        if folder:
+            if folder not in roots:
+                roots.append(folder)
+        elif roots and messagebox.askyesno("Duplicate Folders", "Clear the list of duplicate folders?"):
+            roots.clear()
+        self.save_config()
+        self.log_to_console(f"📁 Duplicate folders: {', '.join(roots) or 'none'}")
+    
+    def report_duplicates(self):
+        """Find duplicates under the chosen folders and log what removing the extra copies would free;
+        returns those bytes (0 when nothing was searched)"""
+        roots = [root for root in self.config.get('duplicate_roots', []) if os.path.isdir(root)]
+        if not roots:
+            self.log_to_console("♻️ Duplicates: choose folders with 📁 Duplicate Folders... first")
+            return 0
+        
+        self.log_to_console(f"♻️ Searching {len(roots)} folder(s) for duplicates...")
+        try:
+            if self.duplicate_finder is None:
+                self.duplicate_finder = DuplicateFinder(os.path.expanduser("~/.system_optimizer_hashes.db"))
+            stats = self.duplicate_finder.find(roots)
+        except Exception as e:
+            self.log_to_console(f"❌ Duplicate search failed: {e}")
+            return 0
+        self.log_to_console(f"♻️ Duplicates: {self.format_bytes(stats['bytes'])} reclaimable in "
+                            f"{stats['files']:,} extra copies ({stats['groups']:,} groups, "
+                            f"{self.format_bytes(stats['hashed'])} hashed in {stats['seconds']:.1f}s)")
+        for wasted, size, paths in stats['largest']:
+            self.log_to_console(f"  {self.format_bytes(wasted)} wasted: {len(paths)} × {self.format_bytes(size)}")
+            for path in paths:
+                self.log_to_console(f"    {path}")
+        return stats['bytes']
+    
+    def run_cleanup_category(self, action, category, plan):
+        """Delete one scanned category and record exactly what it freed"""
+        freed, removed, seconds = self.cleanup_engine.delete(plan[category])
+        self.log_to_console(f"  {category}: removed {removed:,} files, freed {self.format_bytes(freed)}")
+        if removed:
+            self.save_to_history(action, f"{category}: {removed:,} files, {self.format_bytes(freed)}", freed, seconds)
+        return freed
+    
+    def run_measured_cleanup(self, action, category, commands, path):
+        """Run root cleanup commands; what they freed is how much path shrank.
+        Both sizes come from fresh scans: journal files grow in place, so cached listings undercount."""
+        started = time.perf_counter()
+        before = self.get_directory_size(path, fresh=True)
+        for command in commands:
+            self.run_command_silent(command)
+        freed = max(0, before - self.get_directory_size(path, fresh=True))
+        self.log_to_console(f"  {category}: freed {self.format_bytes(freed)}")
+        self.save_to_history(action, f"{category}: {self.format_bytes(freed)}", freed,
+                             time.perf_counter() - started)
+        return freed
+    
     def start_advanced_cleanup(self):
         """Start advanced cleanup based on selections"""
         def cleanup_thread():
             self.log_to_console("🚀 Starting advanced cleanup...")
-            space_before = self.get_disk_usage()
-            
-            if self.cleanup_vars['apt_cache'].get():
-                self.log_to_console("🧹 Cleaning APT cache...")
-                self.run_command_silent("sudo apt clean")
-                self.run_command_silent("sudo apt autoclean")
-            
-            if self.cleanup_vars['thumbnails'].get():
-                self.log_to_console("🖼️ Clearing thumbnails...")
-                self.run_command_silent("rm -rf ~/.cache/thumbnails/*")
-                self.run_command_silent("rm -rf ~/.thumbnails/*")
-            
-            if self.cleanup_vars['temp_files'].get():
-                self.log_to_console("📂 Removing temporary files...")
-                self.run_command_silent("find /tmp -type f -atime +7 -delete 2>/dev/null")
-                self.run_command_silent("find ~/.cache -name '*.tmp' -delete 2>/dev/null")
-            
-            if self.cleanup_vars['chrome_cache'].get():
-                self.log_to_console("🌐 Clearing Chrome cache...")
-                self.run_command_silent("rm -rf ~/.cache/google-chrome/*/Cache/* 2>/dev/null")
-            
-            if self.cleanup_vars['firefox_cache'].get():
-                self.log_to_console("🦊 Clearing Firefox cache...")
-                self.run_command_silent("rm -rf ~/.cache/mozilla/firefox/*/cache2/* 2>/dev/null")
-            
-            if self.cleanup_vars['log_files'].get():
-                self.log_to_console("📋 Cleaning old logs...")
-                self.run_command_silent("sudo journalctl --vacuum-time=30d")
-            
-            space_after = self.get_disk_usage()
-            space_freed = space_before - space_after
+            selected = [category for category, var in self.cleanup_vars.items() if var.get()]
+            plan = self.take_cleanup_plan(selected)
+            space_freed = 0
+            
+            for category in selected:
+                if category == 'duplicates':
+                    self.log_to_console("♻️ Duplicate files are reported by Estimate Space, never deleted automatically")
+                elif category in plan:
+                    self.log_to_console(self.CLEANUP_MESSAGES.get(category, f"🧹 Cleaning {category}..."))
+                    space_freed += self.run_cleanup_category("Advanced Cleanup", category, plan)
+                elif category in self.COMMAND_CLEANUPS:
+                    self.log_to_console(self.CLEANUP_MESSAGES[category])
+                    commands, path = self.COMMAND_CLEANUPS[category]
+                    space_freed += self.run_measured_cleanup("Advanced Cleanup", category, commands, path)
             
             self.log_to_console(f"✅ Advanced cleanup complete! Freed: {self.format_bytes(space_freed)}")
-            self.save_to_history("Advanced Cleanup", f"Freed {self.format_bytes(space_freed)}")
             self.show_notification("Advanced Cleanup Complete", f"Freed {self.format_bytes(space_freed)}")
         
         threading.Thread(target=cleanup_thread, daemon=True).start()
@@ -1027,44 +2367,51 @@ class SystemOptimizerComplete:
     
     # MONITORING METHODS
     def refresh_monitoring(self):
-        """Refresh monitoring display"""
+        """Refresh monitoring display from the latest sampler snapshot"""
+        snapshot = self.sampler.latest()
+        self.sampler.want_processes()
+        if snapshot is None or snapshot['top_processes'] is None:
+            self.monitor_text.delete('1.0', tk.END)
+            self.monitor_text.insert('1.0', "Collecting system sample...")
+            self.root.after(500, self.refresh_monitoring)
+            return
+        
         try:
             self.monitor_text.delete('1.0', tk.END)
+            memory, swap, disk, net, cpu_freq = (snapshot[key] for key in ('memory', 'swap', 'disk', 'net', 'cpu_freq'))
+            frequency = f"{cpu_freq.current:.0f} MHz (max: {cpu_freq.max:.0f} MHz)" if cpu_freq else "unknown"
             
-            info = f"""🖥️ SYSTEM MONITOR - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+            info = f"""🖥️ SYSTEM MONITOR - {snapshot['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}
 {'='*80}
 
 📊 CPU INFORMATION:
-   Usage: {psutil.cpu_percent(interval=1):.1f}%
-   Cores: {psutil.cpu_count()} physical
-   Frequency: {psutil.cpu_freq().current:.0f} MHz (max: {psutil.cpu_freq().max:.0f} MHz)
+   Usage: {snapshot['cpu_percent']:.1f}%
+   Cores: {snapshot['cpu_count']} physical
+   Frequency: {frequency}
 
 🧠 MEMORY INFORMATION:
-   Total: {self.format_bytes(psutil.virtual_memory().total)}
-   Used: {self.format_bytes(psutil.virtual_memory().used)} ({psutil.virtual_memory().percent:.1f}%)
-   Available: {self.format_bytes(psutil.virtual_memory().available)}
-   Swap: {self.format_bytes(psutil.swap_memory().used)} / {self.format_bytes(psutil.swap_memory().total)}
+   Total: {self.format_bytes(memory.total)}
+   Used: {self.format_bytes(memory.used)} ({memory.percent:.1f}%)
+   Available: {self.format_bytes(memory.available)}
+   Swap: {self.format_bytes(swap.used)} / {self.format_bytes(swap.total)}
 
 💾 DISK INFORMATION:
-   Total: {self.format_bytes(psutil.disk_usage('/').total)}
-   Used: {self.format_bytes(psutil.disk_usage('/').used)} ({(psutil.disk_usage('/').used/psutil.disk_usage('/').total*100):.1f}%)
-   Free: {self.format_bytes(psutil.disk_usage('/').free)}
+   Total: {self.format_bytes(disk.total)}
+   Used: {self.format_bytes(disk.used)} ({snapshot['disk_percent']:.1f}%)
+   Free: {self.format_bytes(disk.free)}
 
 🌐 NETWORK INFORMATION:
-   Bytes sent: {self.format_bytes(psutil.net_io_counters().bytes_sent)}
-   Bytes received: {self.format_bytes(psutil.net_io_counters().bytes_recv)}
-   Packets sent: {psutil.net_io_counters().packets_sent:,}
-   Packets received: {psutil.net_io_counters().packets_recv:,}
+   Bytes sent: {self.format_bytes(net.bytes_sent)}
+   Bytes received: {self.format_bytes(net.bytes_recv)}
+   Packets sent: {net.packets_sent:,}
+   Packets received: {net.packets_recv:,}
 
 🔄 TOP PROCESSES (by memory):
 {'-'*50}"""
             
-            processes = sorted(psutil.process_iter(['pid', 'name', 'memory_percent', 'cpu_percent']), 
-                             key=lambda p: p.info['memory_percent'] or 0, reverse=True)[:10]
-            
-            for proc in processes:
+            for proc in snapshot['top_processes']:
                 try:
-                    info += f"\n{proc.info['name'][:25]:<25} PID:{proc.info['pid']:<8} MEM:{proc.info['memory_percent']:.1f}% CPU:{proc.info['cpu_percent']:.1f}%"
+                    info += f"\n{proc['name'][:25]:<25} PID:{proc['pid']:<8} MEM:{proc['memory_percent']:.1f}% CPU:{proc['cpu_percent']:.1f}%"
                 except:
                     continue
             
@@ -1134,7 +2481,6 @@ class SystemOptimizerComplete:
                 else:
                     self.security_text.insert(tk.END, "No issues found.\n\n")
                 self.security_text.see(tk.END)
-                self.root.update()
             
             self.security_text.insert(tk.END, "✅ Security scan complete!\n")
             self.save_to_history("Security Scan", "System security scan performed")
@@ -1323,8 +2669,8 @@ USER ACCOUNTS:
         
         threading.Thread(target=diagnose_thread, daemon=True).start()
     
-    def fix_file_opening_issues(self):
-        """Fix common file opening issues"""
+    def fix_file_opening_issues(self, wait=False):
+        """Fix common file opening issues (in the calling thread when wait is set)"""
         def fix_thread():
             self.maintenance_text.delete('1.0', tk.END)
             self.maintenance_text.insert(tk.END, "🔧 Fixing file opening issues...\n\n")
@@ -1352,7 +2698,6 @@ USER ACCOUNTS:
                 except Exception as e:
                     self.maintenance_text.insert(tk.END, f"❌ {desc} failed: {e}\n")
                 
-                self.root.update()
             
             # Set up proper MIME associations
             self.maintenance_text.insert(tk.END, "\n🔗 Setting up MIME associations...\n")
@@ -1386,80 +2731,118 @@ USER ACCOUNTS:
             self.maintenance_text.insert(tk.END, "You can now open README files and other text documents normally.\n")
             
             self.save_to_history("File Opening Fix", "Applied comprehensive file opening fixes")
+            self.health_probes.invalidate()  # Cached checks predate the fixes
             self.show_notification("File Opening Fixed", "File opening functionality has been restored!")
         
-        threading.Thread(target=fix_thread, daemon=True).start()
+        if wait:
+            fix_thread()
+        else:
+            threading.Thread(target=fix_thread, daemon=True).start()
 
         # ENHANCED FEATURES METHODS
     
+    def create_health_gauge(self):
+        """Create the health gauge's canvas items once; draw_health_score updates them"""
+        x, y, w, h = 50, 10, 300, 60
+        canvas = self.health_canvas
+        
+        # Background arc
+        canvas.create_arc(x, y, x+w, y+h, start=180, extent=180, 
+                          fill='#3a3a3a', outline='#3a3a3a', width=2)
+        
+        self.health_items = {
+            'score': None,
+            'arc': canvas.create_arc(x, y, x+w, y+h, start=180, extent=0, 
+                                     fill='#3a3a3a', outline='#3a3a3a', width=3),
+            'value': canvas.create_text(x+w//2, y+h//2+10, text="--", 
+                                        fill='white', font=('Arial', 16, 'bold')),
+            'status': canvas.create_text(x+w+50, y+h//2+10, text="Checking...", 
+                                         fill='white', font=('Arial', 12, 'bold'))
+        }
+        canvas.create_text(x+w//2, y+h//2+30, text="Health Score", 
+                           fill='white', font=('Arial', 10))
+    
+    def draw_health_score(self, health_score):
+        """Update the health gauge in place (Tk thread)"""
+        if not hasattr(self, 'health_canvas'):
+            return  # Health tab not built yet
+        items = self.health_items
+        if items['score'] is not None and abs(health_score - items['score']) < self.REDRAW_THRESHOLD:
+            return
+        items['score'] = health_score
+        
+        # Color and status based on health score
+        if health_score >= 80:
+            color, status_text = '#4caf50', "System is healthy"
+        elif health_score >= 60:
+            color, status_text = '#ffa500', "Minor issues detected"
+        else:
+            color, status_text = '#ff6b6b', "Critical issues need attention"
+        
+        self.health_canvas.itemconfig(items['arc'], extent=(health_score / 100) * 180, fill=color, outline=color)
+        self.health_canvas.itemconfig(items['value'], text=f"{health_score}%")
+        self.health_canvas.itemconfig(items['status'], text=status_text, fill=color)
+    
     def refresh_health_dashboard(self):
         """Refresh the system health dashboard"""
         def health_check_thread():
             try:
-                # Calculate health score
-                health_score = self.calculate_system_health_score()
+                # One round of probes feeds both the score and the issue lists
+                probes = self.health_probes.run()
+                health_score = self.calculate_system_health_score(probes)
                 
                 # Update health score visualization
-                self.health_canvas.delete("all")
-                
-                # Draw health score arc
-                x, y, w, h = 50, 10, 300, 60
-                start_angle = 180
-                extent = (health_score / 100) * 180
-                
-                # Color based on health score
-                if health_score >= 80:
-                    color = '#4caf50'  # Green
-                elif health_score >= 60:
-                    color = '#ffa500'  # Orange
-                else:
-                    color = '#ff6b6b'  # Red
-                
-                # Draw background arc
-                self.health_canvas.create_arc(x, y, x+w, y+h, start=start_angle, extent=180, 
-                                             fill='#3a3a3a', outline='#3a3a3a', width=2)
-                
-                # Draw health score arc
-                self.health_canvas.create_arc(x, y, x+w, y+h, start=start_angle, extent=extent, 
-                                             fill=color, outline=color, width=3)
-                
-                # Add score text
-                self.health_canvas.create_text(x+w//2, y+h//2+10, text=f"{health_score}%", 
-                                             fill='white', font=('Arial', 16, 'bold'))
-                
-                self.health_canvas.create_text(x+w//2, y+h//2+30, text="Health Score", 
-                                             fill='white', font=('Arial', 10))
-                
-                # Status text
-                if health_score >= 80:
-                    status_text = "System is healthy"
-                elif health_score >= 60:
-                    status_text = "Minor issues detected"
-                else:
-                    status_text = "Critical issues need attention"
-                
-                self.health_canvas.create_text(x+w+50, y+h//2+10, text=status_text, 
-                                             fill=color, font=('Arial', 12, 'bold'))
+                self.ui.call(self.draw_health_score, health_score)
                 
                 # Update issues and recommendations
-                self.update_health_issues_and_recommendations(health_score)
+                critical, recommendations = self.update_health_issues_and_recommendations(health_score, probes)
+                self.last_health = (health_score, critical, recommendations)
                 
                 # Save to database
-                self.save_health_snapshot(health_score)
+                self.save_health_snapshot(health_score, len(critical), len(recommendations))
                 
             except Exception as e:
                 print(f"Health check error: {e}")
         
         threading.Thread(target=health_check_thread, daemon=True).start()
     
-    def calculate_system_health_score(self):
+    def register_health_probes(self):
+        """Declare the health checks with how long their answers stay valid"""
+        self.health_probes.register('snapshot', lambda: self.sampler.get(), ttl=0, cost='cheap', default=None)
+        self.health_probes.register('xdg_open', lambda: shutil.which('xdg-open') is not None, ttl=300, cost='cheap')
+        # A probe still running when the check gives up counts as healthy rather than as a critical issue
+        self.health_probes.register('text_handler', self.probe_text_handler, ttl=300, default=True)
+        self.health_probes.register('desktop_portal', self.probe_desktop_portal, ttl=300, default=True)
+    
+    def probe_text_handler(self):
+        """Whether a default application is set for text/plain"""
+        try:
+            result = subprocess.run(["xdg-mime", "query", "default", "text/plain"],
+                                    capture_output=True, text=True, timeout=10)
+        except FileNotFoundError:
+            return False
+        return result.returncode == 0 and bool(result.stdout.strip())
+    
+    def probe_desktop_portal(self):
+        """Whether xdg-desktop-portal is active in the user session"""
+        try:
+            result = subprocess.run(["systemctl", "--user", "is-active", "xdg-desktop-portal"],
+                                    capture_output=True, text=True, timeout=10)
+        except FileNotFoundError:
+            return False
+        return result.stdout.strip() == "active"
+    
+    def calculate_system_health_score(self, probes=None):
         """Calculate overall system health score (0-100)"""
         score = 100
         issues = []
         
         try:
+            probes = probes or self.health_probes.run()
+            snapshot = probes['snapshot']
+            
             # CPU usage check (20% weight)
-            cpu_usage = psutil.cpu_percent(interval=1)
+            cpu_usage = snapshot['cpu_percent']
             if cpu_usage > 90:
                 score -= 20
                 issues.append("High CPU usage detected")
@@ -1467,7 +2850,7 @@ USER ACCOUNTS:
                 score -= 10
             
             # Memory usage check (25% weight)  
-            memory = psutil.virtual_memory()
+            memory = snapshot['memory']
             if memory.percent > 90:
                 score -= 25
                 issues.append("Critical memory usage")
@@ -1475,8 +2858,7 @@ USER ACCOUNTS:
                 score -= 15
             
             # Disk usage check (20% weight)
-            disk = psutil.disk_usage('/')
-            disk_percent = (disk.used / disk.total) * 100
+            disk_percent = snapshot['disk_percent']
             if disk_percent > 95:
                 score -= 20
                 issues.append("Disk almost full")
@@ -1485,8 +2867,8 @@ USER ACCOUNTS:
             
             # System load check (15% weight)
             try:
-                load_avg = os.getloadavg()[0]
-                cpu_count = psutil.cpu_count()
+                load_avg = snapshot['load_average']
+                cpu_count = snapshot['cpu_count']
                 load_percent = (load_avg / cpu_count) * 100
                 if load_percent > 100:
                     score -= 15
@@ -1497,12 +2879,12 @@ USER ACCOUNTS:
                 pass
             
             # File system check (10% weight)
-            if not self.check_file_opening_health():
+            if not self.check_file_opening_health(probes):
                 score -= 10
                 issues.append("File opening issues detected")
             
             # Service check (10% weight)
-            if not self.check_critical_services():
+            if not self.check_critical_services(probes):
                 score -= 10
                 issues.append("Critical services not running")
             
@@ -1512,87 +2894,81 @@ USER ACCOUNTS:
             print(f"Health calculation error: {e}")
             return 50
     
-    def check_file_opening_health(self):
+    def check_file_opening_health(self, probes=None):
         """Quick check if file opening is working"""
-        try:
-            # Test xdg-open availability
-            result = subprocess.run("which xdg-open", shell=True, capture_output=True)
-            if result.returncode != 0:
-                return False
-            
-            # Test default editor
-            result = subprocess.run("xdg-mime query default text/plain", shell=True, capture_output=True)
-            return result.returncode == 0 and result.stdout.strip()
-        except:
-            return False
+        probes = probes or self.health_probes.run(['xdg_open', 'text_handler'])
+        return probes['xdg_open'] and probes['text_handler']
     
-    def check_critical_services(self):
+    def check_critical_services(self, probes=None):
         """Check if critical services are running"""
-        try:
-            result = subprocess.run("systemctl --user is-active xdg-desktop-portal", 
-                                   shell=True, capture_output=True, text=True)
-            return "active" in result.stdout
-        except:
-            return False
+        probes = probes or self.health_probes.run(['desktop_portal'])
+        return probes['desktop_portal']
     
-    def update_health_issues_and_recommendations(self, health_score):
-        """Update the issues and recommendations lists"""
-        # Clear existing items
-        self.critical_listbox.delete(0, tk.END)
-        self.recommendations_listbox.delete(0, tk.END)
+    def update_health_issues_and_recommendations(self, health_score, probes=None):
+        """Work out the issues and recommendations, show them, and return both lists"""
+        probes = probes or self.health_probes.run()
+        critical = []
+        recommendations = []
         
         # Get current system stats
-        cpu_usage = psutil.cpu_percent()
-        memory_usage = psutil.virtual_memory().percent
-        disk_usage = (psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100
+        snapshot = probes['snapshot']
+        cpu_usage = snapshot['cpu_percent']
+        memory_usage = snapshot['memory'].percent
+        disk_usage = snapshot['disk_percent']
         
         # Critical issues
         if cpu_usage > 90:
-            self.critical_listbox.insert(tk.END, f"🔥 High CPU usage: {cpu_usage:.1f}%")
+            critical.append(f"🔥 High CPU usage: {cpu_usage:.1f}%")
         if memory_usage > 90:
-            self.critical_listbox.insert(tk.END, f"🧠 Critical memory: {memory_usage:.1f}%")
+            critical.append(f"🧠 Critical memory: {memory_usage:.1f}%")
         if disk_usage > 95:
-            self.critical_listbox.insert(tk.END, f"💾 Disk almost full: {disk_usage:.1f}%")
+            critical.append(f"💾 Disk almost full: {disk_usage:.1f}%")
         
-        if not self.check_file_opening_health():
-            self.critical_listbox.insert(tk.END, "📄 File opening broken")
+        if not self.check_file_opening_health(probes):
+            critical.append("📄 File opening broken")
         
-        if not self.check_critical_services():
-            self.critical_listbox.insert(tk.END, "⚙️ Services not running")
+        if not self.check_critical_services(probes):
+            critical.append("⚙️ Services not running")
         
         # Recommendations based on health score
         if health_score < 60:
-            self.recommendations_listbox.insert(tk.END, "🚨 Run immediate system cleanup")
-            self.recommendations_listbox.insert(tk.END, "🔧 Check running processes")
-            self.recommendations_listbox.insert(tk.END, "💾 Free up disk space")
+            recommendations += ["🚨 Run immediate system cleanup", "🔧 Check running processes", "💾 Free up disk space"]
         elif health_score < 80:
-            self.recommendations_listbox.insert(tk.END, "🧹 Schedule system cleanup")
-            self.recommendations_listbox.insert(tk.END, "📊 Monitor resource usage")
+            recommendations += ["🧹 Schedule system cleanup", "📊 Monitor resource usage"]
         
         if cpu_usage > 70:
-            self.recommendations_listbox.insert(tk.END, "⚡ Close unnecessary applications")
+            recommendations.append("⚡ Close unnecessary applications")
         if memory_usage > 80:
-            self.recommendations_listbox.insert(tk.END, "🧠 Restart heavy applications")
+            recommendations.append("🧠 Restart heavy applications")
         if disk_usage > 85:
-            self.recommendations_listbox.insert(tk.END, "🗑️ Clean temporary files")
+            recommendations.append("🗑️ Clean temporary files")
         
         # Always show some recommendations
-        self.recommendations_listbox.insert(tk.END, "🔄 Keep system updated")
-        self.recommendations_listbox.insert(tk.END, "📅 Enable auto-diagnostics")
+        recommendations += ["🔄 Keep system updated", "📅 Enable auto-diagnostics"]
+        
+        self.ui.call(self.show_health_lists, critical, recommendations)
+        return critical, recommendations
+    
+    def show_health_lists(self, critical, recommendations):
+        """Replace both listboxes' contents (UI thread)"""
+        if not hasattr(self, 'critical_listbox'):
+            return  # Health tab not built yet
+        self.critical_listbox.delete(0, tk.END)
+        self.recommendations_listbox.delete(0, tk.END)
+        if critical:
+            self.critical_listbox.insert(tk.END, *critical)
+        self.recommendations_listbox.insert(tk.END, *recommendations)
     
-    def save_health_snapshot(self, health_score):
+    def save_health_snapshot(self, health_score, critical_count, recommendations_count):
         """Save health snapshot to database"""
         try:
             conn = sqlite3.connect(self.db_file)
             cursor = conn.cursor()
             
-            critical_count = self.critical_listbox.size()
-            recommendations_count = self.recommendations_listbox.size()
-            
             cursor.execute('''
-                INSERT INTO system_health (timestamp, health_score, critical_issues, warnings, recommendations)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (datetime.now().isoformat(), health_score, critical_count, 0, 
+                INSERT INTO system_health (timestamp, epoch, health_score, critical_issues, warnings, recommendations)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (datetime.now().isoformat(), int(time.time()), health_score, critical_count, 0, 
                   f"{recommendations_count} recommendations generated"))
             
             conn.commit()
@@ -1601,7 +2977,7 @@ USER ACCOUNTS:
             print(f"Error saving health snapshot: {e}")
     
     def auto_refresh_health(self):
-        """Auto-refresh health dashboard every 30 seconds"""
+        """Record system health every 30 seconds from startup; the tab only draws the results"""
         self.refresh_health_dashboard()
         self.root.after(30000, self.auto_refresh_health)
     
@@ -1610,13 +2986,14 @@ USER ACCOUNTS:
         def auto_fix_thread():
             issues_fixed = 0
             
-            # Check and fix file opening issues
+            # Check and fix file opening issues (fresh probes, not the cached ones)
+            self.health_probes.invalidate()
             if not self.check_file_opening_health():
-                self.fix_file_opening_issues()
+                self.fix_file_opening_issues(wait=True)  # Finish before the checks below
                 issues_fixed += 1
             
             # Run cleanup if disk usage is high
-            disk_usage = (psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100
+            disk_usage = self.sampler.get()['disk_percent']
             if disk_usage > 85:
                 self.quick_cleanup()
                 issues_fixed += 1
@@ -1626,10 +3003,12 @@ USER ACCOUNTS:
                 subprocess.run("systemctl --user restart xdg-desktop-portal", shell=True)
                 issues_fixed += 1
             
+            self.health_probes.invalidate()
+            
             self.show_notification("Auto-Fix Complete", f"Fixed {issues_fixed} issues automatically")
             
             # Refresh health dashboard after fixes
-            self.root.after(2000, self.refresh_health_dashboard)
+            self.ui.call(self.root.after, 2000, self.refresh_health_dashboard)
         
         threading.Thread(target=auto_fix_thread, daemon=True).start()
     
@@ -1683,8 +3062,8 @@ USER ACCOUNTS:
                                      bg='#2a2a2a', fg='white')
         console_frame.pack(fill='both', expand=True, padx=20, pady=10)
         
-        self.recovery_console = scrolledtext.ScrolledText(console_frame, bg='#000000', fg='#ff6b6b',
-                                                         font=('Courier', 9), height=8)
+        self.recovery_console = self.ui.wrap(scrolledtext.ScrolledText(console_frame, bg='#000000', fg='#ff6b6b',
+                                                                      font=('Courier', 9), height=8))
         self.recovery_console.pack(fill='both', expand=True, padx=5, pady=5)
         
         self.recovery_console.insert(tk.END, "🚨 Recovery Mode Activated\n")
@@ -1710,8 +3089,8 @@ USER ACCOUNTS:
                                      bg='#2a2a2a', fg='white', font=('Arial', 12, 'bold'))
         results_frame.pack(fill='both', expand=True, padx=20, pady=10)
         
-        self.permission_listbox = tk.Listbox(results_frame, bg='#1a1a1a', fg='white', 
-                                           font=('Courier', 9))
+        self.permission_listbox = self.ui.wrap(tk.Listbox(results_frame, bg='#1a1a1a', fg='white', 
+                                                        font=('Courier', 9)), items=True)
         self.permission_listbox.pack(fill='both', expand=True, padx=10, pady=10)
         
         # Control buttons
@@ -1821,7 +3200,7 @@ USER ACCOUNTS:
             cursor.execute("""
                 SELECT timestamp, health_score, critical_issues, recommendations
                 FROM system_health 
-                ORDER BY timestamp DESC 
+                ORDER BY epoch DESC 
                 LIMIT 50
             """)
             
@@ -2096,7 +3475,6 @@ USER ACCOUNTS:
                 result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
                 self.maintenance_text.insert(tk.END, f"{result.stdout}\n\n")
                 self.maintenance_text.see(tk.END)
-                self.root.update()
             
             self.maintenance_text.insert(tk.END, "✅ System update check complete!\n")
             self.save_to_history("System Update", "System update check performed")
@@ -2119,7 +3497,6 @@ USER ACCOUNTS:
                 self.maintenance_text.insert(tk.END, f"{desc}...\n")
                 result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
                 self.maintenance_text.insert(tk.END, f"{result.stdout}\n")
-                self.root.update()
             
             self.maintenance_text.insert(tk.END, "✅ Package cleaning complete!\n")
             self.save_to_history("Package Cleanup", "Package system cleaned")
@@ -2145,7 +3522,6 @@ USER ACCOUNTS:
                     self.maintenance_text.insert(tk.END, f"{result.stdout}\n")
                 if result.stderr:
                     self.maintenance_text.insert(tk.END, f"Errors: {result.stderr}\n")
-                self.root.update()
             
             self.maintenance_text.insert(tk.END, "✅ Dependency fixing complete!\n")
             self.save_to_history("Dependency Fix", "Fixed broken dependencies")
@@ -2204,7 +3580,6 @@ USER ACCOUNTS:
                         self.maintenance_text.insert(tk.END, f"❌ Failed to backup {description}: {e}\n")
                 else:
                     self.maintenance_text.insert(tk.END, f"⚠️ {description} not found\n")
-                self.root.update()
             
             self.maintenance_text.insert(tk.END, f"\n✅ Backup completed: {backup_dir}\n")
             self.save_to_history("System Backup", f"Backed up system files to {backup_dir}")
@@ -2216,6 +3591,7 @@ USER ACCOUNTS:
         def report_thread():
             self.maintenance_text.delete('1.0', tk.END)
             self.maintenance_text.insert(tk.END, "📋 Generating system report...\n\n")
+            snapshot = self.sampler.get()
             
             report_data = {
                 'timestamp': datetime.now().isoformat(),
@@ -2225,14 +3601,14 @@ USER ACCOUNTS:
                     'uptime': str(datetime.now() - datetime.fromtimestamp(psutil.boot_time())).split('.')[0]
                 },
                 'hardware': {
-                    'cpu_cores': psutil.cpu_count(),
-                    'memory_gb': round(psutil.virtual_memory().total / (1024**3), 2),
-                    'disk_gb': round(psutil.disk_usage('/').total / (1024**3), 2)
+                    'cpu_cores': snapshot['cpu_count'],
+                    'memory_gb': round(snapshot['memory'].total / (1024**3), 2),
+                    'disk_gb': round(snapshot['disk'].total / (1024**3), 2)
                 },
                 'performance': {
-                    'cpu_usage': psutil.cpu_percent(),
-                    'memory_usage': psutil.virtual_memory().percent,
-                    'disk_usage': round((psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100, 2)
+                    'cpu_usage': snapshot['cpu_percent'],
+                    'memory_usage': snapshot['memory'].percent,
+                    'disk_usage': round(snapshot['disk_percent'], 2)
                 }
             }
             
@@ -2264,11 +3640,149 @@ USER ACCOUNTS:
         self.config['diagnostic_schedule'] = self.diagnostic_schedule_var.get()
         self.config['system_health_alerts'] = self.system_health_alerts.get()
         self.config['permission_auto_fix'] = self.permission_auto_fix.get()
+        self.config['compaction_enabled'] = self.compaction_enabled.get()
+        for key, var in self.retention_vars.items():
+            try:
+                self.config[key] = max(0, int(var.get()))
+            except (tk.TclError, ValueError):
+                pass
+        self.config['raw_retention_days'] = max(1, self.config['raw_retention_days'])
         self.save_config()
         
         messagebox.showinfo("Settings Saved", "All settings have been saved successfully!")
         self.save_to_history("Settings", "Application settings updated")
     
+    # DATABASE COMPACTION
+    def schedule_compaction(self):
+        """Check every 10 minutes whether an idle-time compaction is due"""
+        last_run = self.config.get('last_compaction')
+        due = not last_run or datetime.now() - datetime.fromisoformat(last_run) > timedelta(days=1)
+        snapshot = self.sampler.latest()
+        idle = snapshot is not None and snapshot['cpu_percent'] < 30
+        
+        if self.config.get('compaction_enabled', True) and due and idle:
+            self.run_compaction()
+        self.root.after(600000, self.schedule_compaction)
+    
+    def run_compaction(self):
+        """Run compact_database on a background thread"""
+        if getattr(self, 'compaction_running', False):
+            return
+        self.compaction_running = True
+        
+        def compaction_thread():
+            lower_thread_priority()
+            try:
+                stats = self.compact_database()
+                message = (f"🗜️ Compacted {stats['rolled_up']:,} snapshots, pruned {stats['pruned']:,} rows, "
+                           f"freed {self.format_bytes(stats['freed_bytes'])}")
+            except Exception as e:
+                message = f"❌ Database compaction failed: {e}"
+            finally:
+                self.compaction_running = False
+            
+            print(message)
+            self.ui.call(self.compaction_finished, message)
+        
+        threading.Thread(target=compaction_thread, daemon=True).start()
+    
+    def compaction_finished(self, message):
+        """Report a finished compaction in the UI"""
+        self.status_label.config(text=message[:80])
+        if hasattr(self, 'compaction_status'):
+            self.compaction_status.config(text=self.describe_compaction())
+    
+    def describe_compaction(self):
+        """Database size and last compaction time for the Settings tab"""
+        try:
+            size = self.format_bytes(os.path.getsize(self.db_file))
+        except OSError:
+            size = "unknown"
+        last_run = self.config.get('last_compaction')
+        last_run = datetime.fromisoformat(last_run).strftime('%Y-%m-%d %H:%M') if last_run else "never"
+        return f"Database: {size} • Last compacted: {last_run}"
+    
+    def compact_database(self):
+        """Roll old snapshots into hourly/daily aggregates, apply retention and vacuum"""
+        self.snapshot_writer.flush()
+        metrics = self.SERIES_COLUMNS['system_snapshots']
+        (hourly, _), (daily, _) = self.ROLLUP_TABLES['system_snapshots']
+        now = int(time.time())
+        stats = {'rolled_up': 0, 'pruned': 0, 'freed_bytes': 0}
+        
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        cursor = conn.cursor()
+        try:
+            page_size = cursor.execute('PRAGMA page_size').fetchone()[0]
+            if cursor.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                # One-off conversion of a database created before incremental vacuum
+                cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                cursor.execute('VACUUM')
+            
+            # Merging keeps a rollup row correct if late samples land in an already compacted bucket
+            merge = ', '.join(
+                f"{c}_min = COALESCE(MIN({c}_min, excluded.{c}_min), {c}_min, excluded.{c}_min), "
+                f"{c}_sum = COALESCE({c}_sum, 0) + COALESCE(excluded.{c}_sum, 0), "
+                f"{c}_max = COALESCE(MAX({c}_max, excluded.{c}_max), {c}_max, excluded.{c}_max), "
+                f"{c}_count = {c}_count + excluded.{c}_count" for c in metrics)
+            columns = ', '.join(f"{c}_min, {c}_sum, {c}_max, {c}_count" for c in metrics)
+            from_raw = ', '.join(f"MIN({c}), SUM({c}), MAX({c}), COUNT({c})" for c in metrics)
+            from_hourly = ', '.join(f"MIN({c}_min), SUM({c}_sum), MAX({c}_max), SUM({c}_count)" for c in metrics)
+            
+            steps = [
+                ('system_snapshots', hourly, 3600, 'COUNT(*)', from_raw, self.config.get('raw_retention_days', 7)),
+                (hourly, daily, 86400, 'SUM(samples)', from_hourly, self.config.get('hourly_retention_days', 90))
+            ]
+            for source, target, bucket, samples, aggregates, days in steps:
+                cutoff = (now - max(1, days) * 86400) // bucket * bucket
+                oldest = cursor.execute(f"SELECT MIN(epoch) FROM {source}").fetchone()[0]
+                if oldest is None:
+                    continue
+                
+                # One day per transaction keeps the snapshot writer from waiting on us
+                for chunk_start in range(oldest // 86400 * 86400, cutoff, 86400):
+                    chunk_end = min(chunk_start + 86400, cutoff)
+                    with conn:
+                        cursor.execute(f"""
+                            INSERT INTO {target} (epoch, samples, {columns})
+                            SELECT epoch / {bucket} * {bucket} AS bucket, {samples}, {aggregates}
+                            FROM {source}
+                            WHERE epoch >= ? AND epoch < ?
+                            GROUP BY bucket
+                            ON CONFLICT(epoch) DO UPDATE SET samples = samples + excluded.samples, {merge}
+                        """, (chunk_start, chunk_end))
+                        cursor.execute(f"DELETE FROM {source} WHERE epoch >= ? AND epoch < ?", (chunk_start, chunk_end))
+                        if source == 'system_snapshots':
+                            stats['rolled_up'] += cursor.rowcount
+            
+            # Plain retention for daily rollups and event history (0 keeps everything)
+            retention = [
+                (f"DELETE FROM {daily} WHERE epoch < ?", self.config.get('daily_retention_days', 0), True),
+                ("DELETE FROM system_health WHERE epoch < ?", self.config.get('history_retention_days', 365), True),
+                ("DELETE FROM cleanup_history WHERE timestamp < ?", self.config.get('history_retention_days', 365), False)
+            ]
+            for statement, days, by_epoch in retention:
+                if days:
+                    cutoff = now - days * 86400
+                    with conn:
+                        cursor.execute(statement, (cutoff if by_epoch else datetime.fromtimestamp(cutoff).isoformat(),))
+                        stats['pruned'] += cursor.rowcount
+            
+            # executescript steps the pragma to completion (execute() frees a single page);
+            # the checkpoint lets the file shrink under WAL
+            free_pages = cursor.execute('PRAGMA freelist_count').fetchone()[0]
+            conn.executescript('PRAGMA incremental_vacuum;')
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            stats['freed_bytes'] = (free_pages - cursor.execute('PRAGMA freelist_count').fetchone()[0]) * page_size
+        finally:
+            conn.close()
+        
+        with self.series_cache_lock:
+            self.series_cache.clear()
+        self.config['last_compaction'] = datetime.now().isoformat()
+        self.save_config()
+        return stats
+    
     # ANALYTICS METHODS
     def show_usage_stats(self):
         """Show usage statistics"""
@@ -2280,87 +3794,351 @@ USER ACCOUNTS:
             # Get history count
             conn = sqlite3.connect(self.db_file)
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM cleanup_history")
-            cleanup_count = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*), COALESCE(SUM(space_freed), 0) FROM cleanup_history")
+            cleanup_count, space_freed = cursor.fetchone()
             
-            cursor.execute("SELECT action, COUNT(*) FROM cleanup_history GROUP BY action")
+            cursor.execute("SELECT action, COUNT(*), COALESCE(SUM(space_freed), 0) FROM cleanup_history GROUP BY action")
             actions = cursor.fetchall()
             
             conn.close()
             
-            self.analytics_text.insert(tk.END, f"Total cleanup operations: {cleanup_count}\n\n")
+            self.analytics_text.insert(tk.END, f"Total cleanup operations: {cleanup_count}\n")
+            self.analytics_text.insert(tk.END, f"Total space freed: {self.format_bytes(space_freed)}\n\n")
             
             if actions:
                 self.analytics_text.insert(tk.END, "Operation breakdown:\n")
-                for action, count in actions:
-                    self.analytics_text.insert(tk.END, f"  {action}: {count}\n")
+                for action, count, freed in actions:
+                    freed_note = f" ({self.format_bytes(freed)} freed)" if freed else ""
+                    self.analytics_text.insert(tk.END, f"  {action}: {count}{freed_note}\n")
             
             # System stats
+            snapshot = self.sampler.get()
             self.analytics_text.insert(tk.END, f"\nCurrent system status:\n")
-            self.analytics_text.insert(tk.END, f"  CPU Usage: {psutil.cpu_percent()}%\n")
-            self.analytics_text.insert(tk.END, f"  Memory Usage: {psutil.virtual_memory().percent:.1f}%\n")
-            self.analytics_text.insert(tk.END, f"  Disk Usage: {(psutil.disk_usage('/').used/psutil.disk_usage('/').total*100):.1f}%\n")
+            self.analytics_text.insert(tk.END, f"  CPU Usage: {snapshot['cpu_percent']}%\n")
+            self.analytics_text.insert(tk.END, f"  Memory Usage: {snapshot['memory'].percent:.1f}%\n")
+            self.analytics_text.insert(tk.END, f"  Disk Usage: {snapshot['disk_percent']:.1f}%\n")
         
         threading.Thread(target=stats_thread, daemon=True).start()
     
+    def query_series(self, table, columns, hours=24, points=500, end=None):
+        """Time-bucketed min/avg/max of numeric columns, cached until new rows land"""
+        columns = tuple(columns)
+        if any(column not in self.SERIES_COLUMNS.get(table, ()) for column in columns):
+            raise ValueError(f"Unknown series {table}.{columns}")
+        
+        # Buckets over the integer epoch column, aligned to whole buckets
+        if table == 'system_snapshots':
+            self.snapshot_writer.flush()
+        end = int((end or datetime.now()).timestamp())
+        span = hours * 3600
+        bucket = max(1, -(-span // points))
+        end = (end // bucket + 1) * bucket
+        start = end - (-(-span // bucket) + 1) * bucket
+        key = (table, columns, start, end, bucket)
+        
+        conn = sqlite3.connect(self.db_file)
+        cursor = conn.cursor()
+        try:
+            # New rows (from any process) bump MAX(id)
+            version = cursor.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+            with self.series_cache_lock:
+                cached = self.series_cache.get(key) or self._slide_series(key)
+            
+            if cached and cached[0] == version:
+                buckets = cached[1]
+            else:
+                # Cold query scans the range; refreshes only aggregate rows added since
+                buckets = dict(cached[1]) if cached else {}
+                aggregates = ', '.join(f"MIN({c}), SUM({c}), MAX({c}), COUNT({c})" for c in columns)
+                conditions = "epoch >= ? AND epoch < ?"
+                params = [start, bucket, start, end]
+                source = table
+                if cached:
+                    source = f"{table} NOT INDEXED"
+                    conditions += " AND id > ?"
+                    params.append(cached[0])
+                elif table in self.ROLLUP_TABLES:
+                    # Compaction moves samples into rollup tables, so each one is counted exactly once
+                    raw = ', '.join(f"{c} AS {c}_min, {c} AS {c}_sum, {c} AS {c}_max, {c} IS NOT NULL AS {c}_count"
+                                    for c in columns)
+                    rolled = ', '.join(f"{c}_min, {c}_sum, {c}_max, {c}_count" for c in columns)
+                    parts = [f"SELECT epoch, {raw} FROM {table} WHERE {conditions}"]
+                    parts += [f"SELECT epoch, {rolled} FROM {rollup} WHERE {conditions}"
+                              for rollup, _ in self.ROLLUP_TABLES[table]]
+                    source = f"({' UNION ALL '.join(parts)})"
+                    aggregates = ', '.join(f"MIN({c}_min), SUM({c}_sum), MAX({c}_max), SUM({c}_count)" for c in columns)
+                    conditions = "1"
+                    params = [start, bucket] + [start, end] * len(parts)
+                
+                cursor.execute(f"""
+                    SELECT CAST((epoch - ?) / ? AS INTEGER) AS bucket,
+                           {aggregates}
+                    FROM {source}
+                    WHERE {conditions}
+                    GROUP BY bucket
+                """, params)
+                
+                for row in cursor.fetchall():
+                    index, values = row[0], row[1:]
+                    merged = []
+                    for i in range(len(columns)):
+                        low, total, high, count = values[i * 4:i * 4 + 4]
+                        if index in buckets and buckets[index][i][3]:
+                            old_low, old_total, old_high, old_count = buckets[index][i]
+                            if count:
+                                low, total, high = min(low, old_low), total + old_total, max(high, old_high)
+                            else:
+                                low, total, high = old_low, old_total, old_high
+                            count += old_count
+                        merged.append((low, total, high, count))
+                    buckets[index] = merged
+            
+            with self.series_cache_lock:
+                self.series_cache[key] = (version, buckets)
+                self.series_cache.move_to_end(key)
+                while len(self.series_cache) > 32:
+                    self.series_cache.popitem(last=False)
+        finally:
+            conn.close()
+        
+        series = []
+        for index in sorted(buckets):
+            row = {'timestamp': datetime.fromtimestamp(start + index * bucket)}
+            for column, (low, total, high, count) in zip(columns, buckets[index]):
+                row[column] = {'min': low, 'avg': total / count if count else None, 'max': high, 'count': count}
+            series.append(row)
+        return series
+    
+    def _slide_series(self, key):
+        """Reuse an overlapping cached window after the range moved forward by whole buckets"""
+        table, columns, start, end, bucket = key
+        for (old_table, old_columns, old_start, old_end, old_bucket), (version, buckets) in self.series_cache.items():
+            if (old_table, old_columns, old_bucket) == (table, columns, bucket) and old_start <= start < old_end <= end:
+                shift = int(round((start - old_start) / bucket))
+                return version, {index - shift: values for index, values in buckets.items() if index >= shift}
+        return None
+    
     def show_performance_trends(self):
         """Show performance trends"""
         def trends_thread():
             self.analytics_text.delete('1.0', tk.END)
-            self.analytics_text.insert(tk.END, "📈 Performance Trends\n")
+            self.analytics_text.insert(tk.END, "📈 Performance Trends (last 24 hours)\n")
             self.analytics_text.insert(tk.END, "="*50 + "\n\n")
             
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
+            series = self.query_series('system_snapshots', ('cpu_usage', 'memory_usage', 'disk_usage'),
+                                       hours=24, points=24)
             
-            # Get recent snapshots
-            cursor.execute("""
-                SELECT timestamp, cpu_usage, memory_usage, disk_usage 
-                FROM system_snapshots 
-                ORDER BY timestamp DESC 
-                LIMIT 20
-            """)
-            snapshots = cursor.fetchall()
-            conn.close()
-            
-            if snapshots:
-                self.analytics_text.insert(tk.END, "Recent performance data:\n")
-                self.analytics_text.insert(tk.END, f"{'Time':<20} {'CPU%':<8} {'MEM%':<8} {'DISK%':<8}\n")
+            if series:
+                self.analytics_text.insert(tk.END, "Hourly performance (avg / max):\n")
+                self.analytics_text.insert(tk.END, f"{'Time':<14} {'CPU%':<14} {'MEM%':<14} {'DISK%':<8}\n")
                 self.analytics_text.insert(tk.END, "-"*50 + "\n")
                 
-                for timestamp, cpu, memory, disk in snapshots[:10]:
-                    dt = datetime.fromisoformat(timestamp).strftime('%H:%M:%S')
-                    self.analytics_text.insert(tk.END, 
-                        f"{dt:<20} {cpu:<8.1f} {memory:<8.1f} {disk:<8.1f}\n")
+                for row in series:
+                    cpu, memory, disk = row['cpu_usage'], row['memory_usage'], row['disk_usage']
+                    if not cpu['count']:
+                        continue
+                    dt = row['timestamp'].strftime('%m-%d %H:%M')
+                    self.analytics_text.insert(tk.END,
+                        f"{dt:<14} {cpu['avg']:>5.1f} / {cpu['max']:<5.1f} "
+                        f"{memory['avg']:>5.1f} / {memory['max']:<5.1f} {disk['avg']:<8.1f}\n")
             else:
                 self.analytics_text.insert(tk.END, "No performance data available yet.\n")
         
         threading.Thread(target=trends_thread, daemon=True).start()
     
-    def show_space_analysis(self):
-        """Show disk space analysis"""
+    def show_space_analysis(self, path=None):
+        """Show disk space analysis: browse the home directory from the disk-usage index.
+        The button refreshes the index incrementally (fully every few hours); drilling down only queries it."""
+        refresh = path is None
+        self.space_path = path or self.space_path
+        path = self.space_path
+        
         def space_thread():
-            self.analytics_text.delete('1.0', tk.END)
-            self.analytics_text.insert(tk.END, "💾 Disk Space Analysis\n")
-            self.analytics_text.insert(tk.END, "="*50 + "\n\n")
-            
-            # Current disk usage
-            disk = psutil.disk_usage('/')
-            self.analytics_text.insert(tk.END, f"Current disk usage:\n")
-            self.analytics_text.insert(tk.END, f"  Total: {self.format_bytes(disk.total)}\n")
-            self.analytics_text.insert(tk.END, f"  Used: {self.format_bytes(disk.used)} ({disk.used/disk.total*100:.1f}%)\n")
-            self.analytics_text.insert(tk.END, f"  Free: {self.format_bytes(disk.free)}\n\n")
-            
-            # Directory analysis
-            self.analytics_text.insert(tk.END, "Large directories in home:\n")
-            result = subprocess.run("du -h --max-depth=1 ~ 2>/dev/null | sort -hr | head -10", 
-                                   shell=True, capture_output=True, text=True)
-            if result.stdout:
-                for line in result.stdout.strip().split('\n'):
-                    self.analytics_text.insert(tk.END, f"  {line}\n")
+            try:
+                index = self.get_du_index()
+                home = os.path.expanduser("~")
+                if index.node(path) is not None:
+                    self.ui.call(self.render_space_view, path, self.space_view(index, path),
+                                 "🔄 Refreshing index..." if refresh else None)
+                elif not refresh:
+                    return
+                else:
+                    self.ui.call(self.render_space_view, path, None, "🔄 Indexing home directory (first run)...")
+                
+                if not refresh or not self.du_refresh_lock.acquire(blocking=False):
+                    return
+                try:
+                    directories, relisted, seconds = index.update(home)
+                finally:
+                    self.du_refresh_lock.release()
+                if self.space_path == path:
+                    self.ui.call(self.render_space_view, path, self.space_view(index, path),
+                                 f"✅ Index: {directories:,} folders, {relisted:,} re-listed in {seconds:.2f}s")
+            except Exception as e:
+                print(f"Space analysis error: {e}")
+                self.ui.call(self.render_space_view, path, None, f"❌ Space analysis failed: {e}")
         
         threading.Thread(target=space_thread, daemon=True).start()
     
+    def get_du_index(self):
+        """Open the disk-usage index on first use"""
+        with self.du_index_lock:
+            if self.du_index is None:
+                self.du_index = DiskUsageIndex(self.du_index_file)
+            return self.du_index
+    
+    def space_view(self, index, path):
+        """Everything the space view shows for path, read from the index (worker thread)"""
+        return {
+            'disk': self.sampler.get()['disk'],
+            'node': index.node(path),
+            'children': index.children(path, 25),
+            'largest': index.largest(path, 10),
+            'updated': index.last_update(os.path.expanduser("~"))
+        }
+    
+    def render_space_view(self, path, view, note=None):
+        """Draw the space view in one insert and remember which line opens which folder (UI thread)"""
+        home = os.path.expanduser("~")
+        lines = ["💾 Disk Space Analysis", "="*50, ""]
+        self.space_lines = {}
+        
+        if view is not None:
+            disk = view['disk']
+            lines += [
+                "Current disk usage:",
+                f"  Total: {self.format_bytes(disk.total)}",
+                f"  Used: {self.format_bytes(disk.used)} ({disk.used/disk.total*100:.1f}%)",
+                f"  Free: {self.format_bytes(disk.free)}",
+                ""
+            ]
+        
+        if view is not None and view['node'] is not None:
+            total_bytes, total_files, total_dirs = view['node'][:3]
+            shown = path.replace(home, "~", 1)
+            lines += [f"📁 {shown}: {self.format_bytes(total_bytes)} in {total_files:,} files, "
+                      f"{total_dirs:,} folders", "   (double-click a folder to open it)"]
+            if path != home:
+                lines.append("  ⬆ ..")
+                self.space_lines[len(lines)] = os.path.dirname(path)
+            
+            for child, child_bytes, child_files, child_dirs in view['children']:
+                share = child_bytes / total_bytes if total_bytes else 0
+                bar = '█' * round(share * 10) + '░' * (10 - round(share * 10))
+                lines.append(f"  {self.format_bytes(child_bytes):>9} {share*100:5.1f}% {bar}  "
+                             f"{os.path.basename(child)}/  ({child_files:,} files)")
+                self.space_lines[len(lines)] = child
+            
+            if view['largest']:
+                lines += ["", "Where the bytes sit (folders with the largest files of their own):"]
+                for folder, own_bytes, own_files in view['largest']:
+                    lines.append(f"  {self.format_bytes(own_bytes):>9}  {folder.replace(home, '~', 1)}  "
+                                 f"({own_files:,} files)")
+                    self.space_lines[len(lines)] = folder
+            
+            if view['updated']:
+                updated = datetime.fromtimestamp(view['updated'][0]).strftime('%Y-%m-%d %H:%M:%S')
+                lines += ["", f"Index updated {updated}"]
+        
+        if note:
+            lines += ["", note]
+        
+        self.analytics_text.delete('1.0', tk.END)
+        self.analytics_text.insert(tk.END, "\n".join(lines) + "\n")
+    
+    def on_analytics_double_click(self, event):
+        """Open the folder under the cursor when the space view is showing"""
+        if self.analytics_text.get('1.0', '1.end') != "💾 Disk Space Analysis":
+            return
+        line = int(self.analytics_text.index(f"@{event.x},{event.y}").split('.')[0])
+        folder = self.space_lines.get(line)
+        if folder:
+            self.show_space_analysis(folder)
+    
+    def show_large_files(self):
+        """Stream the largest and least recently used files under a folder, redrawing as the scan goes"""
+        folder = filedialog.askdirectory(title="Folder to scan for large files",
+                                         initialdir=os.path.expanduser("~"))
+        if folder:
+            self.render_large_files(folder, None)  # Claim the Analytics view; redraws stop if another view replaces it
+            self.start_file_scan(folder, lambda result: self.ui.call(self.render_large_files, folder, result))
+    
+    def find_large_files(self):
+        """Scan home for the largest and stalest files; progress in the status bar, results in the console"""
+        home = os.path.expanduser("~")
+        
+        def report(result):
+            if not result.get('done'):
+                self.ui.configure(self.status_label.widget,
+                                  text=f"🔎 {result['files']:,} files, {self.format_bytes(result['bytes'])} scanned...")
+                return
+            state = "stopped" if result['cancelled'] else "done"
+            self.log_to_console(f"🔎 Scan {state}: {result['files']:,} files in {result['seconds']:.1f}s")
+            self.log_to_console("Largest files:")
+            for size, path in result['largest'][:10]:
+                self.log_to_console(f"  {self.format_bytes(size):>9}  {path.replace(home, '~', 1)}")
+            self.log_to_console("Least recently used (1MB and up):")
+            for atime, size, path in result['stale'][:10]:
+                self.log_to_console(f"  {datetime.fromtimestamp(atime).strftime('%Y-%m-%d')} "
+                                    f"{self.format_bytes(size):>9}  {path.replace(home, '~', 1)}")
+        
+        self.log_to_console("🔎 Scanning home for large and stale files...")
+        self.start_file_scan(home, report)
+    
+    def start_file_scan(self, root, report):
+        """Run one LargeFileScanner at a time; report(result) gets partial results, then one with done=True.
+        A scan replaced by a newer one stops reporting."""
+        if self.file_scanner is not None:
+            self.file_scanner.cancel()
+        scanner = self.file_scanner = LargeFileScanner(self.config.get('large_file_count', 25))
+        
+        def current_report(result):
+            if self.file_scanner is scanner:
+                report(result)
+        
+        def scan_thread():
+            lower_thread_priority()
+            result = scanner.scan([root], current_report)
+            result['done'] = True
+            current_report(result)
+            if self.file_scanner is scanner:
+                self.file_scanner = None
+        
+        threading.Thread(target=scan_thread, daemon=True).start()
+    
+    def cancel_file_scan(self):
+        """Stop the running large-file scan; what it found so far stays on screen"""
+        if self.file_scanner is not None:
+            self.file_scanner.cancel()
+    
+    def render_large_files(self, folder, result):
+        """Draw the large/stale file lists in one insert (UI thread); result None starts the view"""
+        title = "🔎 Large & Stale Files"
+        if result is None:
+            self.analytics_text.delete('1.0', tk.END)
+            self.analytics_text.insert(tk.END, f"{title}\n{'='*50}\n\n{folder}: 🔄 Scanning...\n")
+            return
+        if self.analytics_text.get('1.0', '1.end') != title:
+            return  # Another Analytics view (e.g. Space Analysis) replaced this one
+        
+        if result.get('done'):
+            state = "⏹️ Stopped" if result['cancelled'] else "✅ Complete"
+        else:
+            state = "🔄 Scanning..."
+        lines = [
+            title, "="*50, "",
+            f"{folder}: {result['files']:,} files, {self.format_bytes(result['bytes'])} "
+            f"in {result['dirs']:,} folders ({result['seconds']:.1f}s) {state}", "",
+            "Largest files:"
+        ]
+        lines += [f"  {self.format_bytes(size):>9}  {path}" for size, path in result['largest']]
+        lines += ["", "Least recently used (1MB and up):"]
+        lines += [f"  {datetime.fromtimestamp(atime).strftime('%Y-%m-%d')} {self.format_bytes(size):>9}  {path}"
+                  for atime, size, path in result['stale']]
+        
+        self.analytics_text.delete('1.0', tk.END)
+        self.analytics_text.insert(tk.END, "\n".join(lines) + "\n")
+    
     def show_system_history(self):
         """Show system history"""
         def history_thread():
@@ -2399,15 +4177,16 @@ USER ACCOUNTS:
             self.analytics_text.insert(tk.END, "📋 Generating full analytics report...\n\n")
             
             # Collect all data
+            snapshot = self.sampler.get()
             report_data = {
                 'timestamp': datetime.now().isoformat(),
                 'system': {
-                    'cpu_cores': psutil.cpu_count(),
-                    'memory_total': psutil.virtual_memory().total,
-                    'disk_total': psutil.disk_usage('/').total,
-                    'current_cpu': psutil.cpu_percent(),
-                    'current_memory': psutil.virtual_memory().percent,
-                    'current_disk': (psutil.disk_usage('/').used / psutil.disk_usage('/').total) * 100
+                    'cpu_cores': snapshot['cpu_count'],
+                    'memory_total': snapshot['memory'].total,
+                    'disk_total': snapshot['disk'].total,
+                    'current_cpu': snapshot['cpu_percent'],
+                    'current_memory': snapshot['memory'].percent,
+                    'current_disk': snapshot['disk_percent']
                 }
             }
             
@@ -2468,7 +4247,7 @@ USER ACCOUNTS:
                 ]
                 
                 # Export snapshots
-                cursor.execute("SELECT * FROM system_snapshots ORDER BY timestamp DESC LIMIT 1000")
+                cursor.execute("SELECT * FROM system_snapshots ORDER BY epoch DESC LIMIT 1000")
                 export_data['system_snapshots'] = [
                     dict(zip([col[0] for col in cursor.description], row))
                     for row in cursor.fetchall()
@@ -2486,7 +4265,7 @@ USER ACCOUNTS:
                 self.analytics_text.insert(tk.END, f"  Cleanup history: {len(export_data['cleanup_history'])}\n")
                 self.analytics_text.insert(tk.END, f"  System snapshots: {len(export_data['system_snapshots'])}\n")
                 
-                messagebox.showinfo("Export Complete", f"Analytics data exported to {filename}")
+                self.ui.call(messagebox.showinfo, "Export Complete", f"Analytics data exported to {filename}")
         
         threading.Thread(target=export_thread, daemon=True).start()
     
@@ -2522,16 +4301,18 @@ USER ACCOUNTS:
             self.activity_text.insert(tk.END, f"Error loading activity: {e}")
     
     def log_to_console(self, message):
-        """Log message to cleanup console"""
+        """Log message to cleanup console (safe from any thread; applied by the UI dispatcher)"""
         timestamp = datetime.now().strftime('%H:%M:%S')
+        line = f"[{timestamp}] {message}\n"
         if hasattr(self, 'cleanup_console'):
-            self.cleanup_console.insert(tk.END, f"[{timestamp}] {message}\n")
-            self.cleanup_console.see(tk.END)
+            self.ui.append(self.cleanup_console.widget, line)
+            self.ui.see(self.cleanup_console.widget, tk.END)
+        else:
+            # Cleanup tab not built yet: keep the line for when it is
+            self.console_backlog.append(line)
         
         if hasattr(self, 'status_label'):
-            self.status_label.config(text=message[:50])
-            
-        self.root.update()
+            self.ui.configure(self.status_label.widget, text=message[:50])
     
     def run_command_silent(self, command):
         """Run command silently"""
@@ -2540,24 +4321,9 @@ USER ACCOUNTS:
         except:
             pass
     
-    def get_disk_usage(self):
-        """Get current disk usage in bytes"""
-        return psutil.disk_usage('/').used
-    
-    def get_directory_size(self, path):
-        """Get directory size in bytes"""
-        try:
-            total = 0
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total += os.path.getsize(filepath)
-                    except:
-                        pass
-            return total
-        except:
-            return 0
+    def get_directory_size(self, path, fresh=False):
+        """Get allocated directory size in bytes (fresh skips cached listings)"""
+        return self.dir_sizer.sizes([path], fresh)[path][0]
     
     def format_bytes(self, bytes_value):
         """Format bytes to human readable format"""
@@ -2567,20 +4333,20 @@ USER ACCOUNTS:
             bytes_value /= 1024
         return f"{bytes_value:.1f}TB"
     
-    def save_to_history(self, action, details):
+    def save_to_history(self, action, details, space_freed=0, duration=0):
         """Save action to history database"""
         try:
             conn = sqlite3.connect(self.db_file)
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO cleanup_history (timestamp, action, details)
-                VALUES (?, ?, ?)
-            """, (datetime.now().isoformat(), action, details))
+                INSERT INTO cleanup_history (timestamp, action, details, space_freed, duration)
+                VALUES (?, ?, ?, ?, ?)
+            """, (datetime.now().isoformat(), action, details, space_freed, duration))
             conn.commit()
             conn.close()
             
-            # Refresh activity display
-            self.root.after(1000, self.load_recent_activity)
+            # Refresh activity display (also called from worker threads)
+            self.ui.call(self.root.after, 1000, self.load_recent_activity)
         except Exception as e:
             print(f"Error saving to history: {e}")
     
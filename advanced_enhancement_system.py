@@ -5,35 +5,82 @@ Complete framework integrating OCR, monitoring, analytics, and optimization
 """
 
 import os
+import io
 import sys
 import json
 import time
+import struct
 import threading
+import zlib
+import hashlib
+import importlib
+import importlib.util
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
+from collections import defaultdict, deque, OrderedDict
+from array import array
+import bisect
+import numbers
 import subprocess
-import psutil
 import sqlite3
 
-# Enhanced OCR integration
-try:
-    from tesseract_timeout_fix_working import WorkingQuickOCR, WorkingFastScreenOCR
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
+class _LazyModule:
+    """Module proxy that imports on first attribute access (keeps analyze/report start-up fast)"""
+    
+    def __init__(self, name: str):
+        self._name = name
+    
+    def __getattr__(self, attr: str):
+        value = getattr(importlib.import_module(self._name), attr)
+        setattr(self, attr, value)  # Later lookups skip __getattr__
+        return value
+
+def _module_available(*names: str) -> bool:
+    """Check importability without importing"""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+psutil = _LazyModule('psutil')
+socket = _LazyModule('socket')
+asyncio = _LazyModule('asyncio')
+hmac = _LazyModule('hmac')
+secrets = _LazyModule('secrets')
+tempfile = _LazyModule('tempfile')
+
+# Vectorized history statistics (falls back to the stdlib array module)
+np = _LazyModule('numpy')
+NUMPY_AVAILABLE = _module_available('numpy')
+
+# Enhanced OCR integration (loaded on first screen capture, see load_ocr)
+OCR_AVAILABLE = _module_available('tesseract_timeout_fix_working', 'pytesseract', 'PIL')
+if not OCR_AVAILABLE:
     print("⚠️ OCR modules not available - screen monitoring limited")
 
 # Screen capture capabilities
-try:
-    from PIL import ImageGrab, Image, ImageDraw
-    SCREEN_CAPTURE_AVAILABLE = True
-except ImportError:
-    SCREEN_CAPTURE_AVAILABLE = False
+Image = _LazyModule('PIL.Image')
+ImageGrab = _LazyModule('PIL.ImageGrab')
+SCREEN_CAPTURE_AVAILABLE = _module_available('PIL')
+if not SCREEN_CAPTURE_AVAILABLE:
     print("⚠️ Screen capture not available")
 
+_ocr_classes = None
+
+def load_ocr():
+    """Import the OCR engines on first use; None if they fail to load"""
+    global _ocr_classes, OCR_AVAILABLE
+    if _ocr_classes is None and OCR_AVAILABLE:
+        try:
+            from tesseract_timeout_fix_working import WorkingQuickOCR, WorkingFastScreenOCR
+            _ocr_classes = (WorkingQuickOCR, WorkingFastScreenOCR)
+        except ImportError as e:
+            OCR_AVAILABLE = False
+            print(f"⚠️ OCR modules not available - screen monitoring limited ({e})")
+    return _ocr_classes
+
 @dataclass
 class EnhancementMetric:
     """Data structure for enhancement metrics"""
@@ -43,6 +90,7 @@ class EnhancementMetric:
     value: Union[float, int, str]
     context: Dict[str, Any]
     confidence: float = 1.0
+    host: Optional[str] = None  # Set for metrics received from remote agents
 
 @dataclass
 class ActionPlan:
@@ -64,6 +112,10 @@ class DatabaseManager:
             db_path = Path.home() / ".enhancement_system.db"
         
         self.db_path = db_path
+        self.metrics_written = 0
+        self.series_cache_size = 64
+        self._series_cache = OrderedDict()
+        self._series_lock = threading.Lock()
         self.init_database()
     
     def init_database(self):
@@ -114,46 +166,188 @@ class DatabaseManager:
                 )
             ''')
             
+            # Host tag for aggregated multi-host metrics (NULL = local)
+            columns = [row[1] for row in cursor.execute('PRAGMA table_info(metrics)')]
+            if 'host' not in columns:
+                cursor.execute('ALTER TABLE metrics ADD COLUMN host TEXT')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrics_host_timestamp ON metrics (host, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrics_series ON metrics (category, metric_name, timestamp)')
+            
             conn.commit()
     
+    @staticmethod
+    def _metric_row(metric: EnhancementMetric) -> tuple:
+        return (
+            metric.timestamp,
+            metric.category,
+            metric.metric_name,
+            json.dumps(metric.value) if not isinstance(metric.value, (int, float, str)) else str(metric.value),
+            json.dumps(metric.context),
+            metric.confidence,
+            metric.host
+        )
+    
     def store_metric(self, metric: EnhancementMetric):
         """Store enhancement metric"""
+        self.store_metrics([metric])
+    
+    def store_metrics(self, metrics: List[EnhancementMetric]):
+        """Store a batch of metrics in one transaction"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT INTO metrics (timestamp, category, metric_name, value, context, confidence, host)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [self._metric_row(metric) for metric in metrics])
+            conn.commit()
+        self.metrics_written += len(metrics)
+    
+    def run_collector(self, address: str = None):
+        """Collector mode: ingest metric batches pushed by remote agents"""
+        MetricCollector(self, address or DEFAULT_COLLECTOR_ADDRESS).run()
+    
+    def store_event(self, event_type: str, data: Dict[str, Any], timestamp: float = None):
+        """Store a system event"""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO metrics (timestamp, category, metric_name, value, context, confidence)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                metric.timestamp,
-                metric.category,
-                metric.metric_name,
-                json.dumps(metric.value) if not isinstance(metric.value, (int, float, str)) else str(metric.value),
-                json.dumps(metric.context),
-                metric.confidence
-            ))
+                INSERT INTO system_events (timestamp, event_type, data)
+                VALUES (?, ?, ?)
+            ''', (timestamp if timestamp is not None else time.time(), event_type, json.dumps(data)))
             conn.commit()
     
-    def get_metrics(self, category: str = None, hours: int = 24) -> List[EnhancementMetric]:
+    def get_latest_event(self, event_type: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the most recent event of a given type"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT timestamp, data FROM system_events
+                WHERE event_type = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (event_type,))
+            row = cursor.fetchone()
+            
+            if not row:
+                return None
+            return {'timestamp': row[0], 'data': json.loads(row[1]) if row[1] else {}}
+    
+    def query_series(self, series: str, hours: float = 24, points: int = 500, bucket: float = None,
+                     end: float = None, host: str = None) -> List[Dict[str, float]]:
+        """Downsampled min/avg/max per time bucket for 'category.metric_name[.field]'"""
+        category, metric_name, *field = series.split('.', 2)
+        
+        # Align the range to whole buckets so repeated dashboard queries share cache entries
+        end = time.time() if end is None else end
+        span = hours * 3600
+        bucket = float(bucket or max(1, -(-span // points)))
+        end = (end // bucket + 1) * bucket
+        start = end - (-(-span // bucket) + 1) * bucket
+        key = (series, host, start, end, bucket)
+        
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            
+            # Inserts bump MAX(id) (AUTOINCREMENT never reuses ids) and deletes drop COUNT(*),
+            # including changes made by other processes
+            max_id, rows = cursor.execute('SELECT COALESCE(MAX(id), 0), COUNT(*) FROM metrics').fetchone()
+            version = (max_id, rows)
+            with self._series_lock:
+                cached = self._series_cache.get(key) or self._slide_series(key)
+            
+            if cached and cached[0] != version:
+                # Only append-only changes can be merged; any delete forces a cold query
+                (old_max_id, old_rows) = cached[0]
+                added = cursor.execute('SELECT COUNT(*) FROM metrics WHERE id > ?', (old_max_id,)).fetchone()[0]
+                if old_rows + added != rows:
+                    cached = None
+            
+            if cached and cached[0] == version:
+                buckets = cached[1]
+            else:
+                # Cold query scans the range; later refreshes only aggregate rows added since
+                since_id = cached[0][0] if cached else None
+                buckets = dict(cached[1]) if cached else {}
+                for index, low, total, high, count in self._aggregate_series(
+                        cursor, category, metric_name, field, start, end, bucket, host, since_id):
+                    if index in buckets:
+                        old_low, old_total, old_high, old_count = buckets[index]
+                        buckets[index] = (min(low, old_low), total + old_total, max(high, old_high), count + old_count)
+                    else:
+                        buckets[index] = (low, total, high, count)
+            
+            with self._series_lock:
+                self._series_cache[key] = (version, buckets)
+                self._series_cache.move_to_end(key)
+                while len(self._series_cache) > self.series_cache_size:
+                    self._series_cache.popitem(last=False)
+        
+        return [
+            {'timestamp': start + index * bucket, 'min': low, 'avg': total / count, 'max': high, 'count': count}
+            for index, (low, total, high, count) in sorted(buckets.items())
+        ]
+    
+    def _slide_series(self, key: tuple) -> Optional[tuple]:
+        """Reuse an overlapping cached window after the range moved forward by whole buckets"""
+        series, host, start, end, bucket = key
+        for (old_series, old_host, old_start, old_end, old_bucket), (version, buckets) in self._series_cache.items():
+            if (old_series, old_host, old_bucket) == (series, host, bucket) and old_start <= start < old_end <= end:
+                shift = int(round((start - old_start) / bucket))
+                return version, {index - shift: values for index, values in buckets.items() if index >= shift}
+        return None
+    
+    def _aggregate_series(self, cursor, category: str, metric_name: str, field: List[str], start: float,
+                          end: float, bucket: float, host: str = None, since_id: int = None) -> List[tuple]:
+        """GROUP BY bucket in SQL, returning (index, min, sum, max, count) rows"""
+        value_expr = "json_extract(value, '$.' || ?)" if field else "CAST(value AS REAL)"
+        conditions = ['category = ?', 'metric_name = ?', 'timestamp >= ?', 'timestamp < ?']
+        params = field + [category, metric_name, start, end]
+        if host:
+            conditions.append('host = ?')
+            params.append(host)
+        
+        source = 'metrics'
+        if since_id is not None:
+            # Rowid range scan over just the new rows
+            source = 'metrics NOT INDEXED'
+            conditions.append('id > ?')
+            params.append(since_id)
+        
+        # LIMIT -1 keeps the subquery from being flattened, so value_expr runs once per row
+        cursor.execute(f'''
+            SELECT CAST((timestamp - ?) / ? AS INTEGER) AS bucket,
+                   MIN(v), SUM(v), MAX(v), COUNT(v)
+            FROM (
+                SELECT timestamp, {value_expr} AS v
+                FROM {source}
+                WHERE {' AND '.join(conditions)}
+                LIMIT -1
+            )
+            WHERE v IS NOT NULL
+            GROUP BY bucket
+        ''', [start, bucket] + params)
+        return cursor.fetchall()
+    
+    def get_metrics(self, category: str = None, hours: int = 24, host: str = None) -> List[EnhancementMetric]:
         """Retrieve metrics from database"""
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
             since_timestamp = time.time() - (hours * 3600)
             
+            query = '''
+                SELECT timestamp, category, metric_name, value, context, confidence, host
+                FROM metrics 
+                WHERE timestamp >= ?
+            '''
+            params = [since_timestamp]
             if category:
-                cursor.execute('''
-                    SELECT timestamp, category, metric_name, value, context, confidence
-                    FROM metrics 
-                    WHERE category = ? AND timestamp >= ?
-                    ORDER BY timestamp DESC
-                ''', (category, since_timestamp))
-            else:
-                cursor.execute('''
-                    SELECT timestamp, category, metric_name, value, context, confidence
-                    FROM metrics 
-                    WHERE timestamp >= ?
-                    ORDER BY timestamp DESC
-                ''', (since_timestamp,))
+                query += ' AND category = ?'
+                params.append(category)
+            if host:
+                query += ' AND host = ?'
+                params.append(host)
+            cursor.execute(query + ' ORDER BY timestamp DESC', params)
             
             metrics = []
             for row in cursor.fetchall():
@@ -167,7 +361,8 @@ class DatabaseManager:
                         metric_name=row[2],
                         value=value,
                         context=context,
-                        confidence=row[5]
+                        confidence=row[5],
+                        host=row[6]
                     ))
                 except Exception as e:
                     print(f"Error parsing metric: {e}")
@@ -175,36 +370,980 @@ class DatabaseManager:
             
             return metrics
 
+# Agent/collector transport: a token hello frame, then frames of <length><zlib(JSON batch)>, acked with one byte after commit
+DEFAULT_COLLECTOR_ADDRESS = '127.0.0.1:9478'
+COLLECTOR_TOKEN_FILE = Path.home() / ".enhancement_collector_token"
+FRAME_HEADER = struct.Struct('<I')
+FRAME_ACK = b'\x01'
+MAX_TOKEN_BYTES = 256
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+MAX_BATCH_BYTES = 64 * 1024 * 1024  # Decompressed size cap per frame
+
+def parse_collector_address(address: str):
+    """Return (family, address) for 'host:port' or a Unix socket path"""
+    if '/' in address or ':' not in address:
+        return socket.AF_UNIX, address
+    host, port = address.rsplit(':', 1)
+    return socket.AF_INET, (host, int(port))
+
+def load_collector_token(path: Union[str, Path] = None) -> bytes:
+    """Shared agent/collector token from ENHANCEMENT_COLLECTOR_TOKEN or the token file (created 0600 on first use)"""
+    token = os.environ.get('ENHANCEMENT_COLLECTOR_TOKEN')
+    if token:
+        return token.encode('utf-8')
+    
+    path = Path(path) if path else COLLECTOR_TOKEN_FILE
+    try:
+        return path.read_bytes().strip()
+    except FileNotFoundError:
+        token = secrets.token_hex(32).encode('ascii')
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(token + b'\n')
+        return token
+
+def encode_metric_batch(host: str, metrics: List[EnhancementMetric]) -> bytes:
+    payload = json.dumps({'host': host, 'metrics': [asdict(m) for m in metrics]}, default=str)
+    return zlib.compress(payload.encode('utf-8'), 6)
+
+def decode_metric_batch(frame: bytes, max_bytes: int = MAX_BATCH_BYTES):
+    """Decode one frame, refusing batches that inflate beyond max_bytes"""
+    inflater = zlib.decompressobj()
+    payload = inflater.decompress(frame, max_bytes)
+    if inflater.unconsumed_tail or not inflater.eof:
+        raise ValueError(f"metric batch exceeds {max_bytes} bytes or is truncated")
+    batch = json.loads(payload)
+    host = batch['host']
+    metrics = []
+    for data in batch['metrics']:
+        data['host'] = host
+        metrics.append(EnhancementMetric(**data))
+    return host, metrics
+
+class MetricShipper:
+    """Agent side: batches metrics and pushes them to a collector, spooling to disk while it is unreachable"""
+    
+    def __init__(self, address: str = DEFAULT_COLLECTOR_ADDRESS, host: str = None,
+                 batch_size: int = 30, flush_interval: float = 60.0,
+                 spool_path: Union[str, Path] = None, max_spool_bytes: int = 64 * 1024 * 1024,
+                 timeout: float = 5.0, token: bytes = None):
+        self.address = address
+        self.token = token or load_collector_token()
+        self.host = host or os.environ.get('ENHANCEMENT_HOST_ID') or socket.gethostname()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = Path(spool_path) if spool_path else Path.home() / ".enhancement_spool.bin"
+        self.max_spool_bytes = max_spool_bytes
+        self.timeout = timeout
+        
+        self._pending: List[EnhancementMetric] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.time()
+        self.sent = 0
+        self.spooled = 0
+    
+    def submit(self, metric: EnhancementMetric):
+        """Queue a metric, flushing when the batch is full or stale"""
+        with self._lock:
+            self._pending.append(metric)
+            due = len(self._pending) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+    
+    def flush(self) -> bool:
+        """Send spooled and pending batches; returns False if the collector was unreachable"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._last_flush = time.time()
+        
+        # Network I/O happens outside _lock so submit() never waits on the collector
+        with self._flush_lock:
+            frames = self._read_spool()
+            spooled = len(frames)
+            if batch:
+                frames.append(encode_metric_batch(self.host, batch))
+            if not frames:
+                return True
+            
+            delivered = self._send(frames)
+            remaining = frames[delivered:]
+            if not remaining:
+                if spooled:
+                    self._write_spool([])
+            elif delivered == 0:
+                if batch:
+                    self._append_spool(frames[:spooled], remaining[-1])
+            else:
+                self._write_spool(remaining)
+            if remaining and batch:
+                print(f"⚠️ Collector {self.address} unreachable - spooled {len(remaining)} batches")
+            return not remaining
+    
+    def _send(self, frames: List[bytes]) -> int:
+        """Send frames in order over one connection; returns how many were acknowledged"""
+        family, address = parse_collector_address(self.address)
+        delivered = 0
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+                sock.sendall(FRAME_HEADER.pack(len(self.token)) + self.token)
+                if sock.recv(1) != FRAME_ACK:
+                    print(f"⚠️ Collector {self.address} rejected the agent token")
+                    return 0
+                for frame in frames:
+                    sock.sendall(FRAME_HEADER.pack(len(frame)) + frame)
+                    if sock.recv(1) != FRAME_ACK:
+                        break
+                    delivered += 1
+                    self.sent += 1
+        except OSError:
+            pass
+        return delivered
+    
+    def _read_spool(self) -> List[bytes]:
+        frames = []
+        if not self.spool_path.exists():
+            return frames
+        
+        data = self.spool_path.read_bytes()
+        offset = 0
+        while offset + FRAME_HEADER.size <= len(data):
+            (length,) = FRAME_HEADER.unpack_from(data, offset)
+            offset += FRAME_HEADER.size
+            if offset + length > len(data):
+                break  # Truncated tail from an interrupted write
+            frames.append(data[offset:offset + length])
+            offset += length
+        return frames
+    
+    def _append_spool(self, spooled: List[bytes], frame: bytes):
+        """Append one undelivered frame, rewriting only for a damaged tail or the size cap"""
+        size = sum(FRAME_HEADER.size + len(f) for f in spooled)
+        try:
+            intact = self.spool_path.stat().st_size == size
+        except FileNotFoundError:
+            intact = size == 0
+        if not intact or size + FRAME_HEADER.size + len(frame) > self.max_spool_bytes:
+            self._write_spool(spooled + [frame])
+            return
+        
+        with open(self.spool_path, 'ab') as f:
+            f.write(FRAME_HEADER.pack(len(frame)) + frame)
+        self.spooled = len(spooled) + 1
+    
+    def _write_spool(self, frames: List[bytes]):
+        """Rewrite the spool with undelivered frames, dropping the oldest beyond the size cap"""
+        if not frames:
+            if self.spool_path.exists():
+                self.spool_path.unlink()
+            self.spooled = 0
+            return
+        
+        total = 0
+        kept = []
+        for frame in reversed(frames):
+            total += FRAME_HEADER.size + len(frame)
+            if total > self.max_spool_bytes:
+                break
+            kept.append(frame)
+        kept.reverse()
+        
+        temp_path = self.spool_path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            for frame in kept:
+                f.write(FRAME_HEADER.pack(len(frame)) + frame)
+        os.replace(temp_path, self.spool_path)
+        self.spooled = len(kept)
+
+class MetricCollector:
+    """Collector side: accepts agent connections with asyncio and bulk-inserts batches tagged by host"""
+    
+    def __init__(self, db_manager: 'DatabaseManager', address: str = DEFAULT_COLLECTOR_ADDRESS,
+                 max_batch_metrics: int = 5000, token: bytes = None):
+        self.db_manager = db_manager
+        self.address = address
+        self.token = token or load_collector_token()
+        self.max_batch_metrics = max_batch_metrics
+        self.hosts = defaultdict(int)
+        self._queue = None
+    
+    async def _read_frame(self, reader, limit: int) -> bytes:
+        (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+        if length > limit:
+            raise ValueError(f"frame of {length} bytes exceeds {limit}")
+        return await reader.readexactly(length)
+    
+    async def _handle_agent(self, reader, writer):
+        try:
+            token = await self._read_frame(reader, MAX_TOKEN_BYTES)
+            if not hmac.compare_digest(token, self.token):
+                print(f"⚠️ Collector rejected agent {writer.get_extra_info('peername')}: bad token")
+                return
+            writer.write(FRAME_ACK)
+            await writer.drain()
+            
+            while True:
+                frame = await self._read_frame(reader, MAX_FRAME_BYTES)
+                
+                host, metrics = decode_metric_batch(frame)
+                done = asyncio.get_running_loop().create_future()
+                await self._queue.put((host, metrics, done))
+                await done  # Ack only once the batch is committed
+                
+                writer.write(FRAME_ACK)
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            print(f"Collector connection error: {e}")
+        finally:
+            writer.close()
+    
+    async def _writer(self):
+        """Drain queued batches from all agents into single transactions"""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._queue.get()]
+            count = len(items[0][1])
+            while not self._queue.empty() and count < self.max_batch_metrics:
+                item = self._queue.get_nowait()
+                items.append(item)
+                count += len(item[1])
+            
+            metrics = [metric for _, batch, _ in items for metric in batch]
+            try:
+                await loop.run_in_executor(None, self.db_manager.store_metrics, metrics)
+                for host, batch, done in items:
+                    self.hosts[host] += len(batch)
+                    # The agent may have disconnected and cancelled its wait already
+                    if not done.done():
+                        done.set_result(True)
+            except Exception as e:
+                print(f"Collector write error: {e}")
+                for _, _, done in items:
+                    if not done.done():
+                        done.set_exception(e)
+    
+    async def serve(self):
+        self._queue = asyncio.Queue()
+        family, address = parse_collector_address(self.address)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.unlink(address)
+            server = await asyncio.start_unix_server(self._handle_agent, path=address)
+            os.chmod(address, 0o600)
+        else:
+            server = await asyncio.start_server(self._handle_agent, address[0], address[1])
+        
+        writer_task = asyncio.create_task(self._writer())
+        print(f"📥 Collector listening on {self.address} → {self.db_manager.db_path}")
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                writer_task.cancel()
+    
+    def run(self):
+        asyncio.run(self.serve())
+
+# Sampling interval assumed for metrics recorded before intervals were stored
+DEFAULT_SAMPLE_INTERVAL = 30.0
+
+# Productivity indicators in bit order for the compact history bitmask
+PRODUCTIVITY_INDICATORS = (
+    'active_development',
+    'web_browsing',
+    'terminal_work',
+    'learning_research',
+    'high_system_load',
+    'system_idle'
+)
+
+def encode_indicators(indicators: List[str]) -> int:
+    """Pack productivity indicator names into a bitmask"""
+    mask = 0
+    for indicator in indicators:
+        if indicator in PRODUCTIVITY_INDICATORS:
+            mask |= 1 << PRODUCTIVITY_INDICATORS.index(indicator)
+    return mask
+
+def decode_indicators(mask: int) -> List[str]:
+    """Unpack a bitmask back into productivity indicator names"""
+    return [name for bit, name in enumerate(PRODUCTIVITY_INDICATORS) if mask & (1 << bit)]
+
+class StringTable:
+    """Bounded, deduplicated store for text kept out-of-line from the history buffers"""
+    
+    def __init__(self, max_entries: int = 512, max_chars: int = 2_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._ids = OrderedDict()  # text -> id, oldest first
+        self._strings = {}  # id -> text
+        self._next_id = 0
+        self._total_chars = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def intern(self, text: Optional[str]) -> int:
+        """Store text once and return its id (-1 for no text)"""
+        if not text:
+            return -1
+        
+        string_id = self._ids.get(text)
+        if string_id is not None:
+            self.hits += 1
+            self._ids.move_to_end(text)
+            return string_id
+        
+        self.misses += 1
+        string_id = self._next_id
+        self._next_id += 1
+        self._ids[text] = string_id
+        self._strings[string_id] = text
+        self._total_chars += len(text)
+        
+        # Evict least recently used entries to stay within bounds
+        while len(self._ids) > self.max_entries or (self._total_chars > self.max_chars and len(self._ids) > 1):
+            old_text, old_id = self._ids.popitem(last=False)
+            del self._strings[old_id]
+            self._total_chars -= len(old_text)
+        
+        return string_id
+    
+    def get(self, string_id: int) -> Optional[str]:
+        """Look up text by id; evicted or missing ids return None"""
+        return self._strings.get(string_id)
+    
+    def __len__(self) -> int:
+        return len(self._strings)
+
+class MetricRingBuffer:
+    """Fixed-capacity struct-of-arrays history of monitoring samples"""
+    
+    NUMERIC_COLUMNS = ('timestamp', 'cpu_percent', 'memory_percent', 'disk_usage', 'interval')
+    
+    def __init__(self, capacity: int = 8640):
+        self.capacity = capacity
+        self._head = 0  # next write position
+        self._size = 0
+        
+        if NUMPY_AVAILABLE:
+            self._columns = {name: np.zeros(capacity, dtype=np.float64) for name in self.NUMERIC_COLUMNS}
+            self._indicators = np.zeros(capacity, dtype=np.uint32)
+            self._screen_ids = np.full(capacity, -1, dtype=np.int64)
+            self._process_ids = np.full(capacity, -1, dtype=np.int64)
+        else:
+            self._columns = {name: array('d', [0.0]) * capacity for name in self.NUMERIC_COLUMNS}
+            self._indicators = array('L', [0]) * capacity
+            self._screen_ids = array('q', [-1]) * capacity
+            self._process_ids = array('q', [-1]) * capacity
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, timestamp: float, cpu_percent: float, memory_percent: float, disk_usage: float,
+               indicator_mask: int = 0, screen_id: int = -1, process_id: int = -1,
+               interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """Append one sample in O(1), overwriting the oldest when full"""
+        i = self._head
+        self._columns['timestamp'][i] = timestamp
+        self._columns['cpu_percent'][i] = cpu_percent
+        self._columns['memory_percent'][i] = memory_percent
+        self._columns['disk_usage'][i] = disk_usage
+        self._columns['interval'][i] = interval
+        self._indicators[i] = indicator_mask
+        self._screen_ids[i] = screen_id
+        self._process_ids[i] = process_id
+        
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+    
+    def _ordered(self, column):
+        """Return a column's live samples in chronological order"""
+        start = (self._head - self._size) % self.capacity
+        if start + self._size <= self.capacity:
+            return column[start:start + self._size]
+        if NUMPY_AVAILABLE:
+            return np.concatenate((column[start:], column[:self._head]))
+        return column[start:] + column[:self._head]
+    
+    def _window_start(self, timestamps, seconds: Optional[float], now: Optional[float]) -> int:
+        """Index of the first sample inside the trailing time window"""
+        if seconds is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - seconds
+        if NUMPY_AVAILABLE:
+            return int(np.searchsorted(timestamps, cutoff, side='left'))
+        return bisect.bisect_left(timestamps, cutoff)
+    
+    def window(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Any]:
+        """Return chronological column slices for the trailing window (all samples if seconds is None)"""
+        timestamps = self._ordered(self._columns['timestamp'])
+        start = self._window_start(timestamps, seconds, now)
+        
+        result = {name: self._ordered(column)[start:] for name, column in self._columns.items()}
+        result['indicators'] = self._ordered(self._indicators)[start:]
+        result['screen_ids'] = self._ordered(self._screen_ids)[start:]
+        result['process_ids'] = self._ordered(self._process_ids)[start:]
+        return result
+    
+    def window_stats(self, column: str, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, float]:
+        """Vectorized min/max/mean (plain and interval-weighted) over a numeric column for the trailing window"""
+        window = self.window(seconds, now)
+        values = window[column]
+        weights = window['interval']
+        count = len(values)
+        if count == 0:
+            return {'count': 0, 'min': 0.0, 'max': 0.0, 'mean': 0.0, 'weighted_mean': 0.0}
+        
+        if NUMPY_AVAILABLE:
+            total_weight = float(weights.sum())
+            return {
+                'count': count,
+                'min': float(values.min()),
+                'max': float(values.max()),
+                'mean': float(values.mean()),
+                'weighted_mean': float((values * weights).sum() / total_weight) if total_weight > 0 else float(values.mean())
+            }
+        total_weight = sum(weights)
+        mean = sum(values) / count
+        return {
+            'count': count,
+            'min': min(values),
+            'max': max(values),
+            'mean': mean,
+            'weighted_mean': sum(v * w for v, w in zip(values, weights)) / total_weight if total_weight > 0 else mean
+        }
+    
+    def indicator_counts(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, int]:
+        """Count how many samples in the window carried each productivity indicator"""
+        masks = self.window(seconds, now)['indicators']
+        counts = {}
+        for bit, name in enumerate(PRODUCTIVITY_INDICATORS):
+            if NUMPY_AVAILABLE:
+                counts[name] = int(np.count_nonzero(masks & (1 << bit)))
+            else:
+                counts[name] = sum(1 for mask in masks if mask & (1 << bit))
+        return counts
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Most recent sample as plain values, or None when empty"""
+        if self._size == 0:
+            return None
+        i = (self._head - 1) % self.capacity
+        sample = {name: float(column[i]) for name, column in self._columns.items()}
+        sample['indicators'] = int(self._indicators[i])
+        return sample
+    
+    def nbytes(self) -> int:
+        """Memory held by the backing columns"""
+        columns = list(self._columns.values()) + [self._indicators, self._screen_ids, self._process_ids]
+        if NUMPY_AVAILABLE:
+            return sum(column.nbytes for column in columns)
+        return sum(column.itemsize * len(column) for column in columns)
+
+class LatencyHistogram:
+    """HDR-style log-linear latency histogram in microseconds (~3% relative error)"""
+    
+    SUB_BUCKET_BITS = 5
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS  # 32 buckets per power of two
+    LINEAR_LIMIT = SUB_BUCKETS * 2  # values below this are recorded exactly
+    
+    def __init__(self):
+        self.counts = defaultdict(int)  # bucket index -> count (sparse)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+    
+    @classmethod
+    def _bucket_index(cls, value: int) -> int:
+        if value < cls.LINEAR_LIMIT:
+            return value
+        shift = value.bit_length() - (cls.SUB_BUCKET_BITS + 1)
+        mantissa = value >> shift
+        return cls.LINEAR_LIMIT + (shift - 1) * cls.SUB_BUCKETS + (mantissa - cls.SUB_BUCKETS)
+    
+    @classmethod
+    def _bucket_value(cls, index: int) -> int:
+        """Midpoint of the value range covered by a bucket"""
+        if index < cls.LINEAR_LIMIT:
+            return index
+        offset = index - cls.LINEAR_LIMIT
+        shift = offset // cls.SUB_BUCKETS + 1
+        mantissa = offset % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return (mantissa << shift) + (1 << (shift - 1))
+    
+    def record(self, seconds: float):
+        """Record one latency sample given in seconds"""
+        value = max(0, int(seconds * 1_000_000))
+        self.counts[self._bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def percentile(self, percent: float) -> float:
+        """Latency in milliseconds at the given percentile"""
+        if self.count == 0:
+            return 0.0
+        threshold = max(1, int(round(self.count * percent / 100.0)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= threshold:
+                return min(self._bucket_value(index), self.max) / 1000.0
+        return self.max / 1000.0
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, percentiles and extremes in milliseconds"""
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count / 1000.0) if self.count else 0.0,
+            'min_ms': (self.min or 0) / 1000.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max / 1000.0
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'counts': {str(index): count for index, count in self.counts.items()},
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        histogram = cls()
+        for index, count in data.get('counts', {}).items():
+            histogram.counts[int(index)] = count
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('total', 0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max', 0)
+        return histogram
+
+class _NullPhase:
+    """No-op context manager handed out when instrumentation is disabled"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class _TimedPhase:
+    """Context manager that records its elapsed time into a histogram"""
+    
+    __slots__ = ('histogram', 'start')
+    
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+class PhaseTimer:
+    """Per-phase latency instrumentation for the monitoring cycle"""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms = defaultdict(LatencyHistogram)
+        self.started_at = time.time()
+    
+    def phase(self, name: str):
+        """Time a block: `with timer.phase('ocr'): ...`"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _TimedPhase(self.histograms[name])
+    
+    def record(self, name: str, seconds: float):
+        if self.enabled:
+            self.histograms[name].record(seconds)
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Summaries for every phase seen so far"""
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at,
+            'phases': {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+        }
+
+class OverheadGovernor:
+    """Keeps the monitor's own CPU and I/O within a budget by stepping through degraded modes"""
+    
+    # Ordered from richest to cheapest; each step trades resolution for overhead.
+    # The top mode matches the ungoverned monitor (fast OCR), so enabling the governor never costs more.
+    MODES = (
+        {'name': 'full', 'interval_factor': 1.0, 'ocr_mode': 'fast', 'capture_reduction': 1},
+        {'name': 'relaxed', 'interval_factor': 2.0, 'ocr_mode': 'fast', 'capture_reduction': 1},
+        {'name': 'low_resolution', 'interval_factor': 4.0, 'ocr_mode': 'fast', 'capture_reduction': 2},
+        {'name': 'no_ocr', 'interval_factor': 4.0, 'ocr_mode': None, 'capture_reduction': 2}
+    )
+    
+    def __init__(self, cpu_budget: float = 0.02, io_budget: float = 512 * 1024,
+                 recover_ratio: float = 0.5, recover_cycles: int = 3):
+        self.cpu_budget = cpu_budget  # fraction of one core
+        self.io_budget = io_budget  # bytes per second
+        self.recover_ratio = recover_ratio
+        self.recover_cycles = recover_cycles
+        
+        self.level = 0
+        self.cpu_usage = 0.0
+        self.io_rate = 0.0
+        self._headroom_cycles = 0
+        
+        self.process = psutil.Process()
+        self._last_sample = self._sample()
+    
+    @property
+    def mode(self) -> Dict[str, Any]:
+        return self.MODES[self.level]
+    
+    def _sample(self):
+        """Wall clock, cumulative CPU seconds (including OCR children) and I/O bytes"""
+        cpu = self.process.cpu_times()
+        cpu_seconds = cpu.user + cpu.system + getattr(cpu, 'children_user', 0.0) + getattr(cpu, 'children_system', 0.0)
+        
+        try:
+            io = self.process.io_counters()
+            io_bytes = io.read_bytes + io.write_bytes
+        except (AttributeError, psutil.AccessDenied, NotImplementedError):
+            io_bytes = None
+        
+        return time.monotonic(), cpu_seconds, io_bytes
+    
+    def update(self) -> Optional[Dict[str, Any]]:
+        """Measure overhead since the last call and adjust the mode; returns the change, if any"""
+        now, cpu_seconds, io_bytes = self._sample()
+        last_time, last_cpu, last_io = self._last_sample
+        self._last_sample = (now, cpu_seconds, io_bytes)
+        
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return None
+        
+        self.cpu_usage = (cpu_seconds - last_cpu) / elapsed
+        self.io_rate = (io_bytes - last_io) / elapsed if io_bytes is not None and last_io is not None else 0.0
+        
+        over_budget = self.cpu_usage > self.cpu_budget or self.io_rate > self.io_budget
+        has_headroom = (self.cpu_usage < self.cpu_budget * self.recover_ratio and
+                        self.io_rate < self.io_budget * self.recover_ratio)
+        
+        previous = self.level
+        if over_budget:
+            self._headroom_cycles = 0
+            if self.level < len(self.MODES) - 1:
+                self.level += 1
+        elif has_headroom and self.level > 0:
+            self._headroom_cycles += 1
+            if self._headroom_cycles >= self.recover_cycles:
+                self._headroom_cycles = 0
+                self.level -= 1
+        else:
+            self._headroom_cycles = 0
+        
+        if self.level == previous:
+            return None
+        
+        return {
+            'from_mode': self.MODES[previous]['name'],
+            'to_mode': self.mode['name'],
+            'reason': 'over_budget' if over_budget else 'headroom',
+            'cpu_usage': round(self.cpu_usage, 4),
+            'cpu_budget': self.cpu_budget,
+            'io_rate': round(self.io_rate, 1),
+            'io_budget': self.io_budget
+        }
+
+class AdaptiveIntervalController:
+    """Adapts the sampling interval to activity: shorter during bursts, exponential back-off when idle"""
+    
+    def __init__(self, base_interval: float = 30.0, min_interval: float = 5.0, max_interval: float = 600.0,
+                 backoff: float = 2.0, cpu_delta_threshold: float = 15.0, churn_threshold: float = 0.3,
+                 screen_change_threshold: float = 0.3):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.cpu_delta_threshold = cpu_delta_threshold
+        self.churn_threshold = churn_threshold
+        self.screen_change_threshold = screen_change_threshold
+        
+        self.interval = base_interval
+        self._last_cpu = None
+        self._last_screen_words = None
+        self._last_processes = None
+    
+    def _is_burst(self, analysis: Dict[str, Any]) -> bool:
+        """Detect CPU swings, screen changes or process churn since the previous sample"""
+        cpu = analysis.get('system_metrics', {}).get('cpu_percent')
+        screen_text = analysis.get('screen_content')
+        # Word sets, so a ticking clock or OCR noise on a few words is not a screen change
+        screen_words = set(screen_text.split()) if screen_text else None
+        processes = {p['name'] for p in analysis.get('active_processes', []) if p.get('name')}
+        
+        burst = False
+        if self._last_processes is not None:
+            if cpu is not None and self._last_cpu is not None and abs(cpu - self._last_cpu) >= self.cpu_delta_threshold:
+                burst = True
+            if screen_words is not None and self._last_screen_words is not None:
+                union = screen_words | self._last_screen_words
+                if union and len(screen_words ^ self._last_screen_words) / len(union) >= self.screen_change_threshold:
+                    burst = True
+            union = processes | self._last_processes
+            if union and len(processes ^ self._last_processes) / len(union) >= self.churn_threshold:
+                burst = True
+        
+        self._last_cpu = cpu
+        self._last_screen_words = screen_words
+        self._last_processes = processes
+        return burst
+    
+    def update(self, analysis: Dict[str, Any]) -> float:
+        """Feed the latest analysis and return the next sampling interval"""
+        if self._is_burst(analysis):
+            self.interval = self.interval / self.backoff
+        elif 'system_idle' in analysis.get('productivity_indicators', []):
+            self.interval = self.interval * self.backoff
+        elif self.interval < self.base_interval:
+            self.interval = min(self.base_interval, self.interval * self.backoff)
+        elif self.interval > self.base_interval:
+            self.interval = max(self.base_interval, self.interval / self.backoff)
+        
+        self.interval = max(self.min_interval, min(self.max_interval, self.interval))
+        return self.interval
+
+class LiveActivitySource:
+    """Reads activity straight from the running system"""
+    
+    can_capture = SCREEN_CAPTURE_AVAILABLE
+    
+    def advance(self) -> bool:
+        return True
+    
+    def now(self) -> float:
+        return time.time()
+    
+    def capture_screen(self):
+        return ImageGrab.grab()
+    
+    def process_snapshot(self) -> List[Dict[str, Any]]:
+        return [dict(proc.info) for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent'])]
+    
+    def sample_cpu(self) -> float:
+        return psutil.cpu_percent(interval=1)
+    
+    def sample_system(self) -> Dict[str, float]:
+        return {
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_usage': psutil.disk_usage('/').percent
+        }
+
+class ActivityRecording:
+    """Compact on-disk log of captured frames with process and system snapshots
+    
+    Layout: magic header, then per sample a '<II' (meta_len, frame_len) header,
+    zlib-compressed JSON metadata and an optional PNG-encoded frame.
+    """
+    
+    MAGIC = b'ENHREC1\n'
+    RECORD_HEADER = struct.Struct('<II')
+    
+    def __init__(self, path: Union[str, Path], mode: str = 'r'):
+        self.path = Path(path)
+        self.mode = mode
+        self._file = open(self.path, 'wb' if mode == 'w' else 'rb')
+        if mode == 'w':
+            self._file.write(self.MAGIC)
+        elif self._file.read(len(self.MAGIC)) != self.MAGIC:
+            self._file.close()
+            raise ValueError(f"Not an activity recording: {self.path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+    
+    def close(self):
+        self._file.close()
+    
+    def write(self, timestamp: float, processes: List[Dict[str, Any]], system: Dict[str, float], frame=None):
+        """Append one sample"""
+        meta = zlib.compress(json.dumps({
+            'timestamp': timestamp,
+            'processes': processes,
+            'system': system
+        }, separators=(',', ':')).encode('utf-8'))
+        
+        frame_bytes = b''
+        if frame is not None:
+            buffer = io.BytesIO()
+            frame.save(buffer, format='PNG', optimize=False)
+            frame_bytes = buffer.getvalue()
+        
+        self._file.write(self.RECORD_HEADER.pack(len(meta), len(frame_bytes)))
+        self._file.write(meta)
+        self._file.write(frame_bytes)
+    
+    def __iter__(self):
+        """Yield samples as dicts with the frame left PNG-encoded"""
+        while True:
+            header = self._file.read(self.RECORD_HEADER.size)
+            if len(header) < self.RECORD_HEADER.size:
+                return
+            meta_len, frame_len = self.RECORD_HEADER.unpack(header)
+            sample = json.loads(zlib.decompress(self._file.read(meta_len)))
+            sample['frame'] = self._file.read(frame_len) if frame_len else None
+            yield sample
+
+class RecordedActivitySource:
+    """Replays a recording through the analysis pipeline with a mocked wall clock"""
+    
+    can_capture = SCREEN_CAPTURE_AVAILABLE
+    
+    def __init__(self, samples: List[Dict[str, Any]]):
+        self._samples = iter(samples)
+        self._current = None
+    
+    def advance(self) -> bool:
+        """Move to the next recorded sample; False when exhausted"""
+        self._current = next(self._samples, None)
+        return self._current is not None
+    
+    def now(self) -> float:
+        return self._current['timestamp']
+    
+    def capture_screen(self):
+        frame = self._current['frame']
+        return Image.open(io.BytesIO(frame)) if frame else None
+    
+    def process_snapshot(self) -> List[Dict[str, Any]]:
+        return self._current['processes']
+    
+    def sample_cpu(self) -> float:
+        return self._current['system'].get('cpu_percent', 0.0)
+    
+    def sample_system(self) -> Dict[str, float]:
+        system = self._current['system']
+        return {
+            'memory_percent': system.get('memory_percent', 0.0),
+            'disk_usage': system.get('disk_usage', 0.0)
+        }
+
 class AdvancedMonitoringSystem:
     """Advanced monitoring system with OCR and process analysis"""
     
-    def __init__(self):
-        self.ocr_quick = WorkingQuickOCR(timeout=10.0) if OCR_AVAILABLE else None
-        self.ocr_fast = WorkingFastScreenOCR(timeout=5.0) if OCR_AVAILABLE else None
+    def __init__(self, history_capacity: int = 8640, instrument: bool = None,
+                 cpu_budget: Optional[float] = 0.02, source=None, db_path: str = None,
+                 shipper: MetricShipper = None):
+        self._ocr_engines = None
+        # OCR results by captured-pixel digest: an unchanged screen is not OCR'd again
+        self.ocr_cache = OrderedDict()
+        self.ocr_cache_size = 16
+        self.ocr_cache_hits = 0
+        self.ocr_cache_misses = 0
         
         self.monitoring_active = False
         self.monitoring_thread = None
-        self.screen_history = deque(maxlen=100)
-        self.process_history = deque(maxlen=500)
+        self._stop_event = threading.Event()
+        self.interval_controller = None
+        self.source = source or LiveActivitySource()
+        self.counters = defaultdict(int)
         
-        self.db_manager = DatabaseManager()
+        # Compact in-memory history (~72h at the default 30s interval)
+        self.history = MetricRingBuffer(capacity=history_capacity)
+        self.text_table = StringTable()
+        
+        # Cycle phase instrumentation (ENHANCEMENT_INSTRUMENT=0 disables)
+        if instrument is None:
+            instrument = os.environ.get('ENHANCEMENT_INSTRUMENT', '1') != '0'
+        self.phase_timer = PhaseTimer(enabled=instrument)
+        self.stats_persist_interval = 300.0
+        self._last_stats_persist = time.time()
+        
+        # Self-overhead budget (None disables the governor)
+        self.governor = OverheadGovernor(cpu_budget=cpu_budget) if cpu_budget else None
+        
+        self.db_manager = DatabaseManager(db_path)
+        
+        # Agent mode: metrics go to a remote collector instead of the local DB
+        self.shipper = shipper
+    
+    @property
+    def ocr_quick(self):
+        return self._load_ocr_engines()[0]
+    
+    @property
+    def ocr_fast(self):
+        return self._load_ocr_engines()[1]
+    
+    def _load_ocr_engines(self):
+        """Construct the OCR engines on first screen capture"""
+        if self._ocr_engines is None:
+            classes = load_ocr()
+            if classes:
+                quick_ocr, fast_ocr = classes
+                self._ocr_engines = (quick_ocr(timeout=10.0), fast_ocr(timeout=5.0))
+            else:
+                self._ocr_engines = (None, None)
+        return self._ocr_engines
     
-    def extract_screen_text_safe(self, fast_mode: bool = True) -> Optional[str]:
+    def extract_screen_text_safe(self, fast_mode: bool = True, reduction: int = 1) -> Optional[str]:
         """Safely extract text from screen"""
-        if not OCR_AVAILABLE or not SCREEN_CAPTURE_AVAILABLE:
+        if not OCR_AVAILABLE or not self.source.can_capture:
             return None
         
         try:
             # Capture screen
-            screen = ImageGrab.grab()
+            with self.phase_timer.phase('capture'):
+                screen = self.source.capture_screen()
+                if screen is None:
+                    return None
+                if reduction > 1:
+                    screen = screen.reduce(reduction)
+            
+            key = (fast_mode, screen.size, hashlib.blake2b(screen.tobytes(), digest_size=16).digest())
+            if key in self.ocr_cache:
+                self.ocr_cache_hits += 1
+                self.ocr_cache.move_to_end(key)
+                return self.ocr_cache[key]
+            self.ocr_cache_misses += 1
             
             # Use appropriate OCR method
-            if fast_mode and self.ocr_fast:
-                return self.ocr_fast.extract_screen_text(screen)
-            elif self.ocr_quick:
-                return self.ocr_quick.extract_text(screen)
-            else:
-                return None
+            with self.phase_timer.phase('ocr'):
+                if fast_mode and self.ocr_fast:
+                    text = self.ocr_fast.extract_screen_text(screen)
+                elif self.ocr_quick:
+                    text = self.ocr_quick.extract_text(screen)
+                else:
+                    return None
+            
+            # Timeouts and errors are retried on the next capture
+            if text is not None:
+                self.ocr_cache[key] = text
+                if len(self.ocr_cache) > self.ocr_cache_size:
+                    self.ocr_cache.popitem(last=False)
+            return text
                 
         except Exception as e:
             print(f"Screen capture error: {e}")
@@ -212,8 +1351,12 @@ class AdvancedMonitoringSystem:
     
     def analyze_current_activity(self) -> Dict[str, Any]:
         """Analyze current system activity"""
+        with self.phase_timer.phase('analyze_total'):
+            return self._analyze_current_activity()
+    
+    def _analyze_current_activity(self) -> Dict[str, Any]:
         analysis = {
-            'timestamp': time.time(),
+            'timestamp': self.source.now(),
             'active_processes': [],
             'screen_content': None,
             'system_metrics': {},
@@ -222,31 +1365,40 @@ class AdvancedMonitoringSystem:
         
         # Get active processes
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                if proc.info['cpu_percent'] > 1.0 or proc.info['memory_percent'] > 1.0:
-                    analysis['active_processes'].append({
-                        'name': proc.info['name'],
-                        'cpu': proc.info['cpu_percent'],
-                        'memory': proc.info['memory_percent']
-                    })
+            with self.phase_timer.phase('process_scan'):
+                for info in self.source.process_snapshot():
+                    if info['cpu_percent'] > 1.0 or info['memory_percent'] > 1.0:
+                        analysis['active_processes'].append({
+                            'name': info['name'],
+                            'cpu': info['cpu_percent'],
+                            'memory': info['memory_percent']
+                        })
         except Exception as e:
             print(f"Process analysis error: {e}")
         
         # Get screen content
-        analysis['screen_content'] = self.extract_screen_text_safe(fast_mode=True)
+        if self.governor:
+            mode = self.governor.mode
+            if mode['ocr_mode']:
+                analysis['screen_content'] = self.extract_screen_text_safe(
+                    fast_mode=mode['ocr_mode'] == 'fast',
+                    reduction=mode['capture_reduction']
+                )
+        else:
+            analysis['screen_content'] = self.extract_screen_text_safe(fast_mode=True)
         
         # System metrics
         try:
-            analysis['system_metrics'] = {
-                'cpu_percent': psutil.cpu_percent(interval=1),
-                'memory_percent': psutil.virtual_memory().percent,
-                'disk_usage': psutil.disk_usage('/').percent
-            }
+            with self.phase_timer.phase('cpu_sample'):
+                cpu_percent = self.source.sample_cpu()
+            with self.phase_timer.phase('system_metrics'):
+                analysis['system_metrics'] = {'cpu_percent': cpu_percent, **self.source.sample_system()}
         except Exception as e:
             print(f"System metrics error: {e}")
         
         # Productivity analysis
-        analysis['productivity_indicators'] = self._analyze_productivity(analysis)
+        with self.phase_timer.phase('productivity'):
+            analysis['productivity_indicators'] = self._analyze_productivity(analysis)
         
         return analysis
     
@@ -286,12 +1438,57 @@ class AdvancedMonitoringSystem:
         
         return indicators
     
-    def start_monitoring(self, interval: float = 30.0):
+    def record_analysis(self, analysis: Dict[str, Any]):
+        """Append an analysis to the compact history buffers"""
+        system_metrics = analysis.get('system_metrics', {})
+        process_names = sorted({p['name'] for p in analysis.get('active_processes', []) if p.get('name')})
+        
+        self.history.append(
+            timestamp=analysis['timestamp'],
+            cpu_percent=system_metrics.get('cpu_percent', 0.0),
+            memory_percent=system_metrics.get('memory_percent', 0.0),
+            disk_usage=system_metrics.get('disk_usage', 0.0),
+            indicator_mask=encode_indicators(analysis.get('productivity_indicators', [])),
+            screen_id=self.text_table.intern(analysis.get('screen_content')),
+            process_id=self.text_table.intern(','.join(process_names)),
+            interval=analysis.get('interval', DEFAULT_SAMPLE_INTERVAL)
+        )
+    
+    def get_recent_activity(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Rebuild the most recent samples from history (text may have been evicted)"""
+        window = self.history.window()
+        start = max(0, len(window['timestamp']) - count)
+        
+        samples = []
+        for i in range(start, len(window['timestamp'])):
+            processes = self.text_table.get(int(window['process_ids'][i]))
+            samples.append({
+                'timestamp': float(window['timestamp'][i]),
+                'interval': float(window['interval'][i]),
+                'system_metrics': {
+                    'cpu_percent': float(window['cpu_percent'][i]),
+                    'memory_percent': float(window['memory_percent'][i]),
+                    'disk_usage': float(window['disk_usage'][i])
+                },
+                'productivity_indicators': decode_indicators(int(window['indicators'][i])),
+                'screen_content': self.text_table.get(int(window['screen_ids'][i])),
+                'active_processes': processes.split(',') if processes else []
+            })
+        return samples
+    
+    def start_monitoring(self, interval: float = 30.0, adaptive: bool = True,
+                         min_interval: float = 5.0, max_interval: float = 600.0):
         """Start continuous monitoring"""
         if self.monitoring_active:
             return
         
         self.monitoring_active = True
+        self._stop_event.clear()
+        self.interval_controller = AdaptiveIntervalController(
+            base_interval=interval,
+            min_interval=min_interval,
+            max_interval=max_interval
+        ) if adaptive else None
         
         def monitoring_loop():
             while self.monitoring_active:
@@ -299,73 +1496,482 @@ class AdvancedMonitoringSystem:
                     # Analyze current activity
                     analysis = self.analyze_current_activity()
                     
+                    # Stay within the overhead budget
+                    interval_factor = 1.0
+                    if self.governor:
+                        self._apply_governor()
+                        interval_factor = self.governor.mode['interval_factor']
+                    
+                    # Effective interval until the next sample, stored as the sample's weight
+                    base = self.interval_controller.update(analysis) if self.interval_controller else interval
+                    analysis['interval'] = max(min_interval, min(max_interval, base * interval_factor))
+                    
                     # Store analysis data
-                    self.screen_history.append(analysis)
+                    self.record_analysis(analysis)
                     
                     # Generate metrics
                     self._generate_metrics_from_analysis(analysis)
                     
-                    time.sleep(interval)
+                    # Periodically persist cycle timings
+                    if self.phase_timer.enabled and time.time() - self._last_stats_persist >= self.stats_persist_interval:
+                        self.persist_stats()
+                    
+                    self.counters['cycles'] += 1
+                    self._stop_event.wait(analysis['interval'])
                     
                 except Exception as e:
+                    self.counters['errors'] += 1
                     print(f"Monitoring error: {e}")
-                    time.sleep(5)  # Wait before retrying
+                    self._stop_event.wait(5)  # Wait before retrying
         
         self.monitoring_thread = threading.Thread(target=monitoring_loop, daemon=True)
         self.monitoring_thread.start()
         
-        print(f"✅ Started advanced monitoring (interval: {interval}s)")
+        mode = f"adaptive {min_interval}-{max_interval}s" if adaptive else "fixed"
+        print(f"✅ Started advanced monitoring (interval: {interval}s, {mode})")
+    
+    def _apply_governor(self):
+        """Update the overhead governor and log any mode change"""
+        change = self.governor.update()
+        if not change:
+            return
+        
+        print(f"⚙️ Monitor mode {change['from_mode']} → {change['to_mode']} "
+              f"(CPU {change['cpu_usage'] * 100:.1f}%/{change['cpu_budget'] * 100:.1f}%, "
+              f"I/O {change['io_rate'] / 1024:.0f}/{change['io_budget'] / 1024:.0f} KiB/s)")
+        try:
+            self.db_manager.store_event('governor_mode_change', change)
+        except Exception as e:
+            print(f"Error logging governor mode change: {e}")
+    
+    def record_session(self, path: Union[str, Path], samples: int = 20, interval: float = 5.0) -> int:
+        """Record live frames with process and system snapshots for later replay"""
+        live = LiveActivitySource()
+        recorded = 0
+        
+        with ActivityRecording(path, 'w') as recording:
+            for i in range(samples):
+                frame = None
+                if live.can_capture:
+                    try:
+                        frame = live.capture_screen()
+                    except Exception as e:
+                        print(f"Screen capture error: {e}")
+                
+                timestamp = live.now()
+                processes = live.process_snapshot()
+                system = {'cpu_percent': live.sample_cpu(), **live.sample_system()}
+                recording.write(timestamp, processes, system, frame)
+                recorded += 1
+                
+                print(f"  Recorded sample {recorded}/{samples}")
+                if i < samples - 1:
+                    time.sleep(interval)
+        
+        return recorded
     
     def stop_monitoring(self):
         """Stop monitoring"""
         self.monitoring_active = False
+        self._stop_event.set()
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=5)
+        if self.phase_timer.enabled:
+            self.persist_stats()
+        if self.shipper:
+            self.shipper.flush()
         print("🛑 Stopped monitoring")
     
+    def persist_stats(self):
+        """Store the current phase histograms as a system event"""
+        try:
+            self.db_manager.store_event('cycle_stats', self.phase_timer.to_dict())
+            self._last_stats_persist = time.time()
+        except Exception as e:
+            print(f"Error persisting cycle stats: {e}")
+    
+    def _store_metric(self, metric: EnhancementMetric):
+        """Store locally, or queue for the collector in agent mode"""
+        if self.shipper:
+            self.shipper.submit(metric)
+        else:
+            self.db_manager.store_metric(metric)
+    
     def _generate_metrics_from_analysis(self, analysis: Dict[str, Any]):
         """Generate enhancement metrics from analysis"""
         timestamp = analysis['timestamp']
+        interval = analysis.get('interval', DEFAULT_SAMPLE_INTERVAL)
         
         # Productivity metrics
         productivity_score = len(analysis.get('productivity_indicators', []))
-        self.db_manager.store_metric(EnhancementMetric(
-            timestamp=timestamp,
-            category='productivity',
-            metric_name='activity_score',
-            value=productivity_score,
-            context={'indicators': analysis.get('productivity_indicators', [])},
-            confidence=0.8
-        ))
+        with self.phase_timer.phase('db_write_productivity'):
+            self._store_metric(EnhancementMetric(
+                timestamp=timestamp,
+                category='productivity',
+                metric_name='activity_score',
+                value=productivity_score,
+                context={'indicators': analysis.get('productivity_indicators', []), 'interval': interval},
+                confidence=0.8
+            ))
         
         # System performance metrics
         system_metrics = analysis.get('system_metrics', {})
         if system_metrics:
-            self.db_manager.store_metric(EnhancementMetric(
-                timestamp=timestamp,
-                category='system',
-                metric_name='performance',
-                value=system_metrics,
-                context={'analysis': 'system_monitoring'}
-            ))
+            with self.phase_timer.phase('db_write_system'):
+                self._store_metric(EnhancementMetric(
+                    timestamp=timestamp,
+                    category='system',
+                    metric_name='performance',
+                    value=system_metrics,
+                    context={'analysis': 'system_monitoring', 'interval': interval}
+                ))
         
         # Screen activity metrics
         screen_text = analysis.get('screen_content')
         if screen_text:
-            self.db_manager.store_metric(EnhancementMetric(
-                timestamp=timestamp,
-                category='activity',
-                metric_name='screen_content_length',
-                value=len(screen_text),
-                context={'has_content': bool(screen_text.strip())}
-            ))
+            with self.phase_timer.phase('db_write_activity'):
+                self._store_metric(EnhancementMetric(
+                    timestamp=timestamp,
+                    category='activity',
+                    metric_name='screen_content_length',
+                    value=len(screen_text),
+                    context={'has_content': bool(screen_text.strip()), 'interval': interval}
+                ))
+
+DEFAULT_RECORDING_PATH = Path.home() / ".enhancement_recording.bin"
+
+def replay_recording(path: Union[str, Path], repeat: int = 1) -> Dict[str, Any]:
+    """Push a recording through the full analysis and metric pipeline as fast as possible"""
+    with ActivityRecording(path, 'r') as recording:
+        samples = list(recording)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        monitoring = AdvancedMonitoringSystem(
+            instrument=True,
+            cpu_budget=None,
+            source=RecordedActivitySource(samples * repeat),
+            db_path=os.path.join(temp_dir, 'replay.db')
+        )
+        timer = monitoring.phase_timer
+        
+        processed = 0
+        start = time.perf_counter()
+        while monitoring.source.advance():
+            analysis = monitoring.analyze_current_activity()
+            monitoring.record_analysis(analysis)
+            with timer.phase('metrics_total'):
+                monitoring._generate_metrics_from_analysis(analysis)
+            processed += 1
+        elapsed = time.perf_counter() - start
+    
+    return {
+        'samples': processed,
+        'elapsed': elapsed,
+        'samples_per_second': processed / elapsed if elapsed > 0 else 0.0,
+        'phases': timer.snapshot()
+    }
+
+class MetricsExporter:
+    """Serves in-memory monitoring state on localhost in the Prometheus text format"""
+    
+    def __init__(self, monitoring: 'AdvancedMonitoringSystem', host: str = '127.0.0.1', port: int = 9477):
+        self.monitoring = monitoring
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+    
+    @staticmethod
+    def format_value(value) -> str:
+        """Exact sample value: ints as ints, floats round-tripped (':g' keeps only 6 significant digits)"""
+        if isinstance(value, numbers.Integral):
+            return str(int(value))
+        value = float(value)
+        if value != value:
+            return 'NaN'
+        if value in (float('inf'), float('-inf')):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    
+    def render(self) -> str:
+        """Build the exposition text from in-memory state only (no DB queries)"""
+        monitoring = self.monitoring
+        lines = []
+        
+        def metric(name: str, metric_type: str, help_text: str, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}' if labels else ''
+                lines.append(f"{name}{label_text} {self.format_value(value)}")
+        
+        latest = monitoring.history.latest()
+        if latest:
+            metric('enhancement_cpu_percent', 'gauge', 'System CPU utilisation at the latest sample',
+                   [({}, latest['cpu_percent'])])
+            metric('enhancement_memory_percent', 'gauge', 'System memory utilisation at the latest sample',
+                   [({}, latest['memory_percent'])])
+            metric('enhancement_disk_percent', 'gauge', 'Root filesystem utilisation at the latest sample',
+                   [({}, latest['disk_usage'])])
+            metric('enhancement_productivity_score', 'gauge', 'Number of productivity indicators at the latest sample',
+                   [({}, bin(latest['indicators']).count('1'))])
+            metric('enhancement_sample_interval_seconds', 'gauge', 'Effective interval of the latest sample',
+                   [({}, latest['interval'])])
+            metric('enhancement_last_sample_timestamp_seconds', 'gauge', 'Unix time of the latest sample',
+                   [({}, latest['timestamp'])])
+        
+        metric('enhancement_cycles_total', 'counter', 'Completed monitoring cycles',
+               [({}, monitoring.counters['cycles'])])
+        metric('enhancement_cycle_errors_total', 'counter', 'Monitoring cycles that raised an error',
+               [({}, monitoring.counters['errors'])])
+        metric('enhancement_metrics_stored_total', 'counter', 'Metric rows written to the database',
+               [({}, monitoring.db_manager.metrics_written)])
+        
+        table = monitoring.text_table
+        lookups = table.hits + table.misses
+        metric('enhancement_text_cache_hits_total', 'counter', 'Deduplicated text table hits',
+               [({}, table.hits)])
+        metric('enhancement_text_cache_misses_total', 'counter', 'Deduplicated text table misses',
+               [({}, table.misses)])
+        metric('enhancement_text_cache_hit_ratio', 'gauge', 'Deduplicated text table hit ratio',
+               [({}, table.hits / lookups if lookups else 0.0)])
+        ocr_lookups = monitoring.ocr_cache_hits + monitoring.ocr_cache_misses
+        metric('enhancement_ocr_cache_hits_total', 'counter', 'Screen captures answered from the OCR result cache',
+               [({}, monitoring.ocr_cache_hits)])
+        metric('enhancement_ocr_cache_misses_total', 'counter', 'Screen captures that needed a fresh OCR pass',
+               [({}, monitoring.ocr_cache_misses)])
+        metric('enhancement_ocr_cache_hit_ratio', 'gauge', 'OCR result cache hit ratio',
+               [({}, monitoring.ocr_cache_hits / ocr_lookups if ocr_lookups else 0.0)])
+        metric('enhancement_history_samples', 'gauge', 'Samples held in the in-memory ring buffer',
+               [({}, len(monitoring.history))])
+        metric('enhancement_history_bytes', 'gauge', 'Memory held by the in-memory ring buffer',
+               [({}, monitoring.history.nbytes())])
+        
+        if monitoring.governor:
+            metric('enhancement_governor_level', 'gauge', 'Overhead governor degradation level (0 = full)',
+                   [({'mode': monitoring.governor.mode['name']}, monitoring.governor.level)])
+            metric('enhancement_monitor_cpu_ratio', 'gauge', 'Monitor CPU time per wall second over the last cycle',
+                   [({}, monitoring.governor.cpu_usage)])
+        
+        # Phase latencies (OCR, capture, DB writes...) as summaries
+        histograms = sorted(monitoring.phase_timer.histograms.items())
+        if histograms:
+            lines.append("# HELP enhancement_phase_latency_seconds Monitoring cycle phase latency")
+            lines.append("# TYPE enhancement_phase_latency_seconds summary")
+            for name, histogram in histograms:
+                for quantile in (0.5, 0.95, 0.99):
+                    value = histogram.percentile(quantile * 100) / 1000.0
+                    lines.append(f'enhancement_phase_latency_seconds{{phase="{name}",quantile="{quantile}"}} {self.format_value(value)}')
+                lines.append(f'enhancement_phase_latency_seconds_sum{{phase="{name}"}} {self.format_value(histogram.total / 1_000_000)}')
+                lines.append(f'enhancement_phase_latency_seconds_count{{phase="{name}"}} {histogram.count}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def start(self):
+        """Start serving /metrics in a background thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        exporter = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+        
+        self.server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"📈 Metrics endpoint: http://{self.host}:{self.port}/metrics")
+    
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+DEFAULT_ARCHIVE_PATH = Path.home() / ".enhancement_archive"
+
+class MetricArchive:
+    """Columnar metric history: one .npy file per typed column, memory-mapped on read"""
+    
+    VERSION = 1
+    DICTIONARY_COLUMNS = ('category', 'metric_name', 'host')
+    COLUMNS = {
+        'timestamp': 'float64',
+        'category': 'int16',
+        'metric_name': 'int16',
+        'host': 'int16',
+        'value': 'float64',
+        'cpu_percent': 'float32',
+        'memory_percent': 'float32',
+        'disk_usage': 'float32',
+        'interval': 'float32',
+        'confidence': 'float32'
+    }
+    
+    def __init__(self, path: Union[str, Path]):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for metric archives")
+        
+        self.path = Path(path)
+        with open(self.path / 'meta.json') as f:
+            self.meta = json.load(f)
+        self.dictionaries = self.meta['dictionaries']
+        self.columns = {
+            name: np.load(self.path / f'{name}.npy', mmap_mode='r')
+            for name in self.meta['columns']
+        }
+    
+    def __len__(self) -> int:
+        return self.meta['rows']
+    
+    def __getitem__(self, name: str):
+        return self.columns[name]
+    
+    def code(self, column: str, label: str) -> int:
+        """Dictionary code for a label, or -1 if it never occurs"""
+        labels = self.dictionaries[column]
+        return labels.index(label) if label in labels else -1
+    
+    def select(self, hours: Optional[float] = None, category: str = None, metric_name: str = None,
+               host: str = None):
+        """Boolean row mask; time windows end at the newest archived sample"""
+        mask = np.ones(len(self), dtype=bool)
+        if hours is not None and len(self):
+            timestamps = self.columns['timestamp']
+            start = np.searchsorted(timestamps, timestamps[-1] - hours * 3600, side='left')
+            mask[:start] = False
+        for column, label in (('category', category), ('metric_name', metric_name), ('host', host)):
+            if label is not None:
+                code = self.code(column, label)
+                if code < 0:
+                    # -1 is also the code stored for missing labels, so an unknown label must match nothing
+                    mask[:] = False
+                else:
+                    mask &= self.columns[column] == code
+        return mask
+    
+    @classmethod
+    def export(cls, db_path: Union[str, Path], path: Union[str, Path], chunk_size: int = 50_000,
+               hours: Optional[float] = None) -> Dict[str, Any]:
+        """Stream the metrics table into a columnar archive, chunk by chunk"""
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for metric archives")
+        from numpy.lib.format import open_memmap
+        
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        since = time.time() - hours * 3600 if hours else 0.0
+        dictionaries = {column: {} for column in cls.DICTIONARY_COLUMNS}
+        
+        def encode(column: str, label: Optional[str]) -> int:
+            if label is None:
+                return -1
+            codes = dictionaries[column]
+            if label not in codes:
+                codes[label] = len(codes)
+            return codes[label]
+        
+        def number(value) -> float:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return float('nan')
+        
+        with sqlite3.connect(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')  # Count and read from one snapshot
+            rows = cursor.execute('SELECT COUNT(*) FROM metrics WHERE timestamp >= ?', (since,)).fetchone()[0]
+            
+            # Pre-sized .npy files, filled in place so memory stays bounded by the chunk size
+            outputs = {
+                name: open_memmap(path / f'{name}.npy', mode='w+', dtype=dtype, shape=(rows,))
+                for name, dtype in cls.COLUMNS.items()
+            }
+            
+            cursor.execute('''
+                SELECT timestamp, category, metric_name, value, context, confidence, host
+                FROM metrics
+                WHERE timestamp >= ?
+                ORDER BY timestamp
+            ''', (since,))
+            
+            offset = 0
+            while offset < rows:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                chunk = chunk[:rows - offset]  # Ignore rows inserted after the count
+                columns = {name: [] for name in cls.COLUMNS}
+                
+                for timestamp, category, metric_name, value, context, confidence, host in chunk:
+                    performance = {}
+                    if value.startswith('{'):
+                        try:
+                            performance = json.loads(value)
+                        except ValueError:
+                            pass
+                    try:
+                        interval = json.loads(context).get('interval', DEFAULT_SAMPLE_INTERVAL) if context else DEFAULT_SAMPLE_INTERVAL
+                    except (ValueError, AttributeError):
+                        interval = DEFAULT_SAMPLE_INTERVAL
+                    
+                    columns['timestamp'].append(timestamp)
+                    columns['category'].append(encode('category', category))
+                    columns['metric_name'].append(encode('metric_name', metric_name))
+                    columns['host'].append(encode('host', host))
+                    columns['value'].append(float('nan') if performance else number(value))
+                    columns['cpu_percent'].append(number(performance.get('cpu_percent')))
+                    columns['memory_percent'].append(number(performance.get('memory_percent')))
+                    columns['disk_usage'].append(number(performance.get('disk_usage')))
+                    columns['interval'].append(number(interval))
+                    columns['confidence'].append(number(confidence))
+                
+                end = offset + len(chunk)
+                for name, values in columns.items():
+                    outputs[name][offset:end] = values
+                offset = end
+            
+            for output in outputs.values():
+                output.flush()
+            del outputs
+        
+        if offset < rows:
+            # Fewer rows than counted: shrink the columns so their length matches meta['rows']
+            for name in cls.COLUMNS:
+                column_path = path / f'{name}.npy'
+                temp_path = path / f'{name}.tmp.npy'
+                np.save(temp_path, np.load(column_path, mmap_mode='r')[:offset])
+                os.replace(temp_path, column_path)
+        
+        meta = {
+            'version': cls.VERSION,
+            'rows': offset,
+            'exported_at': time.time(),
+            'source': str(db_path),
+            'columns': cls.COLUMNS,
+            'dictionaries': {column: list(codes) for column, codes in dictionaries.items()}
+        }
+        with open(path / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=2)
+        
+        return meta
 
 class EnhancementEngine:
     """Core enhancement engine with AI-powered recommendations"""
     
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self.monitoring_system = AdvancedMonitoringSystem()
+        self._monitoring_system = None
         
         # Enhancement categories and their weights
         self.categories = {
@@ -376,20 +1982,32 @@ class EnhancementEngine:
             'system': 0.6
         }
     
-    def analyze_enhancement_opportunities(self) -> List[ActionPlan]:
+    @property
+    def monitoring_system(self) -> AdvancedMonitoringSystem:
+        """Created on first use; analyze/report never start monitoring"""
+        if self._monitoring_system is None:
+            self._monitoring_system = AdvancedMonitoringSystem()
+        return self._monitoring_system
+    
+    def analyze_enhancement_opportunities(self, archive: MetricArchive = None, hours: float = 24) -> List[ActionPlan]:
         """Analyze current state and generate enhancement opportunities"""
         action_plans = []
         
-        # Get recent metrics
-        recent_metrics = self.db_manager.get_metrics(hours=24)
-        
-        # Analyze productivity patterns
-        productivity_plans = self._analyze_productivity_opportunities(recent_metrics)
-        action_plans.extend(productivity_plans)
-        
-        # Analyze system optimization opportunities
-        system_plans = self._analyze_system_opportunities(recent_metrics)
-        action_plans.extend(system_plans)
+        if archive is not None:
+            # Vectorized analysis straight from the columnar archive
+            action_plans.extend(self._analyze_archive_productivity(archive, hours))
+            action_plans.extend(self._analyze_archive_system(archive, hours))
+        else:
+            # Get recent metrics
+            recent_metrics = self.db_manager.get_metrics(hours=hours)
+            
+            # Analyze productivity patterns
+            productivity_plans = self._analyze_productivity_opportunities(recent_metrics)
+            action_plans.extend(productivity_plans)
+            
+            # Analyze system optimization opportunities
+            system_plans = self._analyze_system_opportunities(recent_metrics)
+            action_plans.extend(system_plans)
         
         # Analyze skill development opportunities
         skill_plans = self._generate_skill_development_plans()
@@ -412,29 +2030,48 @@ class EnhancementEngine:
         productivity_metrics = [m for m in metrics if m.category == 'productivity']
         
         if productivity_metrics:
-            avg_score = sum(float(m.value) for m in productivity_metrics) / len(productivity_metrics)
-            
-            if avg_score < 3:
-                plans.append(ActionPlan(
-                    priority=9,
-                    category='productivity',
-                    action='implement_pomodoro_technique',
-                    description='Implement Pomodoro technique with 25-min focused work sessions',
-                    estimated_impact=8.5,
-                    estimated_effort=4.0,
-                    resources=['timer_app', 'task_list', 'distraction_blocking']
-                ))
-            
-            if avg_score < 5:
-                plans.append(ActionPlan(
-                    priority=7,
-                    category='productivity',
-                    action='optimize_workspace_setup',
-                    description='Optimize physical and digital workspace for maximum efficiency',
-                    estimated_impact=7.0,
-                    estimated_effort=6.0,
-                    resources=['ergonomic_assessment', 'digital_organization', 'automation_tools']
-                ))
+            # Weight each sample by the interval it represents (adaptive sampling)
+            weights = [float(m.context.get('interval', DEFAULT_SAMPLE_INTERVAL)) for m in productivity_metrics]
+            avg_score = sum(float(m.value) * w for m, w in zip(productivity_metrics, weights)) / sum(weights)
+            plans.extend(self._productivity_plans(avg_score))
+        
+        return plans
+    
+    def _analyze_archive_productivity(self, archive: MetricArchive, hours: float) -> List[ActionPlan]:
+        """Interval-weighted productivity score over an archive window"""
+        mask = archive.select(hours, category='productivity')
+        if not mask.any():
+            return []
+        
+        weights = archive['interval'][mask].astype(np.float64)
+        avg_score = float(np.average(archive['value'][mask], weights=weights))
+        return self._productivity_plans(avg_score)
+    
+    def _productivity_plans(self, avg_score: float) -> List[ActionPlan]:
+        """Productivity action plans for an average activity score"""
+        plans = []
+        
+        if avg_score < 3:
+            plans.append(ActionPlan(
+                priority=9,
+                category='productivity',
+                action='implement_pomodoro_technique',
+                description='Implement Pomodoro technique with 25-min focused work sessions',
+                estimated_impact=8.5,
+                estimated_effort=4.0,
+                resources=['timer_app', 'task_list', 'distraction_blocking']
+            ))
+        
+        if avg_score < 5:
+            plans.append(ActionPlan(
+                priority=7,
+                category='productivity',
+                action='optimize_workspace_setup',
+                description='Optimize physical and digital workspace for maximum efficiency',
+                estimated_impact=7.0,
+                estimated_effort=6.0,
+                resources=['ergonomic_assessment', 'digital_organization', 'automation_tools']
+            ))
         
         return plans
     
@@ -446,33 +2083,93 @@ class EnhancementEngine:
         
         for metric in system_metrics[-5:]:  # Check recent system metrics
             if isinstance(metric.value, dict):
-                cpu_usage = metric.value.get('cpu_percent', 0)
-                memory_usage = metric.value.get('memory_percent', 0)
-                
-                if cpu_usage > 80:
-                    plans.append(ActionPlan(
-                        priority=8,
-                        category='system',
-                        action='optimize_cpu_usage',
-                        description='Identify and optimize high CPU usage processes',
-                        estimated_impact=7.5,
-                        estimated_effort=5.0,
-                        resources=['htop', 'process_analyzer', 'system_tuning']
-                    ))
-                
-                if memory_usage > 85:
-                    plans.append(ActionPlan(
-                        priority=8,
-                        category='system',
-                        action='optimize_memory_usage',
-                        description='Free up memory and optimize RAM usage',
-                        estimated_impact=7.0,
-                        estimated_effort=4.0,
-                        resources=['memory_profiler', 'cache_cleaner', 'swap_optimization']
-                    ))
+                plans.extend(self._system_plans(metric.value.get('cpu_percent', 0),
+                                                metric.value.get('memory_percent', 0)))
+        
+        return plans
+    
+    def _analyze_archive_system(self, archive: MetricArchive, hours: float) -> List[ActionPlan]:
+        """System plans from the most recent archived performance samples"""
+        rows = np.flatnonzero(archive.select(hours, category='system'))[-5:]
+        cpu = np.nan_to_num(archive['cpu_percent'][rows])
+        memory = np.nan_to_num(archive['memory_percent'][rows])
         
+        plans = []
+        for cpu_usage, memory_usage in zip(cpu.tolist(), memory.tolist()):
+            plans.extend(self._system_plans(cpu_usage, memory_usage))
         return plans
     
+    def _system_plans(self, cpu_usage: float, memory_usage: float) -> List[ActionPlan]:
+        """System action plans for one CPU/memory sample"""
+        plans = []
+        
+        if cpu_usage > 80:
+            plans.append(ActionPlan(
+                priority=8,
+                category='system',
+                action='optimize_cpu_usage',
+                description='Identify and optimize high CPU usage processes',
+                estimated_impact=7.5,
+                estimated_effort=5.0,
+                resources=['htop', 'process_analyzer', 'system_tuning']
+            ))
+        
+        if memory_usage > 85:
+            plans.append(ActionPlan(
+                priority=8,
+                category='system',
+                action='optimize_memory_usage',
+                description='Free up memory and optimize RAM usage',
+                estimated_impact=7.0,
+                estimated_effort=4.0,
+                resources=['memory_profiler', 'cache_cleaner', 'swap_optimization']
+            ))
+        
+        return plans
+    
+    def archive_trends(self, archive: MetricArchive, hours: float = 168) -> List[Dict[str, Any]]:
+        """Daily productivity and system load trends over an archive window"""
+        window = archive.select(hours)
+        if not window.any():
+            return []
+        
+        # Bucket by local calendar day
+        timestamps = archive['timestamp'][window]
+        utc_offset = datetime.fromtimestamp(timestamps[-1]).astimezone().utcoffset().total_seconds()
+        day_numbers = ((timestamps + utc_offset) // 86400).astype(np.int64)
+        first_day = int(day_numbers[0])
+        days = day_numbers - first_day
+        day_count = int(days[-1]) + 1
+        
+        productivity = archive['category'][window] == archive.code('category', 'productivity')
+        weights = np.where(productivity, archive['interval'][window], 0.0)
+        scores = np.where(productivity, archive['value'][window], 0.0)
+        weight_sums = np.bincount(days, weights=weights, minlength=day_count)
+        score_sums = np.bincount(days, weights=scores * weights, minlength=day_count)
+        
+        trends = []
+        for column in ('cpu_percent', 'memory_percent'):
+            values = archive[column][window]
+            valid = ~np.isnan(values)
+            counts = np.bincount(days[valid], minlength=day_count)
+            sums = np.bincount(days[valid], weights=values[valid], minlength=day_count)
+            peaks = np.full(day_count, np.nan)
+            np.fmax.at(peaks, days[valid], values[valid])
+            trends.append((np.divide(sums, counts, out=np.full(day_count, np.nan), where=counts > 0), peaks))
+        
+        (cpu_mean, cpu_max), (memory_mean, memory_max) = trends
+        return [
+            {
+                'date': datetime.fromtimestamp((first_day + day) * 86400 - utc_offset).strftime('%Y-%m-%d'),
+                'productivity_score': float(score_sums[day] / weight_sums[day]) if weight_sums[day] else None,
+                'cpu_mean': float(cpu_mean[day]),
+                'cpu_max': float(cpu_max[day]),
+                'memory_mean': float(memory_mean[day]),
+                'memory_max': float(memory_max[day])
+            }
+            for day in range(day_count)
+        ]
+    
     def _generate_skill_development_plans(self) -> List[ActionPlan]:
         """Generate skill development opportunities"""
         return [
@@ -580,13 +2277,25 @@ class EnhancementEngine:
                     'confidence': sum(m.confidence for m in category_metrics) / len(category_metrics)
                 }
         
+        # Downsampled 24h trends
+        report['trends'] = {
+            series: self.db_manager.query_series(series, hours=24, points=48)
+            for series in ('productivity.activity_score', 'system.performance.cpu_percent',
+                           'system.performance.memory_percent')
+        }
+        
         # Get enhancement opportunities
         report['action_plans'] = [asdict(plan) for plan in self.analyze_enhancement_opportunities()]
         
-        # System status
+        # System status (reuse a fresh monitoring sample instead of blocking for a 1s CPU reading)
+        latest = next((m for m in recent_metrics if m.category == 'system' and isinstance(m.value, dict)), None)
+        if latest and time.time() - latest.timestamp <= 120 and 'cpu_percent' in latest.value:
+            cpu_percent = latest.value['cpu_percent']
+        else:
+            cpu_percent = None
         try:
             report['system_status'] = {
-                'cpu_percent': psutil.cpu_percent(interval=1),
+                'cpu_percent': cpu_percent if cpu_percent is not None else psutil.cpu_percent(interval=1),
                 'memory_percent': psutil.virtual_memory().percent,
                 'disk_usage': psutil.disk_usage('/').percent,
                 'uptime': time.time() - psutil.boot_time()
@@ -617,14 +2326,44 @@ def main():
         
         if command == 'monitor':
             print("Starting monitoring system...")
+            exporter = None
+            if '--metrics-port' in sys.argv:
+                port = int(sys.argv[sys.argv.index('--metrics-port') + 1])
+                exporter = MetricsExporter(engine.monitoring_system, port=port)
+                exporter.start()
+            
             engine.monitoring_system.start_monitoring(interval=30.0)
             try:
                 while True:
                     time.sleep(1)
             except KeyboardInterrupt:
                 engine.monitoring_system.stop_monitoring()
+                if exporter:
+                    exporter.stop()
                 print("\n👋 Monitoring stopped")
         
+        elif command == 'agent':
+            address = sys.argv[2] if len(sys.argv) > 2 and not sys.argv[2].startswith('--') else DEFAULT_COLLECTOR_ADDRESS
+            host = sys.argv[sys.argv.index('--host') + 1] if '--host' in sys.argv else None
+            shipper = MetricShipper(address, host=host)
+            
+            print(f"Starting monitoring agent {shipper.host} → {address}...")
+            monitoring = AdvancedMonitoringSystem(shipper=shipper)
+            monitoring.start_monitoring(interval=30.0)
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                monitoring.stop_monitoring()
+                print(f"\n👋 Agent stopped ({shipper.sent} batches sent, {shipper.spooled} spooled)")
+        
+        elif command == 'collect':
+            address = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_COLLECTOR_ADDRESS
+            try:
+                engine.db_manager.run_collector(address)
+            except KeyboardInterrupt:
+                print("\n👋 Collector stopped")
+        
         elif command == 'analyze':
             print("Analyzing enhancement opportunities...")
             plans = engine.analyze_enhancement_opportunities()
@@ -655,6 +2394,103 @@ def main():
             for i, rec in enumerate(report['recommendations'], 1):
                 print(f"  {i}. {rec}")
         
+        elif command == 'stats':
+            print("Loading monitoring cycle statistics...")
+            event = engine.db_manager.get_latest_event('cycle_stats')
+            if not event:
+                print("❌ No cycle statistics recorded yet - run 'monitor' first")
+                return
+            
+            phases = event['data'].get('phases', {})
+            recorded_at = datetime.fromtimestamp(event['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"\n⏱️ Cycle phase latencies (recorded {recorded_at}):")
+            print(f"  {'Phase':<24} {'Count':>7} {'Mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'Max':>9}")
+            for name in sorted(phases):
+                summary = LatencyHistogram.from_dict(phases[name]).summary()
+                print(f"  {name:<24} {summary['count']:>7} {summary['mean_ms']:>7.1f}ms "
+                      f"{summary['p50_ms']:>7.1f}ms {summary['p95_ms']:>7.1f}ms "
+                      f"{summary['p99_ms']:>7.1f}ms {summary['max_ms']:>7.1f}ms")
+        
+        elif command == 'series':
+            series = sys.argv[2] if len(sys.argv) > 2 else 'system.performance.cpu_percent'
+            hours = float(sys.argv[3]) if len(sys.argv) > 3 else 24
+            points = int(sys.argv[4]) if len(sys.argv) > 4 else 24
+            
+            start = time.perf_counter()
+            buckets = engine.db_manager.query_series(series, hours=hours, points=points)
+            elapsed = time.perf_counter() - start
+            
+            print(f"\n📈 {series} over {hours:g}h ({len(buckets)} buckets, {elapsed * 1000:.1f}ms):")
+            print(f"  {'Bucket':<17} {'Min':>8} {'Avg':>8} {'Max':>8} {'Samples':>8}")
+            for bucket in buckets:
+                label = datetime.fromtimestamp(bucket['timestamp']).strftime('%m-%d %H:%M')
+                print(f"  {label:<17} {bucket['min']:>8.2f} {bucket['avg']:>8.2f} {bucket['max']:>8.2f} {bucket['count']:>8}")
+        
+        elif command == 'export':
+            path = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ARCHIVE_PATH
+            hours = float(sys.argv[3]) if len(sys.argv) > 3 else None
+            if not NUMPY_AVAILABLE:
+                print("❌ numpy is required for columnar export")
+                return
+            
+            print(f"Exporting metrics to {path}...")
+            start = time.perf_counter()
+            meta = MetricArchive.export(engine.db_manager.db_path, path, hours=hours)
+            size = sum(f.stat().st_size for f in path.iterdir())
+            print(f"✅ Exported {meta['rows']} metrics in {time.perf_counter() - start:.2f}s "
+                  f"({size / 1024:.1f} KB)")
+        
+        elif command == 'trends':
+            path = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_ARCHIVE_PATH
+            hours = float(sys.argv[3]) if len(sys.argv) > 3 else 168
+            if not (path / 'meta.json').exists():
+                print(f"❌ Archive not found: {path} - run 'export' first")
+                return
+            
+            archive = MetricArchive(path)
+            start = time.perf_counter()
+            trends = engine.archive_trends(archive, hours)
+            plans = engine.analyze_enhancement_opportunities(archive=archive, hours=hours)
+            elapsed = time.perf_counter() - start
+            
+            print(f"\n📈 Daily trends ({len(archive)} archived metrics, {elapsed * 1000:.1f}ms):")
+            print(f"  {'Date':<12} {'Score':>6} {'CPU avg':>8} {'CPU max':>8} {'Mem avg':>8} {'Mem max':>8}")
+            for day in trends:
+                score = f"{day['productivity_score']:.2f}" if day['productivity_score'] is not None else '-'
+                print(f"  {day['date']:<12} {score:>6} {day['cpu_mean']:>7.1f}% {day['cpu_max']:>7.1f}% "
+                      f"{day['memory_mean']:>7.1f}% {day['memory_max']:>7.1f}%")
+            
+            print(f"\n🎯 Top opportunities:")
+            for i, plan in enumerate(plans[:5], 1):
+                print(f"  {i}. {plan.description}")
+        
+        elif command == 'record':
+            path = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RECORDING_PATH
+            samples = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+            interval = float(sys.argv[4]) if len(sys.argv) > 4 else 5.0
+            
+            print(f"Recording {samples} samples every {interval}s to {path}...")
+            recorded = engine.monitoring_system.record_session(path, samples, interval)
+            print(f"✅ Recorded {recorded} samples ({path.stat().st_size / 1024:.1f} KB)")
+        
+        elif command == 'replay':
+            path = Path(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RECORDING_PATH
+            repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+            if not path.exists():
+                print(f"❌ Recording not found: {path} - run 'record' first")
+                return
+            
+            print(f"Replaying {path} (x{repeat})...")
+            result = replay_recording(path, repeat)
+            
+            print(f"\n🏁 {result['samples']} samples in {result['elapsed']:.3f}s "
+                  f"({result['samples_per_second']:.1f} samples/s)")
+            print(f"  {'Phase':<24} {'Count':>7} {'Mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'Max':>9}")
+            for name, summary in result['phases'].items():
+                print(f"  {name:<24} {summary['count']:>7} {summary['mean_ms']:>7.2f}ms "
+                      f"{summary['p50_ms']:>7.2f}ms {summary['p95_ms']:>7.2f}ms "
+                      f"{summary['p99_ms']:>7.2f}ms {summary['max_ms']:>7.2f}ms")
+        
         elif command == 'test-ocr':
             print("Testing OCR capabilities...")
             if not OCR_AVAILABLE:
@@ -670,7 +2506,8 @@ def main():
         
         else:
             print(f"Unknown command: {command}")
-            print("Available commands: monitor, analyze, report, test-ocr")
+            print("Available commands: monitor, agent, collect, analyze, report, stats, series, export, trends, "
+                  "record, replay, test-ocr")
     
     else:
         # Interactive mode
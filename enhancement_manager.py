@@ -6,13 +6,341 @@ Central control hub for all personal enhancement tools
 
 import os
 import sys
+import time
+import signal
+import socket
+import selectors
+import importlib
 import subprocess
 import json
+import hashlib
 from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
 import argparse
 
+# Warm-start fork server: one parent keeps heavy modules imported and forks a child per command
+FORK_SERVER_SOCKET = Path.home() / ".enhancement_forkserver.sock"
+FORK_SERVER_UNAVAILABLE = 75  # Launcher client exit status when no server answered (EX_TEMPFAIL)
+FORK_SERVER_REQUEST_TIMEOUT = 5.0  # Seconds a connected client may take to send its request
+TEST_CACHE_PATH = Path.home() / ".enhancement_test_cache.json"
+TEST_TIMEOUT = 30
+# Import-time budgets (ms, cumulative per 'python -X importtime') for every entry point
+IMPORT_BUDGETS_MS = {
+    'advanced_enhancement_system': 80,
+    'enhancement_manager': 60,
+    'integrate_ocr_timeout_fix': 300,
+    'tesseract_timeout_fix_working': 300
+}
+
+FORK_SERVER_PRELOAD = (
+    'psutil', 'numpy', 'sqlite3', 'PIL.Image', 'PIL.ImageGrab', 'pytesseract',
+    'tesseract_timeout_fix_working', 'advanced_enhancement_system'
+)
+
+def fork_server_request(script, args, cwd, fds=(0, 1, 2), timeout=None, socket_path=None):
+    """Run a system script in the fork server; returns its exit status, or None if no server is running"""
+    # Self-contained: the launcher embeds this function's source and runs it under 'python3 -S'
+    import os, json, socket
+    
+    path = str(socket_path or os.path.expanduser('~/.enhancement_forkserver.sock'))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    
+    with sock:
+        request = {'script': script, 'args': list(args), 'cwd': str(cwd), 'env': dict(os.environ)}
+        socket.send_fds(sock, [json.dumps(request).encode()], list(fds))
+        sock.settimeout(timeout)
+        while True:
+            try:
+                reply = sock.recv(65536)
+                break
+            except KeyboardInterrupt:
+                sock.send(b'INT')  # Ctrl+C reaches this client, not the forked child
+            except TimeoutError:
+                sock.send(b'KILL')
+                raise
+    
+    try:
+        return json.loads(reply)['exit']
+    except (ValueError, KeyError):
+        return 1
+
+class ForkServer:
+    """Long-lived parent that pre-imports heavy modules and forks a child per command"""
+    
+    def __init__(self, manager: 'EnhancementManager', socket_path: Path = FORK_SERVER_SOCKET):
+        self.manager = manager
+        self.socket_path = Path(socket_path)
+        self.modules = {}   # script path -> (mtime, preloaded module with main())
+        self.children = {}  # pid -> client connection
+        self.pending = {}   # client connection -> deadline for its request
+        self._wakeup = None
+    
+    def allowed_scripts(self) -> Dict[str, Path]:
+        scripts = [info['script'] for info in self.manager.systems.values()]
+        scripts += [info['script'] for info in self.manager.legacy_systems.values()]
+        return {script: self.manager.home_dir / script for script in scripts}
+    
+    def preload(self):
+        """Import heavy dependencies and the system modules once, in the parent"""
+        sys.path.insert(0, str(self.manager.home_dir))
+        start = time.perf_counter()
+        for name in FORK_SERVER_PRELOAD:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                pass  # Optional dependency; children import it themselves if needed
+        
+        for script, path in self.allowed_scripts().items():
+            module = sys.modules.get(path.stem)
+            module_file = getattr(module, '__file__', None)
+            if module_file and Path(module_file).resolve() == path.resolve() and hasattr(module, 'main'):
+                self.modules[str(path)] = (path.stat().st_mtime, module)
+        
+        print(f"🔥 Preloaded {len(sys.modules)} modules in {time.perf_counter() - start:.2f}s")
+    
+    def serve(self):
+        """Accept commands until interrupted"""
+        if fork_server_request('', [], '.', fds=(), socket_path=self.socket_path) is not None:
+            print(f"⚠️ Fork server already running on {self.socket_path}")
+            return
+        
+        self.preload()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        listener.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(16)
+        
+        # SIGCHLD wakes the selector through a socketpair so exits are reported immediately
+        self._wakeup = socket.socketpair()
+        for end in self._wakeup:
+            end.setblocking(False)
+        signal.set_wakeup_fd(self._wakeup[1].fileno())
+        signal.signal(signal.SIGCHLD, lambda *args: None)
+        signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+        
+        selector = selectors.DefaultSelector()
+        selector.register(listener, selectors.EVENT_READ)
+        selector.register(self._wakeup[0], selectors.EVENT_READ)
+        print(f"✅ Fork server listening on {self.socket_path}")
+        
+        try:
+            while True:
+                for key, _ in selector.select(FORK_SERVER_REQUEST_TIMEOUT if self.pending else None):
+                    if key.fileobj is listener:
+                        self._accept(listener, selector)
+                    elif key.fileobj is self._wakeup[0]:
+                        self._drain_wakeup()
+                    elif key.data is None:
+                        self._start(key.fileobj, listener, selector)
+                    else:
+                        self._forward_signal(key.fileobj, key.data, selector)
+                self._expire_pending(selector)
+                self._reap(selector)
+        except KeyboardInterrupt:
+            print("\n⏹️ Fork server stopped")
+        finally:
+            signal.set_wakeup_fd(-1)
+            listener.close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+    
+    def _accept(self, listener, selector):
+        """Register a new client; its request is read once the selector reports it readable"""
+        conn, _ = listener.accept()
+        conn.setblocking(False)
+        self.pending[conn] = time.monotonic() + FORK_SERVER_REQUEST_TIMEOUT
+        selector.register(conn, selectors.EVENT_READ)
+    
+    def _expire_pending(self, selector):
+        """Drop clients that connected but never sent a request"""
+        now = time.monotonic()
+        for conn, deadline in list(self.pending.items()):
+            if deadline <= now:
+                del self.pending[conn]
+                selector.unregister(conn)
+                conn.close()
+    
+    def _start(self, conn, listener, selector):
+        """Read a client's request and fork the command"""
+        fds = []
+        try:
+            data, fds, _, _ = socket.recv_fds(conn, 1 << 20, 3)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        del self.pending[conn]
+        selector.unregister(conn)
+        try:
+            if not data:
+                raise ValueError("client closed before sending a request")
+            request = json.loads(data)
+            script = self.allowed_scripts().get(request['script'])
+            if not script or len(fds) != 3:
+                raise ValueError(f"unknown system script: {request['script']!r}")
+        except Exception as e:
+            if fds:  # Requests without descriptors are liveness probes
+                print(f"❌ Rejected fork server request: {e}")
+            for fd in fds:
+                os.close(fd)
+            try:
+                conn.send(json.dumps({'exit': 1, 'error': str(e)}).encode())
+            except OSError:
+                pass
+            conn.close()
+            return
+        
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            for sock in (listener, conn, *self.pending) + self._wakeup:
+                sock.close()
+            self._run_child(str(script), request, fds)
+        
+        for fd in fds:
+            os.close(fd)
+        self.children[pid] = conn
+        selector.register(conn, selectors.EVENT_READ, pid)
+    
+    def _run_child(self, script: str, request: Dict[str, Any], fds: List[int]):
+        """Become the requested command; never returns"""
+        import runpy, traceback
+        code = 0
+        try:
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            sys.stdin = open(0, 'r', closefd=False)
+            sys.stdout = open(1, 'w', buffering=1 if os.isatty(1) else -1, closefd=False)
+            sys.stderr = open(2, 'w', buffering=1, closefd=False)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            
+            os.chdir(request['cwd'])
+            os.environ.clear()
+            os.environ.update(request['env'])
+            sys.argv = [script] + request['args']
+            
+            mtime, module = self.modules.get(script, (None, None))
+            if module and os.stat(script).st_mtime == mtime:
+                module.main()
+            else:
+                # run_module reuses cached bytecode, unlike running the file as a script
+                runpy.run_module(Path(script).stem, run_name='__main__', alter_sys=True)
+        except SystemExit as e:
+            if isinstance(e.code, int) or e.code is None:
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except KeyboardInterrupt:
+            code = 130
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code)
+    
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup[0].recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+    
+    def _forward_signal(self, conn, pid: int, selector):
+        """Relay Ctrl+C / timeouts from the client; hang up the child if the client went away"""
+        try:
+            message = conn.recv(16)
+        except OSError:
+            message = b''
+        
+        if not message:
+            selector.unregister(conn)
+        signals = {b'INT': signal.SIGINT, b'KILL': signal.SIGKILL, b'': signal.SIGHUP}
+        if message in signals:
+            try:
+                os.kill(pid, signals[message])
+            except ProcessLookupError:
+                pass
+    
+    def _reap(self, selector):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            
+            conn = self.children.pop(pid, None)
+            if conn is None:
+                continue
+            try:
+                selector.unregister(conn)
+            except KeyError:
+                pass
+            try:
+                conn.send(json.dumps({'exit': os.waitstatus_to_exitcode(status)}).encode())
+            except OSError:
+                pass
+            conn.close()
+
+def _run_captured(home_dir: Path, sys_info: Dict[str, Any], timeout: float) -> subprocess.CompletedProcess:
+    """Run a system's test command, through the fork server when one is running"""
+    import tempfile  # Deferred: keeps 'enhance' start-up inside the import budget
+    command = sys_info['test_command'].split()
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr, \
+            open(os.devnull, 'rb') as stdin:
+        status = fork_server_request(sys_info['script'], command[2:], home_dir,
+                                     fds=(stdin.fileno(), stdout.fileno(), stderr.fileno()),
+                                     timeout=timeout)
+        if status is not None:
+            stdout.seek(0)
+            stderr.seek(0)
+            return subprocess.CompletedProcess(command, status,
+                                               stdout.read().decode(errors='replace'),
+                                               stderr.read().decode(errors='replace'))
+    
+    return subprocess.run(
+        command,
+        cwd=home_dir,
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+
+def run_health_check(home_dir: Path, sys_info: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """Run one system's test command and time it (module-level so a process pool can pickle it)"""
+    start = time.perf_counter()
+    try:
+        result = _run_captured(home_dir, sys_info, timeout)
+        verdict = {'status': 'passed' if result.returncode == 0 else 'failed',
+                   'stdout': result.stdout[:200], 'stderr': result.stderr[:200]}
+    except (subprocess.TimeoutExpired, TimeoutError):
+        verdict = {'status': 'timeout', 'stdout': '', 'stderr': f"no result after {timeout}s"}
+    except Exception as e:
+        verdict = {'status': 'error', 'stdout': '', 'stderr': str(e)}
+    
+    verdict['duration'] = round(time.perf_counter() - start, 3)
+    return verdict
+
 class EnhancementManager:
     """Central manager for all enhancement systems"""
     
@@ -39,9 +367,17 @@ class EnhancementManager:
                 'script': 'advanced_enhancement_system.py',
                 'test_command': 'python advanced_enhancement_system.py',
                 'commands': {
-                    'monitor': 'Start continuous monitoring',
+                    'monitor': 'Start continuous monitoring (--metrics-port N serves Prometheus metrics)',
+                    'agent': 'Monitor and push metrics to a collector (agent [host:port|socket] [--host NAME])',
+                    'collect': 'Aggregate metrics pushed by agents holding the shared token (collect [127.0.0.1:port|socket])',
+                    'series': 'Downsampled min/avg/max of a metric series (series [name] [hours] [points])',
+                    'export': 'Export metric history to a columnar archive (export [dir] [hours])',
+                    'trends': 'Daily trends and plans from a columnar archive (trends [dir] [hours])',
                     'analyze': 'Analyze enhancement opportunities',
                     'report': 'Generate comprehensive report',
+                    'stats': 'Show monitoring cycle phase latencies',
+                    'record': 'Record frames and snapshots for replay',
+                    'replay': 'Benchmark the analysis pipeline on a recording',
                     'test-ocr': 'Test OCR capabilities'
                 },
                 'status': 'available'
@@ -71,6 +407,7 @@ class EnhancementManager:
                 'description': 'AI-powered income and career optimization'
             }
         }
+        self._test_cache = None
     
     def check_system_status(self) -> Dict[str, Any]:
         """Check status of all enhancement systems"""
@@ -80,19 +417,23 @@ class EnhancementManager:
             'system_details': {}
         }
         
-        # Check main systems
+        # Check main systems (one stat per script, cached verdict when the script is unchanged)
         for sys_id, sys_info in self.systems.items():
             script_path = self.home_dir / sys_info['script']
-            if script_path.exists():
-                status['available_systems'].append(sys_id)
-                status['system_details'][sys_id] = {
-                    **sys_info,
-                    'path': str(script_path),
-                    'size': script_path.stat().st_size,
-                    'modified': datetime.fromtimestamp(script_path.stat().st_mtime).isoformat()
-                }
-            else:
+            try:
+                st = script_path.stat()
+            except OSError:
                 status['missing_systems'].append(sys_id)
+                continue
+            
+            status['available_systems'].append(sys_id)
+            status['system_details'][sys_id] = {
+                **sys_info,
+                'path': str(script_path),
+                'size': st.st_size,
+                'modified': datetime.fromtimestamp(st.st_mtime).isoformat(),
+                'last_test': self._cached_verdict(sys_id, script_path, st)
+            }
         
         # Check legacy systems
         for sys_id, sys_info in self.legacy_systems.items():
@@ -127,6 +468,9 @@ class EnhancementManager:
                 print(f"  📄 {details['name']}{legacy_tag}")
                 print(f"     {details['description']}")
                 print(f"     Script: {details['script']}")
+                last_test = details.get('last_test')
+                if last_test:
+                    print(f"     Last test: {last_test['status']} ({last_test['duration']:.2f}s, {last_test['tested_at']})")
         
         if status['missing_systems']:
             print(f"\n⚠️ Missing Systems:")
@@ -135,46 +479,197 @@ class EnhancementManager:
                 print(f"  ❌ {sys_info['name']}")
                 print(f"     Script: {sys_info['script']}")
     
-    def test_system(self, system_id: str) -> bool:
+    @property
+    def test_cache(self) -> Dict[str, Any]:
+        """Test verdicts keyed by system ID, loaded from TEST_CACHE_PATH on first use"""
+        if self._test_cache is None:
+            try:
+                self._test_cache = json.loads(TEST_CACHE_PATH.read_text())
+            except (OSError, ValueError):
+                self._test_cache = {}
+        return self._test_cache
+    
+    def _save_test_cache(self):
+        """Write the verdict cache atomically"""
+        temp_path = TEST_CACHE_PATH.with_suffix('.tmp')
+        try:
+            temp_path.write_text(json.dumps(self.test_cache, indent=2))
+            os.replace(temp_path, TEST_CACHE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not save test cache: {e}")
+    
+    def _script_digest(self, sys_id: str, script_path: Path, st: os.stat_result) -> str:
+        """Content hash of a system script; the cached digest is reused while size and mtime match"""
+        entry = self.test_cache.get(sys_id, {})
+        if entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+            return entry['digest']
+        return hashlib.sha256(script_path.read_bytes()).hexdigest()
+    
+    def _cached_verdict(self, sys_id: str, script_path: Path, st: os.stat_result):
+        """Cached test verdict for a system, or None if its script or test command changed"""
+        entry = self.test_cache.get(sys_id)
+        if (not entry or entry.get('command') != self.systems[sys_id]['test_command']
+                or entry.get('python') != sys.executable):
+            return None
+        return entry if entry['digest'] == self._script_digest(sys_id, script_path, st) else None
+    
+    def run_tests(self, system_ids: List[str], timeout: float = TEST_TIMEOUT, jobs: int = None,
+                  use_cache: bool = True, on_result=None) -> Dict[str, Dict[str, Any]]:
+        """Test systems concurrently, reusing verdicts for scripts whose content is unchanged"""
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        results = {}
+        pending = {}
+        
+        for sys_id in system_ids:
+            sys_info = self.systems[sys_id]
+            script_path = self.home_dir / sys_info['script']
+            try:
+                st = script_path.stat()
+            except OSError:
+                results[sys_id] = {'status': 'missing', 'duration': 0.0, 'stdout': '',
+                                   'stderr': f"System script not found: {script_path}", 'cached': False}
+                continue
+            
+            cached = self._cached_verdict(sys_id, script_path, st) if use_cache else None
+            if cached:
+                results[sys_id] = {**cached, 'cached': True}
+            else:
+                pending[sys_id] = (sys_info, script_path, st, self._script_digest(sys_id, script_path, st))
+        
+        if on_result:
+            for sys_id, result in results.items():
+                on_result(sys_id, result)
+        
+        def record(sys_id: str, verdict: Dict[str, Any]):
+            sys_info, script_path, st, digest = pending[sys_id]
+            results[sys_id] = {**verdict, 'cached': False}
+            # Timeouts and launch errors are transient; only real pass/fail verdicts are cached
+            if verdict['status'] in ('passed', 'failed'):
+                self.test_cache[sys_id] = {**verdict, 'digest': digest, 'mtime_ns': st.st_mtime_ns,
+                                           'size': st.st_size, 'command': sys_info['test_command'],
+                                           'python': sys.executable,
+                                           'tested_at': datetime.now().isoformat(timespec='seconds')}
+            if on_result:
+                on_result(sys_id, results[sys_id])
+        
+        jobs = min(len(pending), jobs or (os.cpu_count() or 1) + 4)
+        if jobs <= 1:
+            for sys_id, (sys_info, *_) in pending.items():
+                record(sys_id, run_health_check(self.home_dir, sys_info, timeout))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {pool.submit(run_health_check, self.home_dir, sys_info, timeout): sys_id
+                           for sys_id, (sys_info, *_) in pending.items()}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+        
+        if pending:
+            self._save_test_cache()
+        return {sys_id: results[sys_id] for sys_id in system_ids}
+    
+    def test_system(self, system_id: str, timeout: float = TEST_TIMEOUT, use_cache: bool = True) -> bool:
         """Test a specific enhancement system"""
         if system_id not in self.systems:
             print(f"❌ Unknown system: {system_id}")
             return False
         
         sys_info = self.systems[system_id]
-        script_path = self.home_dir / sys_info['script']
+        print(f"🧪 Testing {sys_info['name']}...")
+        result = self.run_tests([system_id], timeout=timeout, use_cache=use_cache)[system_id]
+        cached_tag = ", cached" if result['cached'] else ""
         
-        if not script_path.exists():
-            print(f"❌ System script not found: {script_path}")
-            return False
+        if result['status'] == 'passed':
+            print(f"✅ {sys_info['name']} test passed ({result['duration']:.2f}s{cached_tag})")
+            print(f"Output preview: {result['stdout']}...")
+            return True
+        elif result['status'] == 'timeout':
+            print(f"⏱️ {sys_info['name']} test timed out")
+        elif result['status'] == 'missing':
+            print(f"❌ {result['stderr']}")
+        elif result['status'] == 'error':
+            print(f"❌ Error testing {sys_info['name']}: {result['stderr']}")
+        else:
+            print(f"❌ {sys_info['name']} test failed ({result['duration']:.2f}s{cached_tag})")
+            print(f"Error: {result['stderr']}...")
+        return False
+    
+    def test_all_systems(self, timeout: float = TEST_TIMEOUT, jobs: int = None, use_cache: bool = True) -> bool:
+        """Test every enhancement system across a process pool"""
+        icons = {'passed': '✅', 'failed': '❌', 'timeout': '⏱️', 'error': '❌', 'missing': '⏭️'}
+        print("🧪 Testing all enhancement systems")
+        print("=" * 50)
         
-        print(f"🧪 Testing {sys_info['name']}...")
+        def report(sys_id: str, result: Dict[str, Any]):
+            cached_tag = " (cached)" if result['cached'] else ""
+            print(f"  {icons[result['status']]} {self.systems[sys_id]['name']}: "
+                  f"{result['status']} in {result['duration']:.2f}s{cached_tag}")
         
-        try:
-            # Run test command
-            result = subprocess.run(
-                sys_info['test_command'].split(),
-                cwd=self.home_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+        start = time.perf_counter()
+        results = self.run_tests(list(self.systems), timeout=timeout, jobs=jobs,
+                                 use_cache=use_cache, on_result=report)
+        elapsed = time.perf_counter() - start
+        
+        tested = [r for r in results.values() if r['status'] != 'missing']
+        passed = sum(1 for r in tested if r['status'] == 'passed')
+        serial = sum(r['duration'] for r in tested if not r['cached'])
+        print(f"\n📊 {passed}/{len(tested)} passed in {elapsed:.2f}s "
+              f"({serial:.2f}s of test time, {sum(1 for r in tested if r['cached'])} cached)")
+        return passed == len(tested)
+    
+    def measure_import_time(self, module: str, repeat: int = 3) -> Dict[str, Any]:
+        """Best-of-N cumulative import time of a module in fresh interpreters"""
+        env = dict(os.environ, PYTHONPATH=str(self.home_dir))
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        command = [sys.executable, '-X', 'importtime', '-c', f'import {module}']
+        
+        # First run warms the bytecode cache so only import work is measured
+        subprocess.run(command, cwd=self.home_dir, env=env, capture_output=True, timeout=60)
+        
+        best = {'module': module, 'ms': None, 'ok': True, 'error': None, 'slowest': []}
+        for _ in range(repeat):
+            result = subprocess.run(command, cwd=self.home_dir, env=env, capture_output=True, text=True, timeout=60)
+            if result.returncode != 0:
+                return {**best, 'ok': False, 'error': result.stderr.strip().splitlines()[-1]}
             
-            if result.returncode == 0:
-                print(f"✅ {sys_info['name']} test passed")
-                print(f"Output preview: {result.stdout[:200]}...")
-                return True
+            imports = []
+            for line in result.stderr.splitlines():
+                if not line.startswith('import time:') or 'cumulative' in line:
+                    continue
+                _, cumulative, name = line[len('import time:'):].split('|')
+                imports.append((name.strip(), int(cumulative) / 1000, len(name) - len(name.lstrip())))
+            
+            total = next((ms for name, ms, _ in imports if name == module), None)
+            if total is not None and (best['ms'] is None or total < best['ms']):
+                direct = sorted((item for item in imports if item[2] == 3), key=lambda item: item[1], reverse=True)
+                best.update(ms=total, slowest=[(name, ms) for name, ms, _ in direct[:3]])
+        
+        return best
+    
+    def check_import_budgets(self) -> bool:
+        """Compare entry-point import times against IMPORT_BUDGETS_MS"""
+        print("⏱️ Import-time budget check")
+        print("=" * 50)
+        within_budget = True
+        
+        for module, budget in IMPORT_BUDGETS_MS.items():
+            if not (self.home_dir / f"{module}.py").exists():
+                print(f"  ⏭️ {module}: not installed")
+                continue
+            
+            result = self.measure_import_time(module)
+            if not result['ok'] or result['ms'] is None:
+                print(f"  ⚠️ {module}: import failed ({result['error']})")
+                continue
+            
+            if result['ms'] <= budget:
+                print(f"  ✅ {module}: {result['ms']:.1f}ms (budget {budget}ms)")
             else:
-                print(f"❌ {sys_info['name']} test failed")
-                print(f"Error: {result.stderr[:200]}...")
-                return False
-                
-        except subprocess.TimeoutExpired:
-            print(f"⏱️ {sys_info['name']} test timed out")
-            return False
-        except Exception as e:
-            print(f"❌ Error testing {sys_info['name']}: {e}")
-            return False
+                within_budget = False
+                slowest = ', '.join(f"{name} {ms:.1f}ms" for name, ms in result['slowest'])
+                print(f"  ❌ {module}: {result['ms']:.1f}ms exceeds {budget}ms budget")
+                print(f"     Slowest imports: {slowest}")
+        
+        return within_budget
     
     def run_system(self, system_id: str, command: str = None):
         """Run a specific enhancement system"""
@@ -199,8 +694,9 @@ class EnhancementManager:
             print(f"Command: {command}")
         
         try:
-            # Run interactively
-            subprocess.run(cmd_parts, cwd=self.home_dir)
+            # Run interactively (warm fork server first, fresh interpreter otherwise)
+            if fork_server_request(sys_info['script'], cmd_parts[2:], self.home_dir) is None:
+                subprocess.run(cmd_parts, cwd=self.home_dir)
         except KeyboardInterrupt:
             print(f"\n⏹️ Stopped {sys_info['name']}")
         except Exception as e:
@@ -230,35 +726,66 @@ class EnhancementManager:
     
     def create_launcher_script(self):
         """Create convenience launcher script"""
+        import inspect
+        fork_client = inspect.getsource(fork_server_request) + (
+            "\nimport os, sys\n"
+            "status = fork_server_request(sys.argv[1], sys.argv[2:], os.getcwd())\n"
+            f"sys.exit({FORK_SERVER_UNAVAILABLE} if status is None else status)\n"
+        )
+        
         launcher_content = f"""#!/bin/bash
 # Personal Enhancement Systems Launcher
 # Auto-generated on {datetime.now().isoformat()}
 
 SCRIPT_DIR="{self.home_dir}"
 
+# Use the warm fork server ('enhance serve') when it is running
+FORK_CLIENT=$(cat <<'PYEOF'
+{fork_client}PYEOF
+)
+
+run_script() {{
+    if [ -S "{FORK_SERVER_SOCKET}" ]; then
+        python3 -S -c "$FORK_CLIENT" "$@"
+        local status=$?
+        if [ $status -ne {FORK_SERVER_UNAVAILABLE} ]; then
+            return $status
+        fi
+    fi
+    # -m runs from cached bytecode; 'python3 script.py' recompiles the script every time
+    PYTHONPATH="$SCRIPT_DIR${{PYTHONPATH:+:$PYTHONPATH}}" python3 -m "${{1%.py}}" "${{@:2}}"
+}}
+
 case "$1" in
     "overview"|"status")
         python3 "$SCRIPT_DIR/enhancement_manager.py" overview
         ;;
     "monitor")
         echo "🔍 Starting Advanced Monitoring..."
-        python3 "$SCRIPT_DIR/advanced_enhancement_system.py" monitor
+        run_script advanced_enhancement_system.py monitor "${{@:2}}"
         ;;
     "analyze")
         echo "📊 Analyzing Enhancement Opportunities..."
-        python3 "$SCRIPT_DIR/advanced_enhancement_system.py" analyze
+        run_script advanced_enhancement_system.py analyze
         ;;
     "report")
         echo "📄 Generating Enhancement Report..."
-        python3 "$SCRIPT_DIR/advanced_enhancement_system.py" report
+        run_script advanced_enhancement_system.py report
+        ;;
+    "stats")
+        run_script advanced_enhancement_system.py stats
+        ;;
+    "serve")
+        echo "🔥 Starting warm-start fork server (Ctrl+C to stop)..."
+        python3 "$SCRIPT_DIR/enhancement_manager.py" serve
         ;;
     "fix-ocr")
         echo "🔧 Running OCR Integration Fix..."
-        python3 "$SCRIPT_DIR/integrate_ocr_timeout_fix.py"
+        run_script integrate_ocr_timeout_fix.py
         ;;
     "test-ocr")
         echo "🧪 Testing OCR System..."
-        python3 "$SCRIPT_DIR/advanced_enhancement_system.py" test-ocr
+        run_script advanced_enhancement_system.py test-ocr
         ;;
     *)
         echo "🚀 Personal Enhancement Systems"
@@ -269,6 +796,8 @@ case "$1" in
         echo "  monitor     - Start continuous monitoring"
         echo "  analyze     - Analyze opportunities"
         echo "  report      - Generate detailed report"
+        echo "  stats       - Show monitoring cycle timings"
+        echo "  serve       - Start the warm-start fork server"
         echo "  fix-ocr     - Fix OCR timeout issues"
         echo "  test-ocr    - Test OCR capabilities"
         echo ""
@@ -297,7 +826,11 @@ def main():
     
     # Test command
     test_parser = subparsers.add_parser('test', help='Test a system')
-    test_parser.add_argument('system', help='System ID to test')
+    test_parser.add_argument('system', nargs='?', help='System ID to test')
+    test_parser.add_argument('--all', action='store_true', help='Test every system in parallel')
+    test_parser.add_argument('--jobs', type=int, help='Worker processes for --all')
+    test_parser.add_argument('--timeout', type=float, default=TEST_TIMEOUT, help='Per-test timeout in seconds')
+    test_parser.add_argument('--no-cache', action='store_true', help='Re-run tests even if scripts are unchanged')
     
     # Run command
     run_parser = subparsers.add_parser('run', help='Run a system')
@@ -311,6 +844,12 @@ def main():
     # Setup command
     setup_parser = subparsers.add_parser('setup', help='Setup launcher and aliases')
     
+    # Import budget command
+    imports_parser = subparsers.add_parser('check-imports', help='Check entry-point import times against budgets')
+    
+    # Fork server command
+    serve_parser = subparsers.add_parser('serve', help='Run the warm-start fork server')
+    
     args = parser.parse_args()
     
     manager = EnhancementManager()
@@ -319,7 +858,13 @@ def main():
         manager.show_system_overview()
     
     elif args.command == 'test':
-        manager.test_system(args.system)
+        if args.all:
+            passed = manager.test_all_systems(timeout=args.timeout, jobs=args.jobs, use_cache=not args.no_cache)
+        elif args.system:
+            passed = manager.test_system(args.system, timeout=args.timeout, use_cache=not args.no_cache)
+        else:
+            test_parser.error('give a system ID or --all')
+        sys.exit(0 if passed else 1)
     
     elif args.command == 'run':
         manager.run_system(args.system, args.subcommand)
@@ -327,6 +872,12 @@ def main():
     elif args.command == 'help':
         manager.show_system_help(args.system)
     
+    elif args.command == 'check-imports':
+        sys.exit(0 if manager.check_import_budgets() else 1)
+    
+    elif args.command == 'serve':
+        ForkServer(manager).serve()
+    
     elif args.command == 'setup':
         print("🔧 Setting up enhancement system launcher...")
         launcher_path = manager.create_launcher_script()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""Tests for the GUI-free parts of advanced_enhancement_system"""
+
+import asyncio
+import os
+import sqlite3
+import struct
+import sys
+import zlib
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import advanced_enhancement_system
+from advanced_enhancement_system import (AdaptiveIntervalController, AdvancedMonitoringSystem, DatabaseManager,
+                                         EnhancementMetric, MetricArchive, MetricCollector, MetricShipper, MetricsExporter,
+                                         decode_metric_batch, encode_metric_batch)
+
+SCREEN = ("File Edit Selection View Go Run Terminal Help monitor.py def main(): parser = argparse.ArgumentParser() "
+          "parser.add_argument('--interval', type=int) args = parser.parse_args() system = MonitoringSystem() "
+          "system.start(args.interval) run(args) PROBLEMS OUTPUT TERMINAL Ln 42, Col 7 Spaces: 4 UTF-8 Python 10:41")
+
+def activity(screen=SCREEN, cpu=10.0, processes=('python3', 'code', 'firefox'), idle=False):
+    return {
+        'system_metrics': {'cpu_percent': cpu},
+        'screen_content': screen,
+        'active_processes': [{'name': name} for name in processes],
+        'productivity_indicators': ['system_idle'] if idle else []
+    }
+
+class AdaptiveIntervalControllerTest(unittest.TestCase):
+    def test_small_screen_changes_are_not_bursts(self):
+        controller = AdaptiveIntervalController()
+        controller._is_burst(activity())
+        # Clock ticked and OCR misread one word
+        self.assertFalse(controller._is_burst(activity(SCREEN.replace('10:41', '10:42').replace('run', 'rnu'))))
+    
+    def test_new_screen_is_a_burst(self):
+        controller = AdaptiveIntervalController()
+        controller._is_burst(activity())
+        self.assertTrue(controller._is_burst(activity("Inbox (3) Meeting notes Re: quarterly budget draft")))
+    
+    def test_cpu_swing_and_process_churn_are_bursts(self):
+        controller = AdaptiveIntervalController()
+        controller._is_burst(activity())
+        self.assertTrue(controller._is_burst(activity(cpu=60.0)))
+        self.assertTrue(controller._is_burst(activity(cpu=60.0, processes=('gcc', 'make', 'ld'))))
+    
+    def test_idle_backs_off_despite_screen_noise(self):
+        controller = AdaptiveIntervalController(base_interval=30, max_interval=240)
+        for minute in range(10):
+            interval = controller.update(activity(SCREEN.replace('10:41', f'10:{50 + minute}'), idle=True))
+        self.assertEqual(interval, 240)
+    
+    def test_burst_shortens_interval_to_minimum(self):
+        controller = AdaptiveIntervalController(base_interval=30, min_interval=5)
+        controller.update(activity())
+        for cpu in (90.0, 10.0, 90.0, 10.0, 90.0):
+            interval = controller.update(activity(cpu=cpu))
+        self.assertEqual(interval, 5)
+
+class FakeScreen:
+    def __init__(self, pixels):
+        self.pixels = pixels
+        self.size = (len(pixels), 1)
+    
+    def tobytes(self):
+        return self.pixels
+
+class FakeSource:
+    can_capture = True
+    
+    def __init__(self):
+        self.screen = FakeScreen(b'desktop')
+    
+    def capture_screen(self):
+        return self.screen
+
+class FakeOCR:
+    def __init__(self):
+        self.calls = 0
+    
+    def extract_screen_text(self, screen):
+        self.calls += 1
+        return screen.pixels.decode()
+
+class OCRCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = FakeSource()
+        self.monitoring = AdvancedMonitoringSystem(cpu_budget=None, source=self.source,
+                                                   db_path=os.path.join(self.tmp.name, 'metrics.db'))
+        self.ocr = FakeOCR()
+        self.monitoring._ocr_engines = (None, self.ocr)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    @mock.patch.object(advanced_enhancement_system, 'OCR_AVAILABLE', True)
+    def test_unchanged_screen_is_not_ocred_again(self):
+        self.assertEqual(self.monitoring.extract_screen_text_safe(), 'desktop')
+        self.assertEqual(self.monitoring.extract_screen_text_safe(), 'desktop')
+        self.source.screen = FakeScreen(b'editor')
+        self.assertEqual(self.monitoring.extract_screen_text_safe(), 'editor')
+        self.assertEqual(self.ocr.calls, 2)
+        self.assertEqual((self.monitoring.ocr_cache_hits, self.monitoring.ocr_cache_misses), (1, 2))
+    
+    @mock.patch.object(advanced_enhancement_system, 'OCR_AVAILABLE', True)
+    def test_exporter_reports_ocr_cache_counters(self):
+        self.monitoring.extract_screen_text_safe()
+        self.monitoring.extract_screen_text_safe()
+        text = MetricsExporter(self.monitoring).render()
+        self.assertIn('enhancement_ocr_cache_hits_total 1', text)
+        self.assertIn('enhancement_ocr_cache_misses_total 1', text)
+    
+    def test_exporter_keeps_full_precision(self):
+        self.monitoring.counters['cycles'] = 1234567
+        text = MetricsExporter(self.monitoring).render()
+        self.assertIn('enhancement_cycles_total 1234567\n', text)
+        self.assertEqual(MetricsExporter.format_value(1760820000.123), '1760820000.123')
+        self.assertEqual(MetricsExporter.format_value(float('nan')), 'NaN')
+
+def metric(value=1.0):
+    return EnhancementMetric(timestamp=1.0, category='system', metric_name='cpu', value=value,
+                             context={}, confidence=1.0)
+
+class AgentStream:
+    """StreamReader/StreamWriter stand-ins fed with raw agent bytes"""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+        self.written = b''
+        self.closed = False
+    
+    def reader(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(self.data)
+        reader.feed_eof()
+        return reader
+    
+    def write(self, data):
+        self.written += data
+    
+    async def drain(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def get_extra_info(self, name):
+        return None
+
+class MetricTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, 'metrics.db'))
+        self.collector = MetricCollector(self.db, token=b'secret')
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def handle(self, data: bytes) -> AgentStream:
+        stream = AgentStream(data)
+        
+        async def run():
+            self.collector._queue = asyncio.Queue()
+            writer = asyncio.create_task(self.collector._writer())
+            await self.collector._handle_agent(stream.reader(), stream)
+            writer.cancel()
+        
+        with mock.patch('builtins.print'):
+            asyncio.run(run())
+        return stream
+    
+    @staticmethod
+    def frame(payload: bytes) -> bytes:
+        return struct.pack('<I', len(payload)) + payload
+    
+    def test_batch_round_trip(self):
+        host, metrics = decode_metric_batch(encode_metric_batch('ws1', [metric(2.0)]))
+        self.assertEqual(host, 'ws1')
+        self.assertEqual(metrics[0].value, 2.0)
+    
+    def test_decompression_bomb_is_refused(self):
+        with self.assertRaises(ValueError):
+            decode_metric_batch(zlib.compress(b' ' * 4096), max_bytes=1024)
+    
+    def test_collector_acks_batches_from_token_holders(self):
+        stream = self.handle(self.frame(b'secret') + self.frame(encode_metric_batch('ws1', [metric()])))
+        self.assertEqual(stream.written, b'\x01\x01')
+        self.assertEqual(self.collector.hosts['ws1'], 1)
+    
+    def test_collector_drops_agents_with_a_bad_token(self):
+        stream = self.handle(self.frame(b'guess') + self.frame(encode_metric_batch('ws1', [metric()])))
+        self.assertEqual(stream.written, b'')
+        self.assertTrue(stream.closed)
+        self.assertNotIn('ws1', self.collector.hosts)
+    
+    def test_collector_refuses_oversized_frames_before_reading_them(self):
+        stream = self.handle(self.frame(b'secret') + struct.pack('<I', 0xFFFFFFFF))
+        self.assertEqual(stream.written, b'\x01')
+        self.assertTrue(stream.closed)
+    
+    def test_writer_survives_batches_whose_agent_went_away(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            self.collector._queue = asyncio.Queue()
+            writer = asyncio.create_task(self.collector._writer())
+            gone, waiting = loop.create_future(), loop.create_future()
+            gone.cancel()
+            await self.collector._queue.put(('ws1', [metric()], gone))
+            await self.collector._queue.put(('ws2', [metric()], waiting))
+            result = await asyncio.wait_for(waiting, 5)
+            self.assertFalse(writer.done())
+            writer.cancel()
+            return result
+        
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(self.collector.hosts['ws2'], 1)
+    
+    def test_unreachable_collector_appends_to_the_spool(self):
+        spool = os.path.join(self.tmp.name, 'spool.bin')
+        shipper = MetricShipper(os.path.join(self.tmp.name, 'missing.sock'), host='ws1',
+                                spool_path=spool, token=b'secret')
+        with mock.patch('builtins.print'):
+            shipper.submit(metric())
+            self.assertFalse(shipper.flush())
+            shipper.submit(metric())
+            self.assertFalse(shipper.flush())
+        self.assertEqual(len(shipper._read_spool()), 2)
+        self.assertEqual(shipper.spooled, 2)
+
+class SeriesCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, 'metrics.db'))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def total(self):
+        return sum(point['count'] for point in self.db.query_series('system.cpu', hours=1, end=3600))
+    
+    def test_inserts_are_merged_into_cached_buckets(self):
+        self.db.store_metrics([metric(1.0), metric(2.0)])
+        self.assertEqual(self.total(), 2)
+        self.db.store_metrics([metric(3.0)])
+        self.assertEqual(self.total(), 3)
+    
+    def test_deletes_invalidate_cached_buckets(self):
+        self.db.store_metrics([metric(1.0), metric(2.0), metric(3.0)])
+        self.assertEqual(self.total(), 3)
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.execute('DELETE FROM metrics WHERE id = 1')
+        self.assertEqual(self.total(), 2)
+
+@unittest.skipUnless(advanced_enhancement_system.NUMPY_AVAILABLE, "numpy is required for metric archives")
+class MetricArchiveTest(unittest.TestCase):
+    def test_columns_match_the_exported_row_count(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'metrics.db'))
+            db.store_metrics([metric(float(value)) for value in range(5)])
+            meta = MetricArchive.export(db.db_path, os.path.join(tmp, 'archive'), chunk_size=2)
+            
+            archive = MetricArchive(os.path.join(tmp, 'archive'))
+            self.assertEqual(meta['rows'], 5)
+            for name in MetricArchive.COLUMNS:
+                self.assertEqual(len(archive[name]), len(archive))
+            self.assertEqual(list(archive['value']), [0.0, 1.0, 2.0, 3.0, 4.0])
+    
+    def test_unknown_label_matches_no_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = DatabaseManager(os.path.join(tmp, 'metrics.db'))
+            db.store_metrics([metric(1.0), metric(2.0)])
+            MetricArchive.export(db.db_path, os.path.join(tmp, 'archive'))
+            
+            archive = MetricArchive(os.path.join(tmp, 'archive'))
+            self.assertFalse(archive.select(host='nosuchhost').any())
+            self.assertFalse(archive.select(category='nosuchcategory').any())
+            self.assertEqual(archive.select(category='system').sum(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Tests for the GUI-free helpers in System Optimizer Pro"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'Desktop', 'System Optimizer Pro Complete Edition'))
+
+try:
+    import SystemOptimizerComplete
+except ImportError as e:  # tkinter or psutil missing
+    raise unittest.SkipTest(f"System Optimizer Pro not importable: {e}")
+
+from SystemOptimizerComplete import (CleanupEngine, DirectorySizer, DiskUsageIndex, DuplicateFinder,
+                                     HealthProbes, LargeFileScanner, SystemOptimizerComplete as App,
+                                     SystemSampler)
+
+def write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+
+class SystemSamplerTest(unittest.TestCase):
+    def test_get_times_out_instead_of_sampling_on_the_caller(self):
+        sampler = SystemSampler()
+        sampler.sample = lambda: self.fail("sampled on the caller thread")
+        with self.assertRaises(TimeoutError):
+            sampler.get(timeout=0.01)
+    
+    def test_processes_are_only_listed_while_wanted(self):
+        sampler = SystemSampler(interval=60)
+        self.assertIsNone(sampler.sample()['top_processes'])
+        
+        sampler.want_processes()
+        self.assertTrue(sampler.wakeup.is_set())
+        processes = sampler.sample()['top_processes']
+        self.assertIsInstance(processes, list)
+        self.assertLessEqual(len(processes), sampler.process_count)
+
+class DirectorySizerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, 'journal', 'system.log')
+        write(self.log, 8192)
+        self.sizer = DirectorySizer(workers=2)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def grow_log(self):
+        with open(self.log, 'ab') as f:
+            f.write(os.urandom(256 * 1024))
+    
+    def test_fresh_scan_sees_files_growing_in_place(self):
+        before = self.sizer.sizes([self.tmp.name])[self.tmp.name][0]
+        self.grow_log()
+        self.assertEqual(self.sizer.sizes([self.tmp.name])[self.tmp.name][0], before)  # Cached listing
+        self.assertGreaterEqual(self.sizer.sizes([self.tmp.name], fresh=True)[self.tmp.name][0],
+                                before + 256 * 1024)
+    
+    def test_old_listings_are_listed_again(self):
+        before = self.sizer.sizes([self.tmp.name])[self.tmp.name][0]
+        self.grow_log()
+        with mock.patch.object(DirectorySizer, 'FULL_RELIST_AGE', 0):
+            self.assertGreaterEqual(self.sizer.sizes([self.tmp.name])[self.tmp.name][0], before + 256 * 1024)
+
+class DiskUsageIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'home')
+        write(os.path.join(self.root, 'docs', 'a.bin'), 64 * 1024)
+        write(os.path.join(self.root, 'docs', 'deep', 'b.bin'), 32 * 1024)
+        write(os.path.join(self.root, 'music', 'c.bin'), 16 * 1024)
+        self.index = DiskUsageIndex(os.path.join(self.tmp.name, 'du.db'))
+    
+    def tearDown(self):
+        self.index.conn.close()
+        self.tmp.cleanup()
+    
+    def test_totals_roll_up_and_unchanged_folders_are_not_relisted(self):
+        directories, relisted, _ = self.index.update(self.root)
+        self.assertEqual((directories, relisted), (4, 4))
+        
+        total_bytes, total_files, total_dirs = self.index.node(self.root)[:3]
+        self.assertGreaterEqual(total_bytes, 112 * 1024)
+        self.assertEqual((total_files, total_dirs), (3, 3))
+        self.assertEqual([row[0] for row in self.index.children(self.root)],
+                         [os.path.join(self.root, 'docs'), os.path.join(self.root, 'music')])
+        
+        write(os.path.join(self.root, 'music', 'd.bin'), 4096)
+        self.assertEqual(self.index.update(self.root)[1], 1)
+        self.assertEqual(self.index.node(self.root)[1], 4)
+    
+    def test_full_relist_catches_files_growing_in_place(self):
+        self.index.update(self.root)
+        with open(os.path.join(self.root, 'music', 'c.bin'), 'ab') as f:
+            f.write(os.urandom(1024 * 1024))
+        before = self.index.node(self.root)[0]
+        
+        self.index.update(self.root)
+        self.assertEqual(self.index.node(self.root)[0], before)  # Same mtimes: nothing re-listed
+        self.assertEqual(self.index.update(self.root, full=True)[1], 4)
+        self.assertGreaterEqual(self.index.node(self.root)[0], before + 1024 * 1024)
+    
+    def test_non_utf8_folder_names_are_skipped_but_counted(self):
+        bad = os.path.join(os.fsencode(self.root), b'\xff')
+        os.makedirs(bad)
+        with open(os.path.join(bad, b'e.bin'), 'wb') as f:
+            f.write(os.urandom(8192))
+        
+        with mock.patch('builtins.print'):
+            directories, _, _ = self.index.update(self.root)
+        self.assertEqual(directories, 5)
+        self.assertEqual(self.index.node(self.root)[1], 4)
+        self.assertEqual(len(self.index.children(self.root)), 2)
+        total_bytes = self.index.node(self.root)[0]
+        
+        # An incremental update keeps counting the skipped folder
+        with mock.patch('builtins.print'):
+            self.assertEqual(self.index.update(self.root)[0], 5)
+        self.assertEqual(self.index.node(self.root)[:2], (total_bytes, 4))
+
+class CleanupEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'cache')
+        self.outside = os.path.join(self.tmp.name, 'outside')
+        write(os.path.join(self.root, 'top.bin'), 8192)
+        write(os.path.join(self.root, 'sub', 'inner.bin'), 8192)
+        write(os.path.join(self.outside, 'inner.bin'), 8192)
+        self.engine = CleanupEngine(workers=2)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def scan(self):
+        files, dirs = self.engine.scan_root(self.root, None, False)
+        return {'files': files, 'dirs': dirs, 'bytes': sum(entry[1] for entry in files)}
+    
+    def test_only_regular_files_are_collected(self):
+        os.mkfifo(os.path.join(self.root, 'fifo'))
+        os.symlink(os.path.join(self.outside, 'inner.bin'), os.path.join(self.root, 'link'))
+        agent = socket.socket(socket.AF_UNIX)
+        agent.bind(os.path.join(self.root, 'agent.sock'))
+        self.addCleanup(agent.close)
+        
+        names = sorted(os.path.basename(entry[0]) for entry in self.scan()['files'])
+        self.assertEqual(names, ['inner.bin', 'top.bin'])
+    
+    def test_delete_removes_files_and_emptied_folders(self):
+        found = self.scan()
+        freed, removed, _ = self.engine.delete(found)
+        self.assertEqual((freed, removed), (found['bytes'], 2))
+        self.assertEqual(os.listdir(self.root), [])
+    
+    def test_folder_swapped_for_a_symlink_is_not_followed(self):
+        found = self.scan()
+        os.rename(os.path.join(self.root, 'sub'), os.path.join(self.tmp.name, 'moved'))
+        os.symlink(self.outside, os.path.join(self.root, 'sub'))
+        
+        freed, removed, _ = self.engine.delete(found)
+        self.assertEqual(removed, 1)
+        self.assertTrue(os.path.exists(os.path.join(self.outside, 'inner.bin')))
+    
+    def test_replaced_files_are_skipped_and_bytes_come_from_a_fresh_stat(self):
+        found = self.scan()
+        os.replace(os.path.join(self.outside, 'inner.bin'), os.path.join(self.root, 'sub', 'inner.bin'))
+        with open(os.path.join(self.root, 'top.bin'), 'ab') as f:
+            f.write(os.urandom(64 * 1024))
+        
+        freed, removed, _ = self.engine.delete(found)
+        self.assertEqual(removed, 1)
+        self.assertGreaterEqual(freed, 72 * 1024)
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'sub', 'inner.bin')))
+
+class DuplicateFinderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'files')
+        content = os.urandom(200 * 1024)
+        for name in ('a.bin', os.path.join('sub', 'b.bin'), os.path.join('sub', 'c.bin')):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+        write(os.path.join(self.root, 'unique.bin'), 200 * 1024)
+        os.link(os.path.join(self.root, 'a.bin'), os.path.join(self.root, 'hardlink.bin'))
+        self.finder = DuplicateFinder(os.path.join(self.tmp.name, 'hashes.db'), workers=2)
+    
+    def tearDown(self):
+        self.finder.conn.close()
+        self.tmp.cleanup()
+    
+    def test_extra_copies_are_counted_once_per_inode(self):
+        stats = self.finder.find([self.root])
+        self.assertEqual((stats['groups'], stats['files']), (1, 2))
+        self.assertGreaterEqual(stats['bytes'], 2 * 200 * 1024)
+        self.assertEqual(len(stats['largest'][0][2]), 3)
+    
+    def test_rerun_reuses_stored_hashes(self):
+        self.finder.find([self.root])
+        stats = self.finder.find([self.root])
+        self.assertEqual(stats['hashed'], 0)
+        self.assertEqual(stats['files'], 2)
+    
+    def test_non_utf8_names_are_skipped(self):
+        with open(os.path.join(os.fsencode(self.root), b'\xff'), 'wb') as f:
+            f.write(os.urandom(8192))
+        with mock.patch('builtins.print'):
+            stats = self.finder.find([self.root])
+        self.assertEqual(stats['files'], 2)
+
+class LargeFileScannerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        for i, size in enumerate((10, 300, 50, 200, 2000)):
+            path = os.path.join(self.root, f'dir{i % 2}', f'f{i}.bin')
+            write(path, size * 1024)
+            os.utime(path, (1_000_000 + i, 1_000_000 + i))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_keeps_only_the_k_largest_and_stalest(self):
+        result = LargeFileScanner(k=2, stale_min_size=100 * 1024).scan([self.root])
+        self.assertEqual(result['files'], 5)
+        self.assertEqual([os.path.basename(path) for _, path in result['largest']], ['f4.bin', 'f1.bin'])
+        self.assertEqual([os.path.basename(path) for _, _, path in result['stale']], ['f1.bin', 'f3.bin'])
+    
+    def test_cancelled_scan_stops_early(self):
+        scanner = LargeFileScanner()
+        scanner.cancel()
+        result = scanner.scan([self.root])
+        self.assertTrue(result['cancelled'])
+        self.assertEqual(result['files'], 0)
+    
+    def test_replaced_scan_stops_reporting(self):
+        gate = threading.Event()
+        
+        class GatedScanner(LargeFileScanner):
+            def scan(self, roots, on_progress=None):
+                gate.wait(5)
+                return super().scan(roots, on_progress)
+        
+        app = types.SimpleNamespace(file_scanner=None, config={})
+        old, new = [], []
+        with mock.patch('SystemOptimizerComplete.LargeFileScanner', GatedScanner):
+            App.start_file_scan(app, self.root, old.append)
+            App.start_file_scan(app, self.root, new.append)
+        gate.set()
+        
+        deadline = time.monotonic() + 5
+        while not (new and new[-1].get('done')) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(old, [])
+        self.assertEqual(new[-1]['files'], 5)
+
+class HealthProbesTest(unittest.TestCase):
+    def setUp(self):
+        self.probes = HealthProbes(workers=2)
+        self.calls = {'cheap': 0, 'slow': 0}
+        self.release = threading.Event()
+        
+        def cheap():
+            self.calls['cheap'] += 1
+            return self.calls['cheap']
+        
+        def slow():
+            self.calls['slow'] += 1
+            self.release.wait(5)
+            return 'fresh'
+        
+        self.probes.register('cheap', cheap, ttl=60, cost='cheap')
+        self.probes.register('slow', slow, ttl=60, timeout=0.05, default='unknown')
+    
+    def tearDown(self):
+        self.release.set()
+        self.probes.pool.shutdown(wait=True)
+    
+    def test_results_are_shared_within_their_ttl(self):
+        self.release.set()
+        self.assertEqual(self.probes.run(), {'cheap': 1, 'slow': 'fresh'})
+        self.assertEqual(self.probes.run(), {'cheap': 1, 'slow': 'fresh'})
+        self.assertEqual(self.calls, {'cheap': 1, 'slow': 1})
+    
+    def test_invalidate_forces_a_new_probe(self):
+        self.probes.run(['cheap'])
+        self.probes.invalidate('cheap')
+        self.assertEqual(self.probes.run(['cheap']), {'cheap': 2})
+    
+    def test_overrunning_probe_reports_its_default_and_is_not_started_twice(self):
+        self.assertEqual(self.probes.run(['slow']), {'slow': 'unknown'})
+        self.assertEqual(self.probes.run(['slow']), {'slow': 'unknown'})
+        self.assertEqual(self.calls['slow'], 1)
+        
+        self.release.set()
+        deadline = time.monotonic() + 5
+        while 'slow' not in self.probes.results and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.probes.run(['slow']), {'slow': 'fresh'})
+    
+    def test_failing_probe_reports_its_default(self):
+        self.probes.register('broken', lambda: 1 / 0, ttl=60, cost='cheap', default=False)
+        with mock.patch('builtins.print'):
+            self.assertEqual(self.probes.run(['broken']), {'broken': False})
+    
+    def test_unanswered_subprocess_probes_do_not_count_against_health(self):
+        app = types.SimpleNamespace(health_probes=self.probes, sampler=None,
+                                    probe_text_handler=lambda: self.release.wait(5),
+                                    probe_desktop_portal=lambda: self.release.wait(5))
+        App.register_health_probes(app)
+        for name in ('text_handler', 'desktop_portal'):
+            self.probes.register(name, *self.probes.probes[name][:2], timeout=0.05,
+                                 default=self.probes.probes[name][4])
+        probes = self.probes.run(['xdg_open', 'text_handler', 'desktop_portal'])
+        self.assertIs(probes['text_handler'], True)
+        self.assertIs(probes['desktop_portal'], True)
+        self.assertGreaterEqual(self.probes.probes['desktop_portal'][1], 300)
+
+if __name__ == '__main__':
+    unittest.main()
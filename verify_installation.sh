@@ -130,6 +130,14 @@ else
     ((test_failures++))
 fi
 
+# Check import-time budgets (advisory: timings vary with machine load, so this never counts as an issue)
+print_status "Checking entry-point import times..."
+if python3 enhancement_manager.py check-imports; then
+    print_success "Import times within budget"
+else
+    print_warning "Import-time budget exceeded (slower start-up, not an installation problem)"
+fi
+
 # Test 6: Check Git repository
 print_status "Checking Git repository..."
 if [[ -d ".git" ]]; then